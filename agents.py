@@ -0,0 +1,171 @@
+import abc
+import copy
+
+import numpy as np
+
+import evaluators
+import mcts
+import minimax
+
+
+class Agent(abc.ABC):
+    """ Chooses moves for the player with priority.
+
+        decide(game) returns one of game.get_moves(). decide_batch(games) returns one move for each of many
+        games at once; by default it calls decide() for each, agents that can share work between games (like a
+        vectorized evaluator) override it. The same agent object may play any number of seats and games.
+    """
+
+    @abc.abstractmethod
+    def decide(self, game):
+        pass
+
+    def decide_batch(self, games):
+        return [self.decide(game) for game in games]
+
+
+class RandomAgent(Agent):
+    def decide(self, game):
+        return game.rng.choice(game.get_moves())
+
+
+class AlphaBetaAgent(Agent):
+    """ Alpha-beta search of the given depth after each legal move, ties broken at random. """
+
+    def __init__(self, depth=1):
+        self.depth = depth
+
+    def decide(self, game):
+        player = game.player_with_priority
+        legal_moves = game.get_moves()
+        if len(legal_moves) == 1:
+            return legal_moves[0]
+        move_values = [-9999] * len(legal_moves)
+        ordering = minimax.MoveOrdering()
+        for i in range(len(move_values)):
+            new_game = copy.deepcopy(game)
+            new_game.make_move(legal_moves[i])
+            move_values[i] = minimax.alphabeta(player, new_game, self.depth, -9999, 9999,
+                                               new_game.player_with_priority.index == player.index,
+                                               ordering=ordering)
+        winner = np.argwhere(move_values == np.amax(move_values))
+        arg = game.rng.choice(winner)[0]
+        return legal_moves[arg]
+
+
+class UCTAgent(Agent):
+    """ mcts.uct, optionally with a mcts.ProgressiveWidening, a limit on the depth of expansion, a rollout policy
+        from rollouts.py and rollouts truncated after horizon turns and scored by evaluator.
+    """
+
+    def __init__(self, itermax=10, widening=None, expand_depth=None, rollout=None, horizon=None, evaluator=None):
+        self.itermax = itermax
+        self.widening = widening
+        self.expand_depth = expand_depth
+        self.rollout = rollout
+        self.horizon = horizon
+        self.evaluator = evaluator
+
+    def decide(self, game):
+        return mcts.uct(game, itermax=self.itermax, widening=self.widening, expand_depth=self.expand_depth,
+                        rollout=self.rollout, horizon=self.horizon, evaluator=self.evaluator)
+
+
+class ISMCTSAgent(Agent):
+    def __init__(self, itermax=10):
+        self.itermax = itermax
+
+    def decide(self, game):
+        return mcts.ismcts(game, itermax=self.itermax)
+
+
+class BatchedMCTSAgent(Agent):
+    """ mcts.batched_ismcts with leaves scored by evaluator, by default an evaluators.HeuristicEvaluator. A batch
+        of games is searched together, so the leaves of all of them share each evaluate() call.
+    """
+
+    def __init__(self, itermax=64, batch_size=8, evaluator=None):
+        self.itermax = itermax
+        self.batch_size = batch_size
+        self.evaluator = evaluators.HeuristicEvaluator() if evaluator is None else evaluator
+
+    def decide(self, game):
+        return self.decide_batch([game])[0]
+
+    def decide_batch(self, games):
+        return mcts.batched_ismcts(games, self.itermax, self.evaluator, self.batch_size)
+
+
+class GreedyAgent(Agent):
+    """ Plays the move whose resulting state has the best heuristic value. A batch of games is evaluated with
+        one minimax.heuristic_values call per seat, over the children of every game in the batch.
+    """
+
+    def decide(self, game):
+        return self.decide_batch([game])[0]
+
+    def decide_batch(self, games):
+        children = {}
+        for game_index, game in enumerate(games):
+            for move in game.get_moves():
+                child = copy.deepcopy(game)
+                child.make_move(move)
+                seat = game.player_with_priority.index
+                children.setdefault(seat, []).append((game_index, move, child))
+        best = [None] * len(games)
+        best_values = [-np.inf] * len(games)
+        for seat, entries in children.items():
+            values = minimax.heuristic_values(seat, [child for _, _, child in entries])
+            for (game_index, move, _), value in zip(entries, values):
+                if value > best_values[game_index]:
+                    best[game_index] = move
+                    best_values[game_index] = value
+        return best
+
+
+AGENT_TYPES = {
+    "random": RandomAgent,
+    "alphabeta": AlphaBetaAgent,
+    "uct": UCTAgent,
+    "ismcts": ISMCTSAgent,
+    "batched": BatchedMCTSAgent,
+    "greedy": GreedyAgent,
+}
+
+
+def make_agent(method, *args):
+    """ An agent by name, with the rest of the arguments passed to its constructor. """
+    try:
+        agent_type = AGENT_TYPES[method]
+    except KeyError:
+        raise ValueError("Unknown agent '%s', expected one of %s" % (method, ", ".join(AGENT_TYPES)))
+    return agent_type(*args)
+
+
+def run_games(games, seat_agents, max_moves=None):
+    """ Plays started games to the end in lockstep, seat_agents[i] moving for players[i] in every game.
+
+        Every step, forced moves are made directly and the remaining decisions are grouped by agent, so that an
+        agent shared between seats and games gets them in one decide_batch call. Games still running after
+        max_moves moves are left unfinished. Returns the number of moves made in each game.
+    """
+    move_counts = [0] * len(games)
+    running = [i for i, game in enumerate(games) if not game.is_over()]
+    while running:
+        requests = {}
+        for i in running:
+            game = games[i]
+            moves = game.get_moves()
+            if len(moves) == 1:
+                game.make_move(moves[0])
+                move_counts[i] += 1
+                continue
+            agent = seat_agents[game.player_with_priority.index]
+            requests.setdefault(id(agent), (agent, []))[1].append(i)
+        for agent, indices in requests.values():
+            for i, move in zip(indices, agent.decide_batch([games[i] for i in indices])):
+                games[i].make_move(move)
+                move_counts[i] += 1
+        running = [i for i in running
+                   if not games[i].is_over() and (max_moves is None or move_counts[i] < max_moves)]
+    return move_counts
@@ -0,0 +1,101 @@
+from cards import Creature
+
+
+class Battlefield(list):
+    """ The list of permanents in play, which also keeps running creature totals per controller.
+
+        material maps a player index to [creature count, total power, total toughness] and total holds the
+        same sums over all players. Both are updated as permanents enter and leave, so evaluations can read
+        them in constant time instead of scanning the battlefield. Power and toughness are assumed not to
+        change while a creature is on the battlefield.
+
+        Permanents with triggers are subscribed to event_bus, when one is set, while they are on the
+        battlefield.
+    """
+
+    def __init__(self, permanents=()):
+        super(Battlefield, self).__init__(permanents)
+        self.event_bus = None
+        self.material = {}
+        self.total = [0, 0, 0]
+        for permanent in self:
+            self._enter(permanent)
+
+    def _enter(self, permanent):
+        if permanent.triggers and self.event_bus is not None:
+            self.event_bus.subscribe(permanent)
+        if isinstance(permanent, Creature):
+            totals = self.material.get(permanent.owner.index)
+            if totals is None:
+                totals = self.material[permanent.owner.index] = [0, 0, 0]
+            totals[0] += 1
+            totals[1] += permanent.power
+            totals[2] += permanent.toughness
+            self.total[0] += 1
+            self.total[1] += permanent.power
+            self.total[2] += permanent.toughness
+
+    def _leave(self, permanent):
+        if permanent.triggers and self.event_bus is not None:
+            self.event_bus.unsubscribe(permanent)
+        if isinstance(permanent, Creature):
+            totals = self.material[permanent.owner.index]
+            totals[0] -= 1
+            totals[1] -= permanent.power
+            totals[2] -= permanent.toughness
+            self.total[0] -= 1
+            self.total[1] -= permanent.power
+            self.total[2] -= permanent.toughness
+
+    def _recount(self):
+        self.material = {}
+        self.total = [0, 0, 0]
+        if self.event_bus is not None:
+            self.event_bus.clear()
+        for permanent in self:
+            self._enter(permanent)
+
+    def get_material(self, player_index):
+        return self.material.get(player_index, (0, 0, 0))
+
+    def append(self, permanent):
+        super(Battlefield, self).append(permanent)
+        self._enter(permanent)
+
+    def insert(self, index, permanent):
+        super(Battlefield, self).insert(index, permanent)
+        self._enter(permanent)
+
+    def extend(self, permanents):
+        for permanent in permanents:
+            self.append(permanent)
+
+    def __iadd__(self, permanents):
+        self.extend(permanents)
+        return self
+
+    def remove(self, permanent):
+        super(Battlefield, self).remove(permanent)
+        self._leave(permanent)
+
+    def pop(self, index=-1):
+        permanent = super(Battlefield, self).pop(index)
+        self._leave(permanent)
+        return permanent
+
+    def clear(self):
+        super(Battlefield, self).clear()
+        self._recount()
+
+    def __setitem__(self, index, value):
+        super(Battlefield, self).__setitem__(index, value)
+        self._recount()
+
+    def __delitem__(self, index):
+        super(Battlefield, self).__delitem__(index)
+        self._recount()
+
+    def __reduce_ex__(self, protocol):
+        # rebuild from the permanents so that copies recount their totals exactly once, the copied event bus
+        # already holds the subscriptions
+        return self.__class__, (list(self),), {'event_bus': self.event_bus}
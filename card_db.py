@@ -0,0 +1,165 @@
+import collections
+import json
+import os
+import pickle
+import sys
+
+import cards
+import cards_impl
+import spells  # registers the resolvers of the spells it creates
+
+CARD_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "card_data", "cards.json")
+CACHE_FORMAT_VERSION = 1
+
+CardDefinition = collections.namedtuple("CardDefinition", ["id", "name", "type", "types", "subtypes", "mc", "power",
+                                                           "toughness", "cannot_block", "mana", "impl"])
+
+
+def _mana_ability(color):
+    def add_mana(self):
+        self.owner.add_mana({color: 1})
+    return add_mana
+
+
+# one shared tap ability per color, so cards do not carry a closure each
+MANA_ABILITIES = {color: _mana_ability(color) for color in ['White', 'Blue', 'Black', 'Red', 'Green', 'Colorless']}
+
+
+def compile_definitions(data):
+    """ Turns the parsed card database into interned, immutable CardDefinitions and expanded decklists. """
+    intern = sys.intern
+    definitions = {}
+    for entry in data["cards"]:
+        definition = CardDefinition(
+            id=intern(entry["id"]),
+            name=intern(entry["name"]),
+            type=intern(entry.get("type", "")),
+            types=tuple(intern(t) for t in entry.get("types", ())),
+            subtypes=tuple(intern(t) for t in entry.get("subtypes", ())),
+            mc=tuple(sorted((intern(color), amount) for color, amount in entry.get("mc", {}).items())),
+            power=entry.get("power", 0),
+            toughness=entry.get("toughness", 0),
+            cannot_block=entry.get("cannot_block", False),
+            mana=tuple(intern(color) for color in entry.get("mana", ())),
+            impl=entry.get("impl"),
+        )
+        if definition.id in definitions:
+            raise ValueError("Duplicate card id '%s' in card database" % definition.id)
+        definitions[definition.id] = definition
+    decks = {}
+    for deck_name, entries in data.get("decks", {}).items():
+        decklist = []
+        for card_id, count in entries:
+            if card_id not in definitions:
+                raise ValueError("Deck '%s' refers to unknown card id '%s'" % (deck_name, card_id))
+            decklist.extend([definitions[card_id].id] * count)
+        decks[intern(deck_name)] = tuple(decklist)
+    return definitions, decks
+
+
+def _cache_path(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, "__pycache__", filename + ".pickle")
+
+
+def load_definitions(path=CARD_DATA_PATH, use_cache=True):
+    """ Reads the card database, going through a pickled cache next to it that is rebuilt whenever the
+        source file changes.
+    """
+    stat = os.stat(path)
+    stamp = (CACHE_FORMAT_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_path = _cache_path(path)
+    if use_cache:
+        try:
+            with open(cache_path, "rb") as cache_file:
+                cached_stamp, definitions, decks = pickle.load(cache_file)
+            if cached_stamp == stamp:
+                return definitions, decks
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+    with open(path, encoding="utf-8") as source:
+        definitions, decks = compile_definitions(json.load(source))
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "wb") as cache_file:
+                pickle.dump((stamp, definitions, decks), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+    return definitions, decks
+
+
+class CardRegistry:
+    """ Card definitions by id, and factories that build fresh card objects from them.
+
+        Factories are compiled the first time an id is instantiated, so the cost of starting up does not grow
+        with the size of the card pool, and instantiating a card afterwards is a single constructor call.
+    """
+
+    def __init__(self, definitions, decks=None):
+        self.definitions = definitions
+        self.decks = decks or {}
+        self.ids_by_name = {definition.name: card_id for card_id, definition in definitions.items()}
+        self._factories = {}
+
+    @classmethod
+    def load(cls, path=CARD_DATA_PATH, use_cache=True):
+        definitions, decks = load_definitions(path, use_cache)
+        return cls(definitions, decks)
+
+    def _compile(self, card_id):
+        definition = self.definitions[card_id]
+        name, subtypes, mc = definition.name, definition.subtypes, dict(definition.mc)
+        if definition.impl is not None:
+            factory = getattr(cards_impl, definition.impl)
+        elif definition.type == "Land":
+            abilities = [MANA_ABILITIES[color] for color in definition.mana]
+            types = definition.types
+
+            def factory():
+                return cards.Land(name, types, subtypes, list(abilities))
+        elif definition.type == "Creature":
+            power, toughness, cannot_block = definition.power, definition.toughness, definition.cannot_block
+
+            def factory():
+                return cards.Creature(name, subtypes, mc, power, toughness, cannot_block)
+        elif definition.type in ("Sorcery", "Instant", "Enchantment"):
+            card_class = getattr(cards, definition.type)
+
+            def factory():
+                return card_class(name, subtypes, mc)
+        elif definition.type == "Artifact":
+            abilities = [MANA_ABILITIES[color] for color in definition.mana]
+
+            def factory():
+                return cards.Artifact(name, subtypes, mc, list(abilities))
+        else:
+            raise ValueError("Card '%s' has unsupported type '%s'" % (card_id, definition.type))
+        self._factories[card_id] = factory
+        return factory
+
+    def create(self, card_id):
+        factory = self._factories.get(card_id)
+        if factory is None:
+            factory = self._compile(card_id)
+        return factory()
+
+    def create_by_name(self, name):
+        return self.create(self.ids_by_name[name])
+
+    def create_cards(self, card_ids):
+        return [self.create(card_id) for card_id in card_ids]
+
+    def create_deck(self, deck_name):
+        return self.create_cards(self.decks[deck_name])
+
+
+_registry = None
+
+
+def get_registry():
+    """ The registry of the bundled card database, loaded on first use. """
+    global _registry
+    if _registry is None:
+        _registry = CardRegistry.load()
+    return _registry
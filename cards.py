@@ -1,4 +1,4 @@
-import itertools
+import events
 
 
 class Card:
@@ -10,6 +10,9 @@ class Card:
         self.is_tapped = False
         self.is_commander = False
 
+    # event type -> name of the handler method, for permanents with triggered abilities, see events.EventBus
+    triggers = {}
+
     def play(self, owner, game, verbose=False):
         self.owner = owner
 
@@ -45,8 +48,7 @@ class Land(Card):
 
     def play(self, owner, game, verbose=False):
         super(Land, self).play(owner, game, verbose)
-        if verbose:
-            print("    playing %s" % (self.name))
+        events.emit(game, events.ZoneChangeEvent(owner.index, self.name, "hand", "battlefield"), verbose)
 
         game.battlefield.append(self)
         self.owner.can_play_land = False
@@ -60,19 +62,65 @@ class Land(Card):
         return self.name
 
 
-class Sorcery(Card):
+class Resolver:
+    """ Target enumeration and resolution of a spell.
+
+        While a spell that requires a choice is being cast, get_legal_moves returns get_moves() and make_move
+        passes the chosen move to resolve(). Spells that do not require a choice are resolved as they are cast,
+        with move None. This base resolver does nothing and only offers to pass.
+    """
+    requires_choice = True
+    is_removal = False
+
+    def has_legal_targets(self, game, player):
+        return True
+
+    def get_moves(self, game, player):
+        return ["Pass"]
+
+    def resolve(self, game, player, move, verbose=False):
+        pass
+
+    def describe_move(self, game, player, move):
+        """ A hashable description of a move, see Game.get_move_key. """
+        return move,
+
+
+DEFAULT_RESOLVER = Resolver()
+
+# resolvers of spells that are not implemented by a subclass, by card name, see spells.py
+SPELL_RESOLVERS = {}
+
+
+def register_resolver(name, resolver):
+    SPELL_RESOLVERS[name] = resolver
+
+
+class Spell(Card):
+    """ A card that is cast and then resolved by its resolver instead of entering the battlefield. """
+
+    @property
+    def resolver(self):
+        return SPELL_RESOLVERS.get(self.name, DEFAULT_RESOLVER)
+
+    def play(self, owner, game, verbose=False):
+        super(Spell, self).play(owner, game)
+        events.emit(game, events.CastEvent(owner.index, self.name), verbose)
+        resolver = self.resolver
+        if resolver.requires_choice:
+            owner.casting_spell = self
+        else:
+            resolver.resolve(game, owner, None, verbose)
+            owner.graveyard.append(self)
+
+
+class Sorcery(Spell):
     def __init__(self, name, subtypes, mc):
         super(Sorcery, self).__init__()
         self.name = name
         self.mc = {x: mc.get(x, 0) + self.mc.get(x, 0) for x in set(mc).union(self.mc)}
         self.subtypes = subtypes
 
-    def play(self, owner, game, verbose=False):
-        super(Sorcery, self).play(owner, game)
-        if verbose:
-            print("    casting %s" % (self.name))
-        owner.casting_spell = self.name
-
     def __repr__(self):
         return self.name
 
@@ -93,19 +141,12 @@ class Creature(Card):
         self.is_dead = False
         self.summoning_sick = True
         self.damage_taken = 0
-        self.damage_to_assign = 0
-        self.is_attacking = []
-        self.is_blocked_by = []
-        self.is_blocking = []
-        self.damage_assignment_order = []
-        self.damage_assignment = []
         # Consider adding a functional creature card instantiation argument that sets text automatically
         self.cannot_block = cannot_block
 
     def play(self, owner, game, verbose=False):
         super(Creature, self).play(owner, game)
-        if verbose:
-            print("    casting %s" % (self.name))
+        events.emit(game, events.CastEvent(owner.index, self.name), verbose)
         game.battlefield.append(self)
 
     def take_damage(self, amount):
@@ -117,23 +158,10 @@ class Creature(Card):
         # In current engine, combat is 1v1 (active vs nonactive)
         victim = game.nonactive_player
         victim.lose_life(self.power)
+        game.mark_dirty(victim)
         
         if self.is_commander:
-            if self not in game.commander_damage:
-                game.commander_damage[self] = {}
-            
-            current_damage = game.commander_damage[self].get(victim.index, 0)
-            game.commander_damage[self][victim.index] = current_damage + self.power
-
-    def set_damage_assignment_order(self, order):
-        all_permutations = list(itertools.permutations(self.is_blocked_by))
-        self.damage_assignment_order = list(all_permutations[order])
-        self.damage_to_assign = self.power
-        self.damage_assignment = [0] * len(self.damage_assignment_order)
-
-    def assign_damage(self, index, amount):
-        self.damage_assignment[index] += amount
-        self.damage_to_assign -= amount
+            game.commander_damage.add(self, victim.index, self.power)
 
     def __repr__(self):
         return self.name
@@ -142,7 +170,7 @@ class Creature(Card):
         return self.name
 
 
-class Instant(Card):
+class Instant(Spell):
     def __init__(self, name, subtypes, mc):
         super(Instant, self).__init__()
         self.name = name
@@ -150,12 +178,6 @@ class Instant(Card):
         self.subtypes = subtypes
         self.is_instant = True
 
-    def play(self, owner, game, verbose=False):
-        super(Instant, self).play(owner, game)
-        if verbose:
-            print("    casting %s" % (self.name))
-        owner.casting_spell = self.name
-
     def __repr__(self):
         return self.name
 
@@ -176,8 +198,7 @@ class Artifact(Card):
 
     def play(self, owner, game, verbose=False):
         super(Artifact, self).play(owner, game)
-        if verbose:
-            print("    playing %s" % (self.name))
+        events.emit(game, events.CastEvent(owner.index, self.name), verbose)
         game.battlefield.append(self)
 
     def use_tapped_ability(self, index):
@@ -201,8 +222,7 @@ class Enchantment(Card):
 
     def play(self, owner, game, verbose=False):
         super(Enchantment, self).play(owner, game)
-        if verbose:
-            print("    playing %s" % (self.name))
+        events.emit(game, events.CastEvent(owner.index, self.name), verbose)
         game.battlefield.append(self)
 
     def __repr__(self):
@@ -222,8 +242,7 @@ class Planeswalker(Card):
 
     def play(self, owner, game, verbose=False):
         super(Planeswalker, self).play(owner, game)
-        if verbose:
-            print("    playing %s" % (self.name))
+        events.emit(game, events.CastEvent(owner.index, self.name), verbose)
         game.battlefield.append(self)
 
     def __repr__(self):
@@ -1,6 +1,8 @@
-from cards import Artifact, Land, Sorcery, Instant, Enchantment, Creature
+from cards import Artifact, Land, Sorcery, Instant, Enchantment, Creature, Resolver
 import random
 
+import events
+
 class SolRing(Artifact):
     def __init__(self):
         super(SolRing, self).__init__("Sol Ring", ["Artifact"], {'Generic': 1})
@@ -49,29 +51,21 @@ class CommandTower(Land):
             color = identity[0]
             card.owner.manapool[color] = card.owner.manapool.get(color, 0) + 1
 
-class Cultivate(Sorcery):
-    def __init__(self):
-        super(Cultivate, self).__init__("Cultivate", ["Sorcery"], {'Generic': 2, 'Green': 1})
+class CultivateResolver(Resolver):
+    requires_choice = False
 
-    def play(self, owner, game, verbose=False):
-        super(Cultivate, self).play(owner, game, verbose)
-        
+    def resolve(self, game, owner, move, verbose=False):
         # Search logic
         # Find up to 2 basic lands
-        found_lands_indices = []
-        for i, card in enumerate(owner.deck):
-            if isinstance(card, Land) and "Basic Land" in card.types:
-                found_lands_indices.append(i)
-                if len(found_lands_indices) >= 2:
-                    break
+        found_lands = [card for card in owner.deck.find_all("Basic Land") if isinstance(card, Land)][:2]
         
-        # Process found lands (reverse order to pop correctly)
         # Note: In real game, user chooses. Here we take first 2 found.
-        found_lands_indices.sort(reverse=True)
+        # The one nearest the top goes onto the battlefield.
+        found_lands.sort(key=owner.deck.position, reverse=True)
         
         lands_to_process = []
-        for index in found_lands_indices:
-            lands_to_process.append(owner.deck.pop(index))
+        for land in found_lands:
+            lands_to_process.append(owner.deck.take(land))
             
         if len(lands_to_process) > 0:
             # Put one onto battlefield tapped
@@ -79,25 +73,27 @@ class Cultivate(Sorcery):
             land1.owner = owner # Ensure owner is set
             game.battlefield.append(land1)
             land1.is_tapped = True
-            if verbose:
-                print(f"    Cultivate: Put {land1.name} onto battlefield tapped.")
+            events.emit(game, events.ZoneChangeEvent(owner.index, land1.name, "library", "battlefield"), verbose)
                 
         if len(lands_to_process) > 1:
             # Put second into hand
             land2 = lands_to_process[1]
             owner.hand.append(land2)
-            if verbose:
-                print(f"    Cultivate: Put {land2.name} into hand.")
+            events.emit(game, events.ZoneChangeEvent(owner.index, land2.name, "library", "hand"), verbose)
                 
         owner.shuffle_deck()
 
-class SwordsToPlowshares(Instant):
+class Cultivate(Sorcery):
+    resolver = CultivateResolver()
+
     def __init__(self):
-        super(SwordsToPlowshares, self).__init__("Swords to Plowshares", ["Instant"], {'White': 1})
+        super(Cultivate, self).__init__("Cultivate", ["Sorcery"], {'Generic': 2, 'Green': 1})
 
-    def play(self, owner, game, verbose=False):
-        super(SwordsToPlowshares, self).play(owner, game, verbose)
-        
+class SwordsToPlowsharesResolver(Resolver):
+    requires_choice = False
+    is_removal = True
+
+    def resolve(self, game, owner, move, verbose=False):
         # Simplified Targeting: Target first creature of an opponent
         # In real game, need target selection logic
         targets = []
@@ -107,22 +103,25 @@ class SwordsToPlowshares(Instant):
         
         if targets:
             target = targets[0] # Just pick first for now
-            if verbose:
-                print(f"    Swords to Plowshares: Exiling {target.name}. Controller gains {target.power} life.")
-            
+            events.emit(game, events.ZoneChangeEvent(target.owner.index, target.name, "battlefield", "exile"),
+                        verbose)
+
             # Exile
             game.battlefield.remove(target)
             # Gain life
             target.owner.life += target.power
 
-class CyclonicRift(Instant):
+class SwordsToPlowshares(Instant):
+    resolver = SwordsToPlowsharesResolver()
+
     def __init__(self):
-        super(CyclonicRift, self).__init__("Cyclonic Rift", ["Instant"], {'Generic': 1, 'Blue': 1})
-        # Overload not implemented yet as a cost choice
+        super(SwordsToPlowshares, self).__init__("Swords to Plowshares", ["Instant"], {'White': 1})
 
-    def play(self, owner, game, verbose=False):
-        super(CyclonicRift, self).play(owner, game, verbose)
-        
+class CyclonicRiftResolver(Resolver):
+    requires_choice = False
+    is_removal = True
+
+    def resolve(self, game, owner, move, verbose=False):
         # Base effect: Return target nonland permanent to hand
         # Simplified Targeting: Target first nonland permanent of an opponent
         targets = []
@@ -132,33 +131,50 @@ class CyclonicRift(Instant):
         
         if targets:
             target = targets[0]
-            if verbose:
-                print(f"    Cyclonic Rift: Returning {target.name} to hand.")
-            
+            events.emit(game, events.ZoneChangeEvent(target.owner.index, target.name, "battlefield", "hand"),
+                        verbose)
+
             game.battlefield.remove(target)
             target.owner.hand.append(target)
 
+class CyclonicRift(Instant):
+    resolver = CyclonicRiftResolver()
+
+    def __init__(self):
+        super(CyclonicRift, self).__init__("Cyclonic Rift", ["Instant"], {'Generic': 1, 'Blue': 1})
+        # Overload not implemented yet as a cost choice
+
+def create_treasure(owner, game, verbose=False):
+    # Simplified: just an Artifact named "Treasure" whose mana ability does not sacrifice it
+    treasure = Artifact("Treasure", ["Artifact", "Token"], {'Generic': 0}, [lambda c: c.owner.add_mana({'Generic': 1})])
+    treasure.owner = owner
+    game.battlefield.append(treasure)
+    events.emit(game, events.ZoneChangeEvent(owner.index, treasure.name, "none", "battlefield"), verbose)
+    return treasure
+
 class RhysticStudy(Enchantment):
+    triggers = {events.CastEvent: "on_spell_cast"}
+
     def __init__(self):
         super(RhysticStudy, self).__init__("Rhystic Study", ["Enchantment"], {'Generic': 2, 'Blue': 1})
 
-    def play(self, owner, game, verbose=False):
-        super(RhysticStudy, self).play(owner, game, verbose)
-        # In a real implementation, this would register a trigger listener
-        # For now, we just place it on the battlefield.
-        # The trigger logic would need to be in Game.play_card or similar.
-        if verbose:
-            print("    Rhystic Study: (Trigger logic not fully implemented)")
+    def on_spell_cast(self, game, event, verbose=False):
+        # Whenever an opponent casts a spell, draw a card unless that player pays {1}
+        # Simplified: opponents never pay, the mana they have floating is already committed to the spell
+        if event.player != self.owner.index:
+            game.draw_card(self.owner, verbose)
 
 class SmotheringTithe(Enchantment):
+    triggers = {events.DrawEvent: "on_card_drawn"}
+
     def __init__(self):
         super(SmotheringTithe, self).__init__("Smothering Tithe", ["Enchantment"], {'Generic': 3, 'White': 1})
 
-    def play(self, owner, game, verbose=False):
-        super(SmotheringTithe, self).play(owner, game, verbose)
-        # Similar to Rhystic Study, needs trigger listener on draw
-        if verbose:
-            print("    Smothering Tithe: (Trigger logic not fully implemented)")
+    def on_card_drawn(self, game, event, verbose=False):
+        # Whenever an opponent draws a card, create a Treasure unless that player pays {2}
+        # Simplified: opponents never pay
+        if event.player != self.owner.index:
+            create_treasure(self.owner, game, verbose)
 
 class DocksideExtortionist(Creature):
     def __init__(self):
@@ -174,22 +190,13 @@ class DocksideExtortionist(Creature):
                 if isinstance(permanent, Artifact) or isinstance(permanent, Enchantment):
                     count += 1
         
-        if verbose:
-            print(f"    Dockside Extortionist: Creating {count} Treasures.")
-            
-        # Create Treasures (Simplified: just Artifacts named "Treasure")
         for _ in range(count):
-            treasure = Artifact("Treasure", ["Artifact", "Token"], {'Generic': 0}, [lambda c: c.owner.add_mana({'Generic': 1})]) # Simplified mana ability
-            treasure.owner = owner
-            game.battlefield.append(treasure)
+            create_treasure(owner, game, verbose)
 
-class DemonicTutor(Sorcery):
-    def __init__(self):
-        super(DemonicTutor, self).__init__("Demonic Tutor", ["Sorcery"], {'Generic': 1, 'Black': 1})
+class DemonicTutorResolver(Resolver):
+    requires_choice = False
 
-    def play(self, owner, game, verbose=False):
-        super(DemonicTutor, self).play(owner, game, verbose)
-        
+    def resolve(self, game, owner, move, verbose=False):
         # Search library for any card
         if len(owner.deck) > 0:
             # Simplified: Just take the first card (or random)
@@ -197,9 +204,14 @@ class DemonicTutor(Sorcery):
             # For simulation/AI, we might pick best card.
             # Here, we just pick the last card (top of deck in pop order logic, though usually search implies choice)
             # Let's just pick the first card in the list for simplicity of test
-            card = owner.deck.pop(0)
+            card = owner.deck.take(owner.deck[0])
             owner.hand.append(card)
-            if verbose:
-                print(f"    Demonic Tutor: Put {card.name} into hand.")
+            events.emit(game, events.ZoneChangeEvent(owner.index, card.name, "library", "hand"), verbose)
             
             owner.shuffle_deck()
+
+class DemonicTutor(Sorcery):
+    resolver = DemonicTutorResolver()
+
+    def __init__(self):
+        super(DemonicTutor, self).__init__("Demonic Tutor", ["Sorcery"], {'Generic': 1, 'Black': 1})
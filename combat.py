@@ -0,0 +1,99 @@
+import itertools
+
+import events
+
+
+class Combat:
+    """ The attackers, blocks and combat damage assignments of one combat.
+
+        Attackers are referred to by their index in attackers. blocked_by[i] holds the blockers of attacker i in
+        the order they were declared, damage_order[i] the damage assignment order announced for them (None until
+        then) and damage[i] the damage assigned to each of them in that order. Resolving the combat only visits
+        the creatures in it, and a finished combat is dropped as a whole instead of resetting every creature.
+    """
+
+    def __init__(self, attackers=()):
+        self.attackers = list(attackers)
+        self.blockers = []
+        self.blocked_by = [[] for _ in self.attackers]
+        self.damage_order = [None] * len(self.attackers)
+        self.damage = [None] * len(self.attackers)
+        self.damage_to_assign = [0] * len(self.attackers)
+        # the attacker, and the position in its damage assignment order, that damage is assigned to next
+        self.attacker_counter = 0
+        self.blocker_counter = 0
+        # with factored declarations, the answers given so far for the eligible attackers or blockers in turn
+        self.declaration = []
+
+    def declare_blocks(self, blockers, assignment):
+        """ assignment holds for every blocker the index of the attacker it blocks, or len(attackers) for none. """
+        no_block = len(self.attackers)
+        for blocker, attacker_index in zip(blockers, assignment):
+            if attacker_index != no_block:
+                self.blocked_by[attacker_index].append(blocker)
+                self.blockers.append(blocker)
+
+    def get_unordered_attacker(self):
+        """ The index of the first blocked attacker without a damage assignment order, or -1. """
+        for i, blockers in enumerate(self.blocked_by):
+            if blockers and self.damage_order[i] is None:
+                return i
+        return -1
+
+    def set_damage_assignment_order(self, attacker_index, order):
+        """ order indexes the permutations of the attacker's blockers, in the order of itertools.permutations. """
+        blockers = self.blocked_by[attacker_index]
+        self.damage_order[attacker_index] = list(next(itertools.islice(itertools.permutations(blockers), order,
+                                                                       None)))
+        self.damage[attacker_index] = [0] * len(blockers)
+        self.damage_to_assign[attacker_index] = self.attackers[attacker_index].power
+
+    def get_current_assignment(self):
+        """ The attacker index and the position in its damage assignment order that damage is assigned to next,
+            or None when all blocked attackers have assigned their damage. Unblocked attackers are skipped.
+        """
+        while self.attacker_counter < len(self.attackers) and self.damage_order[self.attacker_counter] is None:
+            self.attacker_counter += 1
+        if self.attacker_counter >= len(self.attackers):
+            return None
+        return self.attacker_counter, self.blocker_counter
+
+    def get_possible_damage_assignments(self):
+        current = self.get_current_assignment()
+        if current is None:
+            return ["Pass"]
+        attacker_index, index = current
+        order = self.damage_order[attacker_index]
+        damage_to_assign = self.damage_to_assign[attacker_index]
+        blocker = order[index]
+        remaining_health = blocker.toughness - blocker.damage_taken
+        if damage_to_assign < remaining_health or index == len(order) - 1:
+            return [damage_to_assign]
+        return list(range(remaining_health, damage_to_assign + 1))
+
+    def assign_damage(self, amount):
+        attacker_index, index = self.get_current_assignment()
+        self.damage[attacker_index][index] += amount
+        self.damage_to_assign[attacker_index] -= amount
+        self.blocker_counter += 1
+        if self.blocker_counter >= len(self.damage_order[attacker_index]):
+            self.blocker_counter = 0
+            self.attacker_counter += 1
+
+    def apply_damage(self, game):
+        """ Deals the combat damage in one pass over the attackers. Returns whether there was any combat. """
+        for i, attacker in enumerate(self.attackers):
+            blockers = self.blocked_by[i]
+            if blockers:
+                order = self.damage_order[i] or blockers
+                damage = self.damage[i] or [0] * len(order)
+                for blocker, amount in zip(order, damage):
+                    game.deal_damage(blocker, amount)
+                    game.deal_damage(attacker, blocker.power)
+                    events.emit(game, events.DamageEvent(attacker.name, blocker.name, amount))
+                    events.emit(game, events.DamageEvent(blocker.name, attacker.name, blocker.power))
+            else:
+                attacker.deal_combat_damage_to_opponent(game)
+                events.emit(game, events.DamageEvent(attacker.name, events.player_name(game.nonactive_player),
+                                                     attacker.power))
+        return len(self.attackers) > 0
@@ -0,0 +1,44 @@
+import numpy as np
+
+LETHAL_COMMANDER_DAMAGE = 21
+
+
+class CommanderDamage:
+    """ Combat damage dealt by each commander to each player, as a dense (commanders x players) array.
+
+        Commanders get a row the first time they deal damage, rows maps them to it. commander_damage[commander]
+        is that row, so commander_damage[commander][victim_index] reads a single entry. Players that took
+        lethal commander damage are collected in lethal as the damage is added, so state-based actions never
+        need to look at the array.
+    """
+
+    def __init__(self, player_count, capacity=4, dtype=np.int32):
+        self.damage = np.zeros((capacity, player_count), dtype=dtype)
+        self.rows = {}
+        self.lethal = set()
+
+    def add(self, commander, victim_index, amount):
+        row = self.rows.get(commander)
+        if row is None:
+            row = self.rows[commander] = len(self.rows)
+            if row >= len(self.damage):
+                self.damage = np.concatenate([self.damage, np.zeros_like(self.damage)])
+        self.damage[row, victim_index] += amount
+        if self.damage[row, victim_index] >= LETHAL_COMMANDER_DAMAGE:
+            self.lethal.add(victim_index)
+
+    def as_array(self):
+        """ The damage of the commanders that dealt any, in the order they first did. """
+        return self.damage[:len(self.rows)]
+
+    def __contains__(self, commander):
+        return commander in self.rows
+
+    def __getitem__(self, commander):
+        return self.damage[self.rows[commander]]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,90 @@
+import abc
+
+import numpy as np
+
+import minimax
+from features import FeatureEncoder
+
+
+def _sigmoid(values):
+    return 1 / (1 + np.exp(-np.clip(values, -50, 50)))
+
+
+class Evaluator(abc.ABC):
+    """ Scores positions for searches that do not play them out.
+
+        evaluate(games, player_indices) returns a numpy array with, for every game, the estimated result in
+        [0, 1] for the player with the matching index: 1 is a win, 0 a loss. Searches collect many positions and
+        score them with one call, so evaluators should work on the whole batch at once.
+    """
+
+    @abc.abstractmethod
+    def evaluate(self, games, player_indices):
+        pass
+
+
+class HeuristicEvaluator(Evaluator):
+    """ minimax.heuristic_value squashed into [0, 1]; a lead of scale points is worth about 73%. """
+
+    def __init__(self, scale=10.0):
+        self.scale = scale
+
+    def evaluate(self, games, player_indices):
+        values = np.empty(len(games))
+        player_indices = np.asarray(player_indices)
+        for player_index in np.unique(player_indices):
+            selected = np.flatnonzero(player_indices == player_index)
+            values[selected] = minimax.heuristic_values(int(player_index), [games[i] for i in selected])
+        return _sigmoid(values / self.scale)
+
+
+class LinearModel:
+    """ A logistic model over FeatureEncoder vectors. """
+
+    def __init__(self, weights, bias=0.0):
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = bias
+
+    def __call__(self, vectors):
+        return _sigmoid(vectors @ self.weights + self.bias)
+
+
+class FeatureEvaluator(Evaluator):
+    """ Scores positions with model, any callable that maps a (batch, encoder.vector_size) float array to a
+        batch of results in [0, 1], such as a LinearModel or a trained network run on the CPU. Each game is
+        encoded from the point of view of its player, and the encoding buffers are reused between calls.
+    """
+
+    def __init__(self, model, encoder=None):
+        self.model = model
+        self.encoder = FeatureEncoder() if encoder is None else encoder
+        self.buffers = self.encoder.allocate(0)
+        self.vectors = np.empty((0, self.encoder.vector_size), dtype=self.encoder.dtype)
+
+    def evaluate(self, games, player_indices):
+        batch_size = len(games)
+        if len(self.vectors) < batch_size:
+            self.buffers = self.encoder.allocate(batch_size)
+            self.vectors = np.empty((batch_size, self.encoder.vector_size), dtype=self.encoder.dtype)
+        buffers = self.encoder.encode_batch(games, player_indices, out=self.buffers)
+        vectors = self.encoder.to_vectors(buffers, out=self.vectors[:batch_size])
+        return np.asarray(self.model(vectors), dtype=np.float64).reshape(batch_size)
+
+
+class RolloutEvaluator(Evaluator):
+    """ The result of one playout, with moves chosen by policy (a rollout policy from rollouts.py) or uniformly at
+        random as in mcts.uct. Plays out the given games.
+    """
+
+    def __init__(self, policy=None):
+        self.policy = policy
+
+    def evaluate(self, games, player_indices):
+        values = np.empty(len(games))
+        for i, (game, player_index) in enumerate(zip(games, player_indices)):
+            moves = game.get_moves()
+            while moves != []:
+                game.make_move(game.rng.choice(moves) if self.policy is None else self.policy.choose(game, moves))
+                moves = game.get_moves()
+            values[i] = game.get_results(player_index)
+        return values
@@ -0,0 +1,189 @@
+import collections
+import json
+import threading
+
+# Typed game events. Events only hold plain values (names, indices, amounts) so that they can be formatted
+# later on the writer thread without the game state having moved on underneath them.
+CastEvent = collections.namedtuple("CastEvent", ["player", "card"])
+TapEvent = collections.namedtuple("TapEvent", ["player", "card"])
+AttackEvent = collections.namedtuple("AttackEvent", ["player", "attackers"])
+DamageEvent = collections.namedtuple("DamageEvent", ["source", "target", "amount"])
+ZoneChangeEvent = collections.namedtuple("ZoneChangeEvent", ["player", "card", "from_zone", "to_zone"])
+DrawEvent = collections.namedtuple("DrawEvent", ["player", "card"])
+
+EVENT_NAMES = {
+    CastEvent: "cast",
+    TapEvent: "tap",
+    AttackEvent: "attack",
+    DamageEvent: "damage",
+    ZoneChangeEvent: "zone_change",
+    DrawEvent: "draw",
+}
+
+
+def format_event(event):
+    """ Human readable one-liner for an event, in the style of the old verbose game prints. """
+    if isinstance(event, CastEvent):
+        return "casting %s" % event.card
+    if isinstance(event, TapEvent):
+        return "tapping %s" % event.card
+    if isinstance(event, AttackEvent):
+        return "attacking with %s" % ", ".join(event.attackers)
+    if isinstance(event, DamageEvent):
+        return "%s deals %d damage to %s" % (event.source, event.amount, event.target)
+    if isinstance(event, DrawEvent):
+        return "drawing %s" % event.card
+    if isinstance(event, ZoneChangeEvent):
+        if event.from_zone == "hand" and event.to_zone == "battlefield":
+            return "playing %s" % event.card
+        return "%s: %s -> %s" % (event.card, event.from_zone, event.to_zone)
+    return str(event)
+
+
+def event_to_dict(event):
+    record = event._asdict()
+    record["event"] = EVENT_NAMES.get(type(event), type(event).__name__)
+    return record
+
+
+def player_name(player):
+    return "player %d" % player.index
+
+
+def emit(game, event, verbose=False):
+    """ Sends an event to the event stream attached to the game, if there is one, and to the permanents
+        subscribed to its type on the game's event bus. Without a stream, verbose games still get the event
+        printed to stdout.
+    """
+    stream = getattr(game, "event_stream", None)
+    if stream is not None:
+        stream.emit(event)
+    elif verbose:
+        print("    " + format_event(event))
+    bus = getattr(game, "event_bus", None)
+    if bus is not None and type(event) in bus.listeners:
+        bus.dispatch(game, event, verbose)
+
+
+class EventBus:
+    """ Dispatches events to the permanents that listen for their type.
+
+        A permanent listens by declaring a triggers dict that maps event types to the names of its handler
+        methods, which are called as handler(game, event, verbose). The bus keeps one list of listeners per
+        event type, so an event only costs a dict lookup unless something on the battlefield cares about it.
+        The Battlefield subscribes permanents as they enter and unsubscribes them as they leave.
+    """
+
+    def __init__(self):
+        self.listeners = {}
+
+    def subscribe(self, permanent):
+        for event_type in permanent.triggers:
+            self.listeners.setdefault(event_type, []).append(permanent)
+
+    def unsubscribe(self, permanent):
+        for event_type in permanent.triggers:
+            listeners = self.listeners.get(event_type)
+            if listeners is not None and permanent in listeners:
+                listeners.remove(permanent)
+                if not listeners:
+                    del self.listeners[event_type]
+
+    def clear(self):
+        self.listeners = {}
+
+    def dispatch(self, game, event, verbose=False):
+        event_type = type(event)
+        # copy, handlers may make permanents enter or leave
+        for permanent in tuple(self.listeners.get(event_type, ())):
+            getattr(permanent, permanent.triggers[event_type])(game, event, verbose)
+
+
+class EventStream:
+    """ An in-memory ring buffer of game events drained by a background writer thread.
+
+        emit() is a single deque append, so the cost of logging a game is a small constant per event. The
+        writer thread formats the events and writes them as JSON lines. When the writer falls behind by more
+        than `capacity` events the oldest ones are dropped, which is counted in `dropped`.
+
+        Copies of a game (made by the search algorithms) do not inherit the stream, so only the real game
+        is logged.
+    """
+
+    def __init__(self, path=None, capacity=65536, flush_interval=0.5, sink=None):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.buffer = collections.deque(maxlen=capacity)
+        self.emitted = 0
+        self.written = 0
+        self._sink = sink
+        self._owns_sink = False
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    @property
+    def dropped(self):
+        return self.emitted - self.written - len(self.buffer)
+
+    def emit(self, event):
+        self.buffer.append(event)
+        self.emitted += 1
+        if len(self.buffer) > self.capacity // 2:
+            self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        if self._sink is None and self.path is not None:
+            self._sink = open(self.path, "a", encoding="utf-8")
+            self._owns_sink = True
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="open-mtg-event-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._owns_sink:
+            self._sink.close()
+            self._sink = None
+            self._owns_sink = False
+
+    def flush(self):
+        """ Writes out everything currently buffered. Called from the writer thread, or after close(). """
+        lines = []
+        while self.buffer:
+            try:
+                event = self.buffer.popleft()
+            except IndexError:
+                break
+            lines.append(json.dumps(event_to_dict(event), separators=(",", ":")))
+        if lines and self._sink is not None:
+            self._sink.write("\n".join(lines) + "\n")
+            self._sink.flush()
+        self.written += len(lines)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __deepcopy__(self, memo):
+        return None
+
+    def __getstate__(self):
+        raise TypeError("EventStream cannot be pickled, attach a new stream to the game in the other process")
@@ -0,0 +1,118 @@
+import numpy as np
+
+from phases import Phases
+from cards import Creature, Land
+
+MANA_COLORS = ['White', 'Blue', 'Black', 'Red', 'Green', 'Colorless']
+PHASES = list(Phases)
+_PHASE_SLOTS = {phase: i for i, phase in enumerate(PHASES)}
+
+PLAYER_FEATURES = ["life", "hand_size", "library_size", "graveyard_size", "has_lost", "is_active",
+                   "has_priority"] + ["mana_" + color.lower() for color in MANA_COLORS]
+PERMANENT_FEATURES = ["present", "controller", "is_creature", "is_land", "power", "toughness", "damage_taken",
+                      "is_tapped", "summoning_sick", "is_commander"]
+
+_LIFE, _HAND, _LIBRARY, _GRAVEYARD, _LOST, _ACTIVE, _PRIORITY = range(7)
+_MANA = 7
+(_PRESENT, _CONTROLLER, _CREATURE, _LAND, _POWER, _TOUGHNESS, _DAMAGE, _TAPPED, _SICK,
+ _COMMANDER) = range(len(PERMANENT_FEATURES))
+
+
+class FeatureEncoder:
+    """ Turns games into fixed-shape numpy arrays.
+
+        Every game is encoded from the point of view of one player: player rows and permanent controllers are
+        rotated so that the perspective player is always slot 0. The output is a dict of arrays:
+
+        players:     (batch, max_players, len(PLAYER_FEATURES))
+        permanents:  (batch, max_permanents, len(PERMANENT_FEATURES))
+        phase:       (batch, len(Phases)) one-hot
+
+        Permanents past max_permanents are not encoded. Buffers are allocated once with allocate() and
+        overwritten by every call, so evaluators can encode thousands of states without allocating.
+    """
+
+    def __init__(self, max_players=4, max_permanents=64, dtype=np.float32):
+        self.max_players = max_players
+        self.max_permanents = max_permanents
+        self.dtype = dtype
+
+    @property
+    def vector_size(self):
+        return (self.max_players * len(PLAYER_FEATURES) + self.max_permanents * len(PERMANENT_FEATURES) +
+                len(PHASES))
+
+    def allocate(self, batch_size):
+        return {
+            "players": np.zeros((batch_size, self.max_players, len(PLAYER_FEATURES)), dtype=self.dtype),
+            "permanents": np.zeros((batch_size, self.max_permanents, len(PERMANENT_FEATURES)), dtype=self.dtype),
+            "phase": np.zeros((batch_size, len(PHASES)), dtype=self.dtype),
+        }
+
+    def encode(self, game, perspective=None, out=None):
+        """ Encodes a single game into a batch of size one. """
+        if perspective is None:
+            perspective = game.player_with_priority.index
+        return self.encode_batch([game], [perspective], out)
+
+    def encode_batch(self, games, perspectives=None, out=None):
+        """ Encodes a list of games. perspectives holds one player index per game and defaults to the player
+            with priority in each game. out is reused if given and must hold at least len(games) rows; the
+            returned buffers are views of its first len(games) rows.
+        """
+        if out is None:
+            out = self.allocate(len(games))
+        players_out = out["players"]
+        permanents_out = out["permanents"]
+        phase_out = out["phase"]
+        batch_size = len(games)
+        players_out[:batch_size] = 0
+        permanents_out[:batch_size] = 0
+        phase_out[:batch_size] = 0
+
+        for b, game in enumerate(games):
+            perspective = game.player_with_priority.index if perspectives is None else perspectives[b]
+            player_count = len(game.players)
+            for player in game.players:
+                slot = (player.index - perspective) % player_count
+                if slot >= self.max_players:
+                    continue
+                row = players_out[b, slot]
+                row[_LIFE] = player.life
+                row[_HAND] = len(player.hand)
+                row[_LIBRARY] = len(player.deck)
+                row[_GRAVEYARD] = len(player.graveyard)
+                row[_LOST] = player.has_lost
+                row[_ACTIVE] = player is game.active_player
+                row[_PRIORITY] = player is game.player_with_priority
+                for i, color in enumerate(MANA_COLORS):
+                    row[_MANA + i] = player.manapool.get(color, 0)
+
+            for i, permanent in enumerate(game.battlefield[:self.max_permanents]):
+                row = permanents_out[b, i]
+                row[_PRESENT] = 1
+                row[_CONTROLLER] = (permanent.owner.index - perspective) % player_count
+                row[_LAND] = isinstance(permanent, Land)
+                row[_TAPPED] = permanent.is_tapped
+                row[_COMMANDER] = permanent.is_commander
+                if isinstance(permanent, Creature):
+                    row[_CREATURE] = 1
+                    row[_POWER] = permanent.power
+                    row[_TOUGHNESS] = permanent.toughness
+                    row[_DAMAGE] = permanent.damage_taken
+                    row[_SICK] = permanent.summoning_sick
+
+            phase_out[b, _PHASE_SLOTS[game.current_phase_index]] = 1
+        return {name: buffer[:batch_size] for name, buffer in out.items()}
+
+    def to_vectors(self, buffers, out=None):
+        """ Flattens encoded buffers into one (batch, vector_size) matrix. """
+        batch_size = buffers["phase"].shape[0]
+        if out is None:
+            out = np.empty((batch_size, self.vector_size), dtype=self.dtype)
+        player_width = self.max_players * len(PLAYER_FEATURES)
+        permanent_width = self.max_permanents * len(PERMANENT_FEATURES)
+        out[:, :player_width] = buffers["players"].reshape(batch_size, -1)
+        out[:, player_width:player_width + permanent_width] = buffers["permanents"].reshape(batch_size, -1)
+        out[:, player_width + permanent_width:] = buffers["phase"]
+        return out
@@ -1,10 +1,14 @@
 import math
-import random
 import logging
 import numpy as np
 import itertools
 
+import events
+from battlefield import Battlefield
+from combat import Combat
+from commander_damage import CommanderDamage
 from phases import Phases
+from rng import GameRandom
 from cards import Card, Sorcery, Creature, Land
 
 
@@ -12,30 +16,46 @@ from cards import Card, Sorcery, Creature, Land
 
 
 class Game:
-    def __init__(self, players):
+    def __init__(self, players, seed=None, rng=None, hidden_library_order=False, factored_combat=False):
+        """ rng is a GameRandom; when it is not given, one is created from seed. With hidden_library_order,
+            libraries are not physically shuffled but sample their top card as it is drawn, see Library.
+            With factored_combat, attackers and blockers are declared one creature per move followed by a
+            "Confirm" move, instead of one move out of every possible declaration.
+        """
         self.players = players
+        self.rng = None
+        self.set_rng(GameRandom(seed) if rng is None else rng)
         for index, player in enumerate(self.players):
             player.index = index
+            player.deck.hidden_order = hidden_library_order
 
         self.starting_hand_size = 7
-        self.attackers = []
-        self.blockers = []
-        self.battlefield = []
+        self.factored_combat = factored_combat
+        self.combat = Combat()
+        self.battlefield = Battlefield()
         self.stack_is_empty = True
         self.temporary_zone = []
         self.damage_targets = []
-        self.active_player = self.players[random.randint(0, len(self.players) - 1)]
+        self.active_player = self.players[self.rng.randint(0, len(self.players) - 1)]
         self.nonactive_player = self.players[(self.active_player.index + 1) % len(self.players)]
         self.player_just_moved = self.active_player
         self.player_with_priority = self.active_player
         self.current_phase_index = Phases.UNTAP_STEP
-        # two counters to help keep track of damage assignment - per attacker - per blocker, respectively
-        self.attacker_counter = 0
-        self.attacker_counter = 0
-        self.blocker_counter = 0
-        # Commander Damage Tracking: [source_commander_id][victim_player_index]
-        # Using a nested dictionary for flexibility: {source_card_object: {victim_index: damage_amount}}
-        self.commander_damage = {}
+        self.turn_number = 1
+        # Commander Damage Tracking: [source_commander][victim_player_index]
+        self.commander_damage = CommanderDamage(len(self.players))
+        # creatures and players touched since the last state-based actions check, an insertion ordered set
+        self.sba_dirty = {}
+        # Optional events.EventStream that receives the structured log of this game
+        self.event_stream = None
+        self.event_bus = events.EventBus()
+        self.battlefield.event_bus = self.event_bus
+
+    def set_rng(self, rng):
+        """ Makes rng the source of randomness of the game and its players. """
+        self.rng = rng
+        for player in self.players:
+            player.rng = rng
 
     def update_damage_targets(self):
         self.damage_targets = []
@@ -81,41 +101,12 @@ class Game:
                 player.manapool[mana] -= 1
                 player.generic_debt -= 1
             return True
-        if player.casting_spell != "":
-            if player.casting_spell == "Vengeance":
-                dead_creature = self.battlefield[move]
-                self.battlefield.remove(dead_creature)
-                dead_creature.owner.graveyard.append(dead_creature)
-            if player.casting_spell == "Stone Rain":
-                destroyed_land = self.battlefield[move]
-                self.battlefield.remove(destroyed_land)
-                destroyed_land.owner.graveyard.append(destroyed_land)
-            if player.casting_spell == "Index":
-                for i in range(len(move)):
-                    indexed_card = player.deck.pop()
-                    indexed_card.deck_location_known = True
-                    self.temporary_zone.append(indexed_card)
-                # TODO: Consider if the logic behind declaring blockers, declaring attackers and assigning combat damage
-                #       can be simplified in a similar manner by allowing moves to be a list of lists
-                for index in move:
-                    player.deck.append(self.temporary_zone[index])
-                self.temporary_zone = []
-            if player.casting_spell == "Lava Axe":
-                self.players[move].life -= 5
-            if player.casting_spell == "Rampant Growth":
-                if not move == "Refuse":
-                    land_index = player.find_land_in_library(move)
-                    land = player.deck.pop(land_index)
-                    self.battlefield.append(land)
-                    land.is_tapped = False
-                    land.owner = player
-                player.shuffle_deck()
-            if player.casting_spell == "Volcanic Hammer":
-                self.update_damage_targets()
-                self.damage_targets[move].take_damage(3)
-            if player.casting_spell == "Sacred Nectar":
-                player.life += 4
-            player.casting_spell = ""
+        if player.casting_spell is not None:
+            spell = player.casting_spell
+            spell.resolver.resolve(self, player, move, verbose)
+            player.casting_spell = None
+            player.graveyard.append(spell)
+            self.check_state_based_actions()
             return True
 
         if move is "Pass":
@@ -129,6 +120,7 @@ class Game:
             callable_permanents, ability_indices = player.get_activated_abilities(self)
             if move < len(playable_indices):
                 player.play_card(playable_indices[move], self, verbose)
+                self.check_state_based_actions()
             else:
                 move -= len(playable_indices)
                 for i in range(len(ability_indices)):
@@ -136,54 +128,129 @@ class Game:
                         move -= ability_indices[i]
                     else:
                         callable_permanents[i].use_tapped_ability(move - 1)
+                        events.emit(self, events.TapEvent(player.index, callable_permanents[i].name), verbose)
 
         if self.current_phase_index == Phases.DECLARE_ATTACKERS_STEP:
             attacking_player = self.active_player
-            attacking_player.has_attacked = True
             eligible_attackers = attacking_player.get_eligible_attackers(self)
-            xs = list(range(len(eligible_attackers)))
-            powerset = list(itertools.chain.from_iterable(itertools.combinations(xs, n) for n in range(len(xs) + 1)))
-            element = powerset[move]
-            chosen_attackers = [eligible_attackers[i] for i in element]
-            self.attackers = chosen_attackers
-            for attacker in self.attackers:
+            if self.factored_combat:
+                if move != "Confirm":
+                    self.combat.declaration.append(move)
+                    return True
+                attackers = [attacker for attacker, attacks in zip(eligible_attackers, self.combat.declaration)
+                             if attacks]
+            else:
+                attackers = self.get_attacker_combination(eligible_attackers, move)
+            attacking_player.has_attacked = True
+            self.combat = Combat(attackers)
+            for attacker in self.combat.attackers:
                 attacker.is_tapped = True
+            if self.combat.attackers:
+                events.emit(self, events.AttackEvent(attacking_player.index,
+                                                     tuple(attacker.name for attacker in self.combat.attackers)),
+                            verbose)
         if self.current_phase_index == Phases.DECLARE_BLOCKERS_STEP:
             blocking_player = self.nonactive_player
-            blocking_player.has_blocked = True
             eligible_blockers = blocking_player.get_eligible_blockers(self)
+            if self.factored_combat and move != "Confirm":
+                self.combat.declaration.append(move)
+                return True
+            blocking_player.has_blocked = True
             if len(eligible_blockers) is 0:
                 return -1
-            all_blocking_assignments = list(range(np.power(len(self.attackers) + 1, len(eligible_blockers))))
-            reshaped_assignments = np.reshape(all_blocking_assignments,
-                                              ([len(self.attackers) + 1] * len(eligible_blockers)))
-            blocking_assignments = np.argwhere(reshaped_assignments == move)[0]
-            for i in range(len(blocking_assignments)):
-                if blocking_assignments[i] != len(self.attackers):
-                    self.attackers[blocking_assignments[i]].is_blocked_by.append(eligible_blockers[i])
-                    eligible_blockers[i].is_blocking.append(self.attackers[blocking_assignments[i]])
-                    self.blockers.append(eligible_blockers[i])
+            if self.factored_combat:
+                assignment = self.combat.declaration
+            else:
+                assignment = self.get_blocking_assignment(len(eligible_blockers), move)
+            self.combat.declare_blocks(eligible_blockers, assignment)
         # for each attacker that’s become blocked, the active player announces the damage assignment order
         if self.current_phase_index == Phases.DECLARE_BLOCKERS_STEP_509_2:
-            for i in range(len(self.attackers)):
-                if len(self.attackers[i].is_blocked_by) is not 0:
-                    if len(self.attackers[i].damage_assignment_order) is 0:
-                        self.attackers[i].set_damage_assignment_order(move)
-                        return 1
+            attacker_index = self.combat.get_unordered_attacker()
+            if attacker_index >= 0:
+                self.combat.set_damage_assignment_order(attacker_index, move)
+                return 1
             return -1
         # A blocked creature assigns its combat damage to the creatures blocking it
         if self.current_phase_index == Phases.COMBAT_DAMAGE_STEP_510_1c:
-            self.assign_damage_deterministically(player,
-                                                 self.attackers[self.attacker_counter], self.blocker_counter, move)
-            self.blocker_counter += 1
-            if self.blocker_counter >= len(self.attackers[self.attacker_counter].is_blocked_by):
-                self.blocker_counter = 0
-                self.attacker_counter += 1
-            # return all_done
-
-    def assign_damage_deterministically(self, player, attacker, index, amount):
-        attacker.assign_damage(index, amount)
-        return attacker.damage_to_assign > 0
+            self.combat.assign_damage(move)
+
+    @staticmethod
+    def get_attacker_combination(eligible_attackers, move):
+        """ The attackers declared by a move in the declare attackers step. Moves index the power set of the
+            eligible attackers, ordered by size and then lexicographically like itertools.combinations.
+        """
+        n = len(eligible_attackers)
+        size = 0
+        while move >= math.comb(n, size):
+            move -= math.comb(n, size)
+            size += 1
+        chosen = []
+        start = 0
+        for remaining in range(size, 0, -1):
+            # skip combinations starting before index i until the move falls into one of them
+            i = start
+            while move >= math.comb(n - i - 1, remaining - 1):
+                move -= math.comb(n - i - 1, remaining - 1)
+                i += 1
+            chosen.append(eligible_attackers[i])
+            start = i + 1
+        return chosen
+
+    def get_blocking_assignment(self, blocker_count, move):
+        """ For each eligible blocker, the index of the attacker it blocks, or the number of attackers for no block.
+        """
+        return np.unravel_index(move, [len(self.combat.attackers) + 1] * blocker_count)
+
+    def get_move_key(self, move, player=None):
+        """ A hashable description of what a legal move of the player (by default the player with priority)
+            does, for example ('cast', 'Grizzly Bears') or ('attack', ('Hill Giant',)). Unlike the move itself,
+            which is often an index into a list that depends on the state, keys mean the same thing across
+            positions.
+        """
+        if player is None:
+            player = self.player_with_priority
+        if player.generic_debt > 0:
+            return 'pay', tuple(sorted(move))
+        if player.casting_spell is not None:
+            spell = player.casting_spell
+            return ('target', spell.name) + spell.resolver.describe_move(self, player, move)
+        if move == "Pass":
+            return 'pass',
+        if self.current_phase_index == Phases.MAIN_PHASE_PRE_COMBAT:
+            playable_indices = player.get_playable_cards(self)
+            if move < len(playable_indices):
+                zone, index = playable_indices[move]
+                card = player.hand[index] if zone == 'hand' else player.command_zone[index]
+                return 'cast', card.name
+            callable_permanents, ability_indices = player.get_activated_abilities(self)
+            move -= len(playable_indices)
+            for i in range(len(ability_indices)):
+                if move > ability_indices[i]:
+                    move -= ability_indices[i]
+                else:
+                    return 'ability', callable_permanents[i].name, move - 1
+        if move == "Confirm":
+            return 'confirm', self.current_phase_index.name.lower()
+        if self.current_phase_index == Phases.DECLARE_ATTACKERS_STEP:
+            eligible_attackers = self.active_player.get_eligible_attackers(self)
+            if self.factored_combat:
+                return 'declare_attacker', eligible_attackers[len(self.combat.declaration)].name, bool(move)
+            attackers = self.get_attacker_combination(eligible_attackers, move)
+            return 'attack', tuple(sorted(attacker.name for attacker in attackers))
+        if self.current_phase_index == Phases.DECLARE_BLOCKERS_STEP:
+            eligible_blockers = self.nonactive_player.get_eligible_blockers(self)
+            if self.factored_combat:
+                attackers = self.combat.attackers
+                blocked = attackers[move].name if move < len(attackers) else None
+                return 'declare_blocker', eligible_blockers[len(self.combat.declaration)].name, blocked
+            assignment = self.get_blocking_assignment(len(eligible_blockers), move)
+            blocks = []
+            attackers = self.combat.attackers
+            for blocker, attacker_index in zip(eligible_blockers, assignment):
+                if attacker_index != len(attackers):
+                    blocks.append((blocker.name, attackers[attacker_index].name))
+            return 'block', tuple(sorted(blocks))
+        return self.current_phase_index.name.lower(), move
 
     # NOTE: this function might be too specialized when more spells than 8ed have been added
 
@@ -216,29 +283,8 @@ class Game:
         if player.generic_debt > 0:
             mp_as_list = player.get_mp_as_list()
             return list(itertools.combinations(mp_as_list, player.generic_debt))
-        if player.casting_spell != "":
-            # logging.debug("Returning a spell move now")
-            if player.casting_spell == "Vengeance":
-                return self.get_tapped_creature_indices()
-            if player.casting_spell == "Stone Rain":
-                return self.get_land_indices()
-            if player.casting_spell == "Index":
-                return list(itertools.permutations(list(range(min(5, len(player.deck))))))
-            if player.casting_spell == "Lava Axe":
-                return [0, 1]
-            if player.casting_spell == "Volcanic Hammer":
-                self.update_damage_targets()
-                return list(range(len(self.damage_targets)))
-            if player.casting_spell == "Sacred Nectar":
-                return ["Resolve Spell"]
-            if player.casting_spell == "Rampant Growth":
-                choices = ["Refuse"]
-                basic_land_types = ["Plains", "Island", "Swamp", "Mountain", "Forest"]
-                for land_type in basic_land_types:
-                    if player.find_land_in_library(land_type) >= 0:
-                        choices.append(land_type)
-                return choices
-            return ["Pass"]
+        if player.casting_spell is not None:
+            return player.casting_spell.resolver.get_moves(self, player)
 
         if self.current_phase_index == Phases.UNTAP_STEP:
             return ["Pass"]
@@ -259,30 +305,34 @@ class Game:
             attacking_player = self.active_player
             if attacking_player.has_attacked or player is not attacking_player:
                 return ["Pass"]
-            # next two lines get the power set of attackers
             eligible_attackers = attacking_player.get_eligible_attackers(self)
-            xs = list(range(len(eligible_attackers)))
-            return list(range(
-                len(list(itertools.chain.from_iterable(itertools.combinations(xs, n) for n in range(len(xs) + 1))))))
+            if self.factored_combat:
+                # attack (1) or not (0) with each eligible attacker in turn, then confirm
+                if len(self.combat.declaration) < len(eligible_attackers):
+                    return [0, 1]
+                return ["Confirm"]
+            # one move per subset of the eligible attackers, see get_attacker_combination
+            return list(range(2 ** len(eligible_attackers)))
         if self.current_phase_index == Phases.DECLARE_BLOCKERS_STEP:
             blocking_player = self.nonactive_player
             if blocking_player.has_blocked or player is not blocking_player:
                 return ["Pass"]
             eligible_blockers = blocking_player.get_eligible_blockers(self)
-            return list(range(np.power(len(self.attackers) + 1, len(eligible_blockers))))
+            if self.factored_combat:
+                # the index of the attacker each eligible blocker blocks in turn, len(attackers) for none
+                if len(self.combat.declaration) < len(eligible_blockers):
+                    return list(range(len(self.combat.attackers) + 1))
+                return ["Confirm"]
+            return list(range(np.power(len(self.combat.attackers) + 1, len(eligible_blockers))))
         # for each attacker that’s become blocked, the active player announces the damage assignment order
         if self.current_phase_index == Phases.DECLARE_BLOCKERS_STEP_509_2:
-            for i in range(len(self.attackers)):
-                if len(self.attackers[i].is_blocked_by) is not 0:
-                    if len(self.attackers[i].damage_assignment_order) is 0:
-                        return list(range(math.factorial(len(self.attackers[i].is_blocked_by))))
+            attacker_index = self.combat.get_unordered_attacker()
+            if attacker_index >= 0:
+                return list(range(math.factorial(len(self.combat.blocked_by[attacker_index]))))
             return ["Pass"]
 
         if self.current_phase_index == Phases.COMBAT_DAMAGE_STEP_510_1c:
-            if len(self.attackers) is 0 or self.attacker_counter >= len(self.attackers):
-                return ["Pass"]
-            return self.get_possible_damage_assignments(player, self.attackers[self.attacker_counter],
-                                                        self.blocker_counter)
+            return self.combat.get_possible_damage_assignments()
         if self.current_phase_index == Phases.COMBAT_DAMAGE_STEP:
             return ["Pass"]
         if self.current_phase_index == Phases.END_OF_COMBAT_STEP:
@@ -298,16 +348,12 @@ class Game:
         logging.debug(self.current_phase_index)
         logging.debug("omg we should not have ended up here")
 
-    @staticmethod
-    def get_possible_damage_assignments(player, attacker, index):
-        if len(attacker.damage_assignment_order) is 0:
-            return ["Pass"]
-        blocker_i = attacker.damage_assignment_order[index]
-        remaining_health = blocker_i.toughness - blocker_i.damage_taken
-        if attacker.damage_to_assign < remaining_health or index == len(attacker.damage_assignment_order) - 1:
-            return list(range(attacker.damage_to_assign, attacker.damage_to_assign + 1))
-        else:
-            return list(range(remaining_health, attacker.damage_to_assign + 1))
+    def draw_card(self, player, verbose=False):
+        """ Draws a card for the player and lets the rest of the game know about it. """
+        drawn_card = player.draw_card()
+        if drawn_card:
+            events.emit(self, events.DrawEvent(player.index, drawn_card.name), verbose)
+        return drawn_card
 
     def start_game(self):
         self.validate_decks()
@@ -320,6 +366,7 @@ class Game:
 
     def start_new_turn(self):
         self.current_phase_index = Phases.UNTAP_STEP
+        self.turn_number += 1
         
         # Find next active player who hasn't lost
         current_index = self.active_player.index
@@ -340,7 +387,7 @@ class Game:
                  break
         self.nonactive_player = self.players[nonactive_index]
 
-        self.active_player.draw_card()
+        self.draw_card(self.active_player)
         self.active_player.can_play_land = True
         for permanent in self.battlefield:
             permanent.is_tapped = False
@@ -380,44 +427,46 @@ class Game:
         return alive_count <= 1
 
     def apply_combat_damage(self):
-        any_attackers = False
-        for permanent in self.battlefield:
-            if isinstance(permanent, Creature):
-                if permanent in self.attackers:
-                    if len(permanent.is_blocked_by) > 0:
-                        for i in range(len(permanent.is_blocked_by)):
-                            permanent.is_blocked_by[i].take_damage(permanent.damage_assignment[i])
-                            permanent.take_damage(permanent.is_blocked_by[i].power)
-                    else:
-                        permanent.deal_combat_damage_to_opponent(self)
-                any_attackers = True
-        return any_attackers
-
-    def check_state_based_actions(self):
-        # 704.5g
-        for permanent in self.battlefield:
-            if isinstance(permanent, Creature):
-                if permanent.is_dead:
-                    self.battlefield.remove(permanent)
-                    permanent.owner.graveyard.append(permanent)
-        
-        # Commander Damage Check
-        for commander, damage_map in self.commander_damage.items():
-            for victim_index, damage in damage_map.items():
-                if damage >= 21:
-                    self.players[victim_index].has_lost = True
+        return self.combat.apply_damage(self)
+
+    def mark_dirty(self, game_object):
+        """ Makes the next state-based actions check look at a creature or player. """
+        self.sba_dirty[game_object] = None
+
+    def deal_damage(self, target, amount):
+        """ Deals damage to a creature or player, to be checked by the next state-based actions. """
+        target.take_damage(amount)
+        self.sba_dirty[target] = None
+
+    def check_state_based_actions(self, full=False):
+        """ Checks the creatures and players marked dirty since the last check, or every one of them with
+            full=True, so that the cost scales with what changed rather than with the size of the board.
+        """
+        if full:
+            touched = [permanent for permanent in self.battlefield if isinstance(permanent, Creature)]
+            touched += self.players
+        else:
+            touched = self.sba_dirty
+        self.sba_dirty = {}
+        for game_object in touched:
+            if isinstance(game_object, Creature):
+                # 704.5g
+                if game_object.is_dead:
+                    try:
+                        self.battlefield.remove(game_object)
+                    except ValueError:
+                        # already left the battlefield some other way
+                        continue
+                    game_object.owner.graveyard.append(game_object)
+                    events.emit(self, events.ZoneChangeEvent(game_object.owner.index, game_object.name,
+                                                             "battlefield", "graveyard"))
+            elif game_object.life < 1:
+                # 704.5a
+                game_object.has_lost = True
+
+        # Commander Damage Check, lethal is collected as the damage is dealt
+        for victim_index in self.commander_damage.lethal:
+            self.players[victim_index].has_lost = True
 
     def clean_up_after_combat(self):
-        # TODO: Simplify this and test!
-        self.attackers = []
-        self.blockers = []
-        self.attacker_counter = 0
-        self.blocker_counter = 0
-        for permanent in self.battlefield:
-            if isinstance(permanent, Creature):
-                # TODO: attribute "is_attacking" seems to be useless, remove this from everywhere
-                permanent.is_attacking = []
-                permanent.is_blocking = []
-                permanent.is_blocked_by = []
-                permanent.damage_assignment_order = []
-                permanent.damage_assignment = []
+        self.combat = Combat()
@@ -0,0 +1,187 @@
+import argparse
+
+import numpy as np
+
+import card_db
+from cards import Land
+from features import MANA_COLORS
+
+# the color of each of the shared mana abilities that lands are built with
+ABILITY_COLORS = {ability: color for color, ability in card_db.MANA_ABILITIES.items()}
+
+
+class Goldfish:
+    """ Simulates a deck playing alone ("goldfishing") for many games at once with numpy arrays.
+
+        Every game is one row: all libraries are shuffled in one call, and each turn draws a card, plays a land
+        if there is one in hand and casts spells greedily, most expensive first, with the lands in play. Only
+        lands make mana and spells have no effect, so ramp and card draw are not modelled. Colored costs use up
+        the sources of their color, but a land that makes several colors is a source of each of them.
+    """
+
+    def __init__(self, cards, hand_size=7):
+        self.hand_size = hand_size
+        self.names = []
+        kind_ids = {}
+        self.card_kinds = np.empty(len(cards), dtype=np.int16)
+        for i, card in enumerate(cards):
+            if card.name not in kind_ids:
+                kind_ids[card.name] = len(self.names)
+                self.names.append(card.name)
+            self.card_kinds[i] = kind_ids[card.name]
+        kind_count = len(self.names)
+        self.is_land = np.zeros(kind_count, dtype=bool)
+        self.mana_value = np.zeros(kind_count, dtype=np.int16)
+        self.requirements = np.zeros((kind_count, len(MANA_COLORS)), dtype=np.int16)
+        self.produces = np.zeros((kind_count, len(MANA_COLORS)), dtype=np.int8)
+        for card in cards:
+            kind = kind_ids[card.name]
+            if isinstance(card, Land):
+                self.is_land[kind] = True
+                for ability in card.tapped_abilities:
+                    if ability in ABILITY_COLORS:
+                        self.produces[kind, MANA_COLORS.index(ABILITY_COLORS[ability])] = 1
+            else:
+                self.mana_value[kind] = sum(card.mc.values())
+                for c, color in enumerate(MANA_COLORS):
+                    self.requirements[kind, c] = card.mc.get(color, 0)
+
+    @classmethod
+    def from_deck(cls, deck_name, hand_size=7):
+        return cls(card_db.get_registry().create_deck(deck_name), hand_size)
+
+    def simulate(self, games=100000, turns=10, on_the_play=True, seed=None):
+        """ Plays games games of turns turns each and returns a GoldfishResult. On the play there is no draw on
+            the first turn.
+        """
+        rng = np.random.default_rng(seed)
+        deck_size = len(self.card_kinds)
+        order = rng.permuted(np.tile(np.arange(deck_size, dtype=np.int16), (games, 1)), axis=1)
+        kinds = self.card_kinds[order]
+        # the number of cards drawn by each turn
+        seen = np.minimum(self.hand_size + np.arange(turns) + (0 if on_the_play else 1), deck_size)
+
+        land_sequence = self.is_land[kinds]
+        # the kinds of the lands in the order they are drawn, which is the order they are played in
+        land_kinds = np.take_along_axis(kinds, np.argsort(~land_sequence, axis=1, kind="stable"), axis=1)
+        rows = np.arange(games)
+        spells = [kind for kind in np.argsort(-self.mana_value, kind="stable") if not self.is_land[kind]]
+
+        lands = np.zeros((games, turns), dtype=np.int16)
+        colors = np.zeros((games, turns, len(MANA_COLORS)), dtype=np.int16)
+        mana_spent = np.zeros((games, turns), dtype=np.int16)
+        in_hand = np.zeros((games, len(self.names)), dtype=np.int16)
+        lands_in_hand = np.zeros(games, dtype=np.int16)
+        lands_played = np.zeros(games, dtype=np.int16)
+        color_count = np.zeros((games, len(MANA_COLORS)), dtype=np.int16)
+        drawn = 0
+        for turn in range(turns):
+            for position in range(drawn, seen[turn]):
+                in_hand[rows, kinds[:, position]] += 1
+                lands_in_hand += land_sequence[:, position]
+            drawn = seen[turn]
+
+            playing = lands_in_hand > 0
+            played_kinds = land_kinds[playing, lands_played[playing]]
+            color_count[playing] += self.produces[played_kinds]
+            lands_in_hand -= playing
+            lands_played += playing
+            lands[:, turn] = lands_played
+            colors[:, turn] = color_count
+
+            mana = lands_played.copy()
+            # the sources of each color not yet tapped for a colored cost this turn
+            sources = color_count.copy()
+            for kind in spells:
+                cost = int(self.mana_value[kind])
+                requirements = self.requirements[kind]
+                count = in_hand[:, kind] if cost == 0 else np.minimum(in_hand[:, kind], mana // cost)
+                for c in np.flatnonzero(requirements):
+                    count = np.minimum(count, sources[:, c] // requirements[c])
+                count = count.astype(np.int16)
+                in_hand[:, kind] -= count
+                mana -= count * cost
+                sources -= count[:, None] * requirements
+                mana_spent[:, turn] += count * cost
+        return GoldfishResult(self, kinds, seen, lands, colors, mana_spent)
+
+
+class GoldfishResult:
+    """ The outcome of Goldfish.simulate: per game and turn, the lands in play, the lands of each color in play
+        and the mana spent. Turns are counted from 1 in the methods and from 0 in the arrays.
+    """
+
+    def __init__(self, goldfish, kinds, seen, lands, colors, mana_spent):
+        self.goldfish = goldfish
+        self.kinds = kinds
+        self.seen = seen
+        self.lands = lands
+        self.colors = colors
+        self.mana_spent = mana_spent
+
+    @property
+    def games(self):
+        return self.lands.shape[0]
+
+    @property
+    def turns(self):
+        return self.lands.shape[1]
+
+    def land_probability(self, land_count, turn):
+        """ The fraction of games with at least land_count lands in play on turn. """
+        return float(np.mean(self.lands[:, turn - 1] >= land_count))
+
+    def cumulative_mana_spent(self):
+        return np.cumsum(self.mana_spent, axis=1)
+
+    def cast_turns(self, name):
+        """ For every game, the first turn on which a copy of the named card was in hand and could have been
+            cast with the lands in play, or 0 if it could not be within the simulated turns.
+        """
+        kind = self.goldfish.names.index(name)
+        copies = self.kinds == kind
+        first_drawn = np.where(copies.any(axis=1), np.argmax(copies, axis=1), len(self.goldfish.card_kinds))
+        castable = ((first_drawn[:, None] < self.seen[None, :]) & (self.lands >= self.goldfish.mana_value[kind]) &
+                    np.all(self.colors >= self.goldfish.requirements[kind], axis=2))
+        return np.where(castable.any(axis=1), np.argmax(castable, axis=1) + 1, 0)
+
+    def expected_cast_turn(self, name):
+        """ The mean turn on which the named card can first be cast, over the games where it can be at all, and
+            the fraction of those games.
+        """
+        cast_turns = self.cast_turns(name)
+        cast = cast_turns > 0
+        return (float(cast_turns[cast].mean()) if cast.any() else float("nan")), float(cast.mean())
+
+    def format_summary(self):
+        lines = ["%4s %13s %10s %11s" % ("turn", "land drops", "lands", "mana spent")]
+        cumulative = self.cumulative_mana_spent()
+        for turn in range(1, self.turns + 1):
+            lines.append("%4d %12.1f%% %10.2f %11.2f" % (turn, 100 * self.land_probability(turn, turn),
+                                                         self.lands[:, turn - 1].mean(),
+                                                         cumulative[:, turn - 1].mean()))
+        lines.append("")
+        lines.append("%-20s %10s %10s" % ("card", "cast turn", "castable"))
+        goldfish = self.goldfish
+        for kind in np.argsort(goldfish.mana_value, kind="stable"):
+            if not goldfish.is_land[kind]:
+                mean_turn, castable = self.expected_cast_turn(goldfish.names[kind])
+                lines.append("%-20s %10.2f %9.1f%%" % (goldfish.names[kind], mean_turn, 100 * castable))
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Goldfish statistics of an Open MTG deck")
+    parser.add_argument("deck", help="a deck name from the card database, like 8ed_core_gold")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--draw", action="store_true", help="simulate being on the draw")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    result = Goldfish.from_deck(args.deck).simulate(args.games, args.turns, not args.draw, args.seed)
+    print(result.format_summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import random
+
+from cards import Land, Creature, Sorcery, Instant, Artifact, Enchantment, Planeswalker
+
+CARD_CATEGORIES = (Land, Creature, Sorcery, Instant, Artifact, Enchantment, Planeswalker)
+
+
+def search_keys(card):
+    """ The keys a card can be found by in a Library: its category ("Land", "Creature", ...), its types and
+        its subtypes.
+    """
+    keys = [category.__name__ for category in CARD_CATEGORIES if isinstance(card, category)]
+    for attribute in ("types", "subtypes"):
+        values = getattr(card, attribute, ())
+        if isinstance(values, str):
+            values = (values,)
+        keys.extend(value for value in values if value not in keys)
+    return keys
+
+
+class Library(list):
+    """ A player's deck, the top of the library being the end of the list, which also keeps search indexes.
+
+        positions maps every card to its index in the list and by_key maps every search key (see search_keys)
+        to the cards that have it, in an insertion ordered dict used as a set. Drawing from the top and putting
+        cards on top update them in constant time, so tutors and land searches can find and take() a card
+        without scanning the library. Shuffles and other reorderings only update positions. Every card object
+        can only be in the library once.
+
+        With hidden_order, the library does not physically shuffle. Instead the bottom `unordered` cards are
+        considered to be in an unknown order, and whenever the top card is one of them it is sampled only as it
+        is drawn. Shuffling is then constant time, apart from forgetting the positions of the cards that were
+        known (see LookAtTopCards), and cards put on top afterwards keep their positions.
+    """
+
+    def __init__(self, cards=(), hidden_order=False):
+        super(Library, self).__init__(cards)
+        self.hidden_order = hidden_order
+        self.unordered = 0
+        self.rng = None
+        self._reindex()
+
+    def _reindex(self):
+        self.positions = {}
+        self.by_key = {}
+        for position, card in enumerate(self):
+            self._add(card, position)
+        self.unordered = min(self.unordered, len(self))
+
+    def _reposition(self):
+        """ Updates positions after a reordering, which leaves by_key as it is. """
+        self.positions = {card: position for position, card in enumerate(self)}
+
+    def _add(self, card, position):
+        self.positions[card] = position
+        for key in search_keys(card):
+            self.by_key.setdefault(key, {})[card] = None
+
+    def _discard(self, card):
+        del self.positions[card]
+        for key in search_keys(card):
+            matches = self.by_key[key]
+            del matches[card]
+            if not matches:
+                del self.by_key[key]
+
+    def _swap(self, i, j):
+        first, second = self[i], self[j]
+        super(Library, self).__setitem__(i, second)
+        super(Library, self).__setitem__(j, first)
+        self.positions[first] = j
+        self.positions[second] = i
+
+    def _remove_at(self, position):
+        card = super(Library, self).pop(position)
+        self._discard(card)
+        for i in range(position, len(self)):
+            self.positions[self[i]] = i
+        return card
+
+    def position(self, card):
+        return self.positions[card]
+
+    def find_all(self, key):
+        """ The cards with the search key, in the order they were put into the library. """
+        return list(self.by_key.get(key, ()))
+
+    def find(self, key, category=None):
+        """ The first card with the search key that is also an instance of category, if given, or None. """
+        for card in self.by_key.get(key, ()):
+            if category is None or isinstance(card, category):
+                return card
+        return None
+
+    def take(self, card):
+        """ Removes a card in constant time by moving another card into its place. The order of the rest of
+            the library is not kept, which is fine for searches that shuffle the library afterwards.
+        """
+        position = self.positions[card]
+        if not self.hidden_order:
+            self._swap(position, len(self) - 1)
+            return self._remove_at(len(self) - 1)
+        if position < self.unordered:
+            # fill the hole from the unordered part, so that the cards on top keep their positions
+            self._swap(position, self.unordered - 1)
+            position = self.unordered - 1
+            self.unordered -= 1
+        return self._remove_at(position)
+
+    def shuffle(self, rng=None):
+        """ Shuffles the library with rng, a GameRandom, or the random module when it is None. """
+        if self.hidden_order:
+            for card in self[self.unordered:]:
+                card.deck_location_known = False
+            self.unordered = len(self)
+            self.rng = rng
+            return
+        for card in self:
+            card.deck_location_known = False
+        cards = list(self)
+        if rng is None:
+            random.shuffle(cards)
+        else:
+            rng.shuffle(cards)
+        super(Library, self).__setitem__(slice(None), cards)
+        self._reposition()
+
+    def forget_order(self, known_top=0, rng=None):
+        """ Turns on hidden_order and considers all but the top known_top cards to be in an unknown order. """
+        self.hidden_order = True
+        self.unordered = max(len(self) - known_top, 0)
+        if rng is not None:
+            self.rng = rng
+
+    def append(self, card):
+        super(Library, self).append(card)
+        self._add(card, len(self) - 1)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def pop(self, index=-1):
+        if index == -1 and self.unordered == len(self) > 1:
+            # the top card is hidden, so it is sampled now
+            if self.rng is None:
+                sampled = random.randrange(len(self))
+            else:
+                sampled = self.rng.randint(0, len(self) - 1)
+            self._swap(sampled, len(self) - 1)
+        position = index % len(self) if self else index
+        if position < self.unordered:
+            self.unordered -= 1
+        return self._remove_at(position)
+
+    def insert(self, index, card):
+        super(Library, self).insert(index, card)
+        self._reindex()
+
+    def remove(self, card):
+        super(Library, self).remove(card)
+        self._reindex()
+
+    def clear(self):
+        super(Library, self).clear()
+        self._reindex()
+
+    def reverse(self):
+        super(Library, self).reverse()
+        self._reposition()
+
+    def sort(self, *args, **kwargs):
+        super(Library, self).sort(*args, **kwargs)
+        self._reposition()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super(Library, self).__setitem__(index, value)
+            self._reindex()
+            return
+        position = index % len(self)
+        replaced = self[position]
+        # a swap through item assignment has the moved card in two places for a moment
+        if self.positions.get(replaced) == position:
+            self._discard(replaced)
+        super(Library, self).__setitem__(position, value)
+        self._add(value, position)
+
+    def __delitem__(self, index):
+        super(Library, self).__delitem__(index)
+        self._reindex()
+
+    def __reduce_ex__(self, protocol):
+        # rebuild from the cards so that copies index them exactly once, a copied rng is forked, which
+        # resamples the hidden order of the copy
+        return self.__class__, (list(self), self.hidden_order), {'unordered': self.unordered, 'rng': self.rng}
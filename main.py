@@ -1,16 +1,21 @@
 import logging
+import logging.handlers
 import os
+import queue
 
+import agents
+import events
 import game
-import mcts
+import rng
 import player
 import deck
 
 
 def configure_logging():
     """
-    Configures logging
-    :return:
+    Configures logging. Records are handed to a queue and written to the console and log file by a
+    background listener thread, so the game loop never waits on file I/O.
+    :return: the started QueueListener, stop it to flush the log on exit
     """
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
@@ -33,37 +38,43 @@ def configure_logging():
         stream_handler.setLevel(logging.WARNING)
     """
 
-    root_logger.addHandler(stream_handler)
-    root_logger.addHandler(file_handler)
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
 
-def start_games(amount_of_games):
+def start_games(amount_of_games, event_log=None, seed=None):
+    """
+    Plays a number of games between the gold and silver decks
+    :param amount_of_games: how many games to play
+    :param event_log: optional path of a JSON lines file that receives the structured events of every game
+    :param seed: optional seed, every game gets its own reproducible random stream derived from it
+    :return:
+    """
+    game_rngs = rng.GameRandom(seed).spawn(amount_of_games)
+    event_stream = None
+    if event_log is not None:
+        event_stream = events.EventStream(event_log).start()
     player_a_wins = 0
     player_b_wins = 0
     games_played = 0
+    seat_agents = [agents.UCTAgent(itermax=5), agents.RandomAgent()]
 
     logging.info("Starting Open MTG. Playing {0} games".format(amount_of_games))
     for i in range(amount_of_games):
         gold_deck = deck.get_8ed_core_gold_deck()
         silver_deck = deck.get_8ed_core_silver_deck()
-        current_game = game.Game([player.Player(gold_deck), player.Player(silver_deck)])
+        current_game = game.Game([player.Player(gold_deck), player.Player(silver_deck)], rng=game_rngs[i])
+        current_game.event_stream = event_stream
         current_game.start_game()
 
         if current_game.active_player.index == 0:
             logging.info("Gold player starts game")
         else:
             logging.info("Silver player starts game")
-        while not current_game.is_over():
-            if current_game.player_with_priority.index is 1:
-                move = current_game.player_with_priority.determine_move(method="random", game=current_game)
-            else:
-                # move = game.player_with_priority.determine_move(method="random", game=game)
-                if len(current_game.get_moves()) == 1:
-                    move = current_game.get_moves()[0]
-                else:
-                    move = mcts.uct(current_game, itermax=5)
-
-            current_game.make_move(move, False)
+        agents.run_games([current_game], seat_agents)
 
         if current_game.players[1].has_lost:
             player_a_wins += 1
@@ -75,12 +86,15 @@ def start_games(amount_of_games):
 
     logging.info("Player A won {0} out of {1}".format(player_a_wins, games_played))
     logging.info("Player B won {0} out of {1}".format(player_b_wins, games_played))
+    if event_stream is not None:
+        event_stream.close()
     logging.info("Quitting Open MTG{0}{0}".format(os.linesep))
 
 
 if __name__ == "__main__":
+    log_listener = None
     try:
-        configure_logging()
+        log_listener = configure_logging()
         start_games(2)
     except SystemExit:
         pass
@@ -88,3 +102,6 @@ if __name__ == "__main__":
         logging.error("Open-mtg stopped by Keyboard Interrupt{0}{0}".format(os.linesep))
     except:
         logging.exception("Unexpected exception")
+    finally:
+        if log_listener is not None:
+            log_listener.stop()
@@ -0,0 +1,179 @@
+import argparse
+import collections
+import logging
+import math
+import multiprocessing
+
+import tournament
+
+# decisions of the stopping rules, None means more games are needed
+H0 = "H0"
+H1 = "H1"
+INCONCLUSIVE = "inconclusive"
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+class Score:
+    """ Running wins, draws and losses of agent A against agent B. """
+
+    def __init__(self):
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def add(self, score):
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    def mean(self):
+        return (self.wins + self.draws / 2) / self.games
+
+    def variance(self):
+        """ Per-game variance of the score. """
+        mean = self.mean()
+        return (self.wins * (1 - mean) ** 2 + self.draws * (0.5 - mean) ** 2 + self.losses * mean ** 2) / self.games
+
+    def elo(self):
+        mean = min(max(self.mean(), 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / mean - 1)
+
+
+class SPRT:
+    """ Sequential probability ratio test of H0: A is elo0 stronger than B against H1: A is elo1 stronger.
+
+        Uses the normal approximation of the log-likelihood ratio of the game scores (as in the generalized
+        SPRT used by chess engine testing), with draws as half points. decide() returns H1 once the ratio
+        passes the upper bound, H0 once it passes the lower one, and None while more games are needed.
+    """
+
+    def __init__(self, elo0=0.0, elo1=50.0, alpha=0.05, beta=0.05, min_games=10):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.min_games = min_games
+
+    def llr(self, score):
+        if score.games == 0:
+            return 0.0
+        # a floor on the variance keeps very one-sided early results from ending the test immediately
+        variance = max(score.variance(), 0.01)
+        s0, s1 = expected_score(self.elo0), expected_score(self.elo1)
+        return score.games * (s1 - s0) * (2 * score.mean() - s0 - s1) / (2 * variance)
+
+    def decide(self, score):
+        if score.games < self.min_games:
+            return None
+        llr = self.llr(score)
+        if llr >= self.upper:
+            return H1
+        if llr <= self.lower:
+            return H0
+        return None
+
+
+class ConfidenceTarget:
+    """ Stops when the confidence interval of A's mean score excludes 0.5, deciding H1 (A is stronger) or H0,
+        or once it is narrower than width without doing so, deciding INCONCLUSIVE.
+    """
+
+    def __init__(self, width=0.1, z=1.96, min_games=10):
+        self.width = width
+        self.z = z
+        self.min_games = min_games
+
+    def decide(self, score):
+        if score.games < self.min_games:
+            return None
+        half_width = self.z * math.sqrt(max(score.variance(), 0.01) / score.games)
+        if score.mean() - half_width > 0.5:
+            return H1
+        if score.mean() + half_width < 0.5:
+            return H0
+        if 2 * half_width <= self.width:
+            return INCONCLUSIVE
+        return None
+
+
+def match_tasks(agent_a, agent_b, decks, seed=0, max_moves=20000):
+    """ Endless games between A and B, alternating seats and deck sides. """
+    index = 0
+    while True:
+        seats = (agent_a, agent_b) if index % 2 == 0 else (agent_b, agent_a)
+        seated_decks = decks if (index // 2) % 2 == 0 else decks[::-1]
+        yield tournament.Task(index, seats, seated_decks, (seed, index), max_moves)
+        index += 1
+
+
+def run_match(agent_a, agent_b, decks, test=None, max_games=2000, processes=None, seed=0, max_moves=20000):
+    """ Plays A against B until test decides, or max_games have been played.
+
+        Games run on a process pool with a bounded number in flight and their results are taken in the order
+        they were scheduled, so the decision only depends on the seed. Returns (decision, Score).
+    """
+    test = SPRT() if test is None else test
+    score = Score()
+    decision = None
+    tasks = match_tasks(agent_a, agent_b, decks, seed, max_moves)
+    with multiprocessing.Pool(processes) as pool:
+        in_flight = 2 * (processes or multiprocessing.cpu_count())
+        pending = collections.deque()
+        while score.games < max_games:
+            while len(pending) < in_flight and score.games + len(pending) < max_games:
+                pending.append(pool.apply_async(tournament.run_task, (next(tasks),)))
+            result = pending.popleft().get()
+            # A is seated first in the even games, see match_tasks; names may be the same for both agents
+            score.add(result["score"] if result["index"] % 2 == 0 else 1 - result["score"])
+            decision = test.decide(score)
+            if decision is not None:
+                break
+        pool.terminate()
+    logging.info("{0} vs {1}: +{2} ={3} -{4} after {5} games, decision {6}".format(
+        agent_a.name, agent_b.name, score.wins, score.draws, score.losses, score.games, decision))
+    return decision, score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays two Open MTG agents until one is significantly stronger")
+    parser.add_argument("agent_a")
+    parser.add_argument("agent_b")
+    parser.add_argument("--decks", default="8ed_core_gold:8ed_core_silver")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=50.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--ci-width", type=float, default=None,
+                        help="stop on a confidence interval of this width instead of the SPRT")
+    parser.add_argument("--max-games", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)-5.5s]  %(message)s")
+    if args.ci_width is not None:
+        test = ConfidenceTarget(args.ci_width)
+    else:
+        test = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+    agent_a = tournament.parse_agent(args.agent_a)
+    agent_b = tournament.parse_agent(args.agent_b)
+    if agent_a.name == agent_b.name:
+        agent_b = agent_b._replace(name=agent_b.name + "-b")
+    decision, score = run_match(agent_a, agent_b, tournament.parse_pairing(args.decks), test, args.max_games,
+                                args.processes, args.seed)
+    print("%s vs %s: +%d =%d -%d, score %.3f, elo %+.1f, decision %s" % (
+        agent_a.name, agent_b.name, score.wins, score.draws, score.losses, score.mean(), score.elo(), decision))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,71 @@
 # Licence is granted to freely use and distribute for any sensible/legal purpose so long as this comment
 # remains in any distributed code.
 import copy
+import math
+import operator
+
+import evaluators
 from game import *
 
 
 class Node:
     """ A node in the game tree. Note wins is always from the viewpoint of playerJustMoved.
         Crashes if state not specified.
+
+        Nodes do not keep the list of their legal moves, which for combat declarations can have thousands of
+        entries: untried moves are sampled from the moves of the state an iteration reaches the node with.
     """
 
-    def __init__(self, move=None, parent=None, state=None):
+    def __init__(self, move=None, parent=None, state=None, move_key=None):
         self.move = move  # the move that got us to this node - "None" for the root node
+        self.move_key = move_key  # what the move does, see Game.get_move_key - "None" for the root node
         self.parent = parent  # "None" for the root node
-        self.child_nodes = []
+        self.child_nodes = {}  # keyed by move_key
         self.wins = 0
         self.visits = 0
-        self.untried_moves = state.get_moves()  # future child nodes
         self.player_just_moved = state.player_just_moved  # the only part of the state that the Node needs later
 
-    def uct_select_child(self):
-        """ Use the UCB1 formula to select a child node. Often a constant UCTK is applied so we have
-            lambda c: c.wins/c.visits + UCTK * sqrt(2*log(self.visits)/c.visits to vary the amount of
-            exploration versus exploitation.
+    def uct_select_child(self, children=None):
+        """ Use the UCB1 formula to select a child node, out of children if given. Often a constant UCTK is
+            applied so we have lambda c: c.wins/c.visits + UCTK * sqrt(2*log(self.visits)/c.visits to vary the
+            amount of exploration versus exploitation.
         """
-        s = sorted(self.child_nodes, key=lambda c: c.wins / c.visits + np.sqrt(2 * np.log(self.visits) / c.visits))[-1]
+        children = self.child_nodes.values() if children is None else children
+        s = sorted(children, key=lambda c: c.wins / c.visits + np.sqrt(2 * np.log(self.visits) / c.visits))[-1]
         return s
 
-    def add_child(self, m, s):
-        """ Remove m from untriedMoves and add a new child node for this move.
+    def legal_children(self, moves, key):
+        """ The children whose move is legal in the current determinization, mapped to that move out of moves.
+            key gives the move key of a move in the determinization: move values are often indices that depend
+            on the hidden cards, so a child only matches a move that does the same thing.
+        """
+        children = {}
+        for move in moves:
+            child = self.child_nodes.get(key(move))
+            if child is not None:
+                children.setdefault(child, move)
+        return children
+
+    def sample_untried_move(self, moves, key, rng, widening=None):
+        """ A random move out of moves whose key has no child yet, or None if they all have one or widening does
+            not allow another child.
+        """
+        if widening is not None and len(self.child_nodes) >= widening.limit(self.visits):
+            return None
+        # with few children a handful of draws almost always finds an untried move, without keying every move
+        for _ in range(8):
+            move = rng.choice(moves)
+            if key(move) not in self.child_nodes:
+                return move
+        untried = [move for move in moves if key(move) not in self.child_nodes]
+        return rng.choice(untried) if untried else None
+
+    def add_child(self, m, move_key, s):
+        """ Add a new child node for move m, with move_key its key and s the state after m.
             Return the added child node
         """
-        n = Node(move=m, parent=self, state=s)
-        self.untried_moves.remove(m)
-        self.child_nodes.append(n)
+        n = Node(move=m, parent=self, state=s, move_key=move_key)
+        self.child_nodes[move_key] = n
         return n
 
     def update(self, result):
@@ -43,65 +76,336 @@ class Node:
         self.wins += result
 
     def __repr__(self):
-        return "[M:" + str(self.move) + " W/V:" + str(self.wins) + "/" + str(self.visits) + " U:" + str(
-            self.untried_moves) + "]"
+        return "[M:" + str(self.move) + " W/V:" + str(self.wins) + "/" + str(self.visits) + " C:" + str(
+            len(self.child_nodes)) + "]"
+
+
+class ProgressiveWidening:
+    """ Lets a node that has been visited n times have at most ceil(constant * (n + 1) ** exponent) children,
+        so nodes with a huge number of moves, like blocker declarations, are widened slowly and their few
+        children are searched deeply instead of each being tried once.
+    """
+
+    def __init__(self, constant=1.0, exponent=0.5):
+        self.constant = constant
+        self.exponent = exponent
+
+    def limit(self, visits):
+        return math.ceil(self.constant * (visits + 1) ** self.exponent)
+
+
+class Determinizer:
+    """ Samples the hidden information of a game as seen by one observing player.
+
+        The observer's library below any cards whose position is known (from Index) is hidden, and so are the
+        hands and libraries of the other players, whose hand sizes are kept. Hidden card assignments are
+        drawn from blocks of permutations that are pre-sampled in one numpy call per zone and reused row by
+        row, and applied to a copied state by reordering whole lists at once. Libraries with hidden_order are
+        not reordered at all, they only forget their order and sample cards as they are drawn.
+    """
+
+    def __init__(self, rootstate, observer_index, pool_size=64, rng=None):
+        self.observer_index = observer_index
+        self.pool_size = pool_size
+        self.rng = rootstate.rng.spawn(1)[0] if rng is None else rng
+        observer = rootstate.players[observer_index]
+        self.known_top = 0
+        while self.known_top < len(observer.deck) and observer.deck[-1 - self.known_top].deck_location_known:
+            self.known_top += 1
+        self.zone_sizes = {}
+        for player in rootstate.players:
+            if player.index == observer_index:
+                self.zone_sizes[player.index] = len(player.deck) - self.known_top
+            else:
+                self.zone_sizes[player.index] = len(player.hand) + len(player.deck)
+        self.pools = {}
+        self.cursors = {}
+
+    def sample_permutation(self, player_index):
+        size = self.zone_sizes[player_index]
+        cursor = self.cursors.get(player_index, self.pool_size)
+        if cursor >= self.pool_size:
+            self.pools[player_index] = self.rng.generator.permuted(np.tile(np.arange(size), (self.pool_size, 1)),
+                                                                   axis=1)
+            cursor = 0
+        self.cursors[player_index] = cursor + 1
+        return self.pools[player_index][cursor]
+
+    def determinize(self, state):
+        """ Reassigns the hidden zones of state, which must be a copy of the root state. """
+        for player in state.players:
+            if player.deck.hidden_order:
+                self.determinize_hidden_order(player)
+                continue
+            size = self.zone_sizes[player.index]
+            if size < 2:
+                continue
+            permutation = self.sample_permutation(player.index)
+            if player.index == self.observer_index:
+                known = player.deck[size:]
+                player.deck = list(operator.itemgetter(*permutation)(player.deck)) + known
+            else:
+                hidden = player.hand + player.deck
+                reordered = operator.itemgetter(*permutation)(hidden)
+                hand_size = len(player.hand)
+                player.hand = list(reordered[:hand_size])
+                player.deck = list(reordered[hand_size:])
+        return state
 
+    def determinize_hidden_order(self, player):
+        if player.index == self.observer_index:
+            player.deck.forget_order(self.known_top, player.rng)
+            return
+        # deal the hand again from hand and library, with a partial Fisher-Yates shuffle over both
+        hand, library = player.hand, player.deck
+        library.forget_order(0, player.rng)
+        hand_size = len(hand)
+        total = hand_size + len(library)
+        for i in range(hand_size):
+            j = self.rng.randint(i, total - 1)
+            if j < hand_size:
+                hand[i], hand[j] = hand[j], hand[i]
+            else:
+                card = hand[i]
+                hand[i] = library[j - hand_size]
+                library[j - hand_size] = card
 
-def uct(rootstate, itermax, verbose=False):
+
+def uct(rootstate, itermax, verbose=False, widening=None, expand_depth=None, rollout=None, horizon=None,
+        evaluator=None):
     """ Conduct a UCT search for itermax iterations starting from rootstate.
         Return the best move from the rootstate.
         Assumes 2 alternating players (player 1 starts), with game results in the range [0.0, 1.0]."""
+    rootnode = uct_search(rootstate, itermax, verbose, widening, expand_depth, rollout, horizon, evaluator)
+    return most_visited_move(rootstate, rootnode)  # return the move that was most visited
+
+
+def uct_search(rootstate, itermax, verbose=False, widening=None, expand_depth=None, rollout=None, horizon=None,
+               evaluator=None):
+    """ The UCT search behind uct(), returning the root Node so callers can read the visits of every move.
 
+        Every iteration expands one node, at any depth up to expand_depth (None for no limit, 1 to only expand
+        the root). widening is an optional ProgressiveWidening. Children are keyed by Game.get_move_key like
+        ISNode children, and selection only considers the children whose move is legal in the iteration's
+        determinization, stopping when there are none.
+
+        Rollouts choose their moves with rollout, a policy from rollouts.py (random moves by default). With a
+        horizon, a rollout stops once it is that many turns past the root and the position is scored by
+        evaluator, by default an evaluators.HeuristicEvaluator.
+    """
     rootnode = Node(state=rootstate)
+    rng = rootstate.rng.spawn(1)[0]
+    # mtg fix: shuffle own deck, except for cards that have been seen with Index, and "imagine" a scenario
+    # for the opponent - this assumes knowledge of opponent decklist!
+    determinizer = Determinizer(rootstate, rootnode.player_just_moved.index, rng=rng)
+    if horizon is not None and evaluator is None:
+        evaluator = evaluators.HeuristicEvaluator()
+    last_turn = None if horizon is None else rootstate.turn_number + horizon
 
     for i in range(itermax):
         node = rootnode
-        state = copy.deepcopy(rootstate)
+        depth = 0
+        state = determinizer.determinize(copy.deepcopy(rootstate))
 
-        # mtg fix: shuffle own deck
-        k = node.player_just_moved.index
+        # Select and expand
+        while expand_depth is None or depth < expand_depth:
+            moves = state.get_moves()
+            if not moves:
+                break
+            m = node.sample_untried_move(moves, state.get_move_key, rng, widening)
+            if m is not None:
+                move_key = state.get_move_key(m)
+                state.make_move(m)
+                node = node.add_child(m, move_key, state)  # add child and descend tree
+                break
+            children = node.legal_children(moves, state.get_move_key)
+            if not children:
+                break
+            node = node.uct_select_child(children)
+            state.make_move(children[node])
+            depth += 1
 
-        # the mcts rollouts don't randomize cards that have been seen with Index
-        indexed_cards_in_deck = []
-        # print("mcts print: %s" % (state.players))
+        # Rollout - the copied state has its own forked random stream, see GameRandom
+        moves = state.get_moves()
+        while moves != [] and (last_turn is None or state.turn_number < last_turn):  # while state is non-terminal
+            state.make_move(state.rng.choice(moves) if rollout is None else rollout.choose(state, moves))
+            moves = state.get_moves()
+        # the result for player 0, a truncated rollout is scored by the evaluator
+        result = state.get_results(0) if moves == [] else float(evaluator.evaluate([state], [0])[0])
 
-        if len(state.players[k].deck) > 0:
-            while len(state.players[k].deck) > 0 and state.players[k].deck[-1].deck_location_known:
-                indexed_cards_in_deck.append(state.players[k].deck.pop())
-        for indexed_card in indexed_cards_in_deck:
-            state.players[k].deck.append(indexed_card)
-        # and "imagine" a scenario for the opponent - this assumes knowledge of opponent decklist!
+        # Backpropagate
+        while node is not None:  # backpropagate from the expanded node and work back to the root node
+            # Update node with result from POV of node.playerJustMoved
+            node.update(result if node.player_just_moved.index == 0 else 1 - result)
+            node = node.parent
+    return rootnode
 
-        state.players[k].shuffle_deck()
-        opponent = state.players[1 - k]
 
-        opponent_hand_size = len(opponent.hand)
-        for j in range(opponent_hand_size):
-            opponent.deck.append(opponent.hand.pop())
+class ISNode:
+    """ A node in an information set tree. Children are keyed by Game.get_move_key, so the statistics of a
+        move are shared by every determinization in which it is legal, even when its index differs.
+        availability counts how often the node was a legal choice when its parent was visited. virtual_loss
+        counts searches that passed through the node and are waiting for their leaf to be evaluated, each
+        scored as a loss until then so that a batch of searches spreads out over the tree.
+    """
 
-        opponent.shuffle_deck()
+    def __init__(self, move_key=None, parent=None, player_just_moved=None):
+        self.move_key = move_key
+        self.parent = parent
+        self.child_nodes = {}
+        self.wins = 0
+        self.visits = 0
+        self.availability = 1
+        self.virtual_loss = 0
+        self.player_just_moved = player_just_moved
+
+    def select_child(self, legal_keys, exploration=0.7):
+        """ UCB1 over the children that are legal in the current determinization. """
+        best, best_value = None, -1
+        for key in legal_keys:
+            child = self.child_nodes[key]
+            child.availability += 1
+            visits = child.visits + child.virtual_loss
+            value = child.wins / visits + exploration * np.sqrt(np.log(child.availability) / visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def add_child(self, key, player_just_moved):
+        child = ISNode(move_key=key, parent=self, player_just_moved=player_just_moved)
+        self.child_nodes[key] = child
+        return child
+
+    def update(self, result):
+        self.visits += 1
+        self.wins += result
 
-        for j in range(opponent_hand_size):
-            opponent.draw_card()
+    def __repr__(self):
+        return "[M:" + str(self.move_key) + " W/V/A:" + str(self.wins) + "/" + str(self.visits) + "/" + str(
+            self.availability) + "]"
 
-        # Select
-        while node.untried_moves == [] and node.child_nodes != []:  # node is fully expanded and non-terminal
-            node = node.uct_select_child()
-            state.make_move(node.move)
 
-        # Expand
-        if node.untried_moves != [] and node.parent == None:  # if we can expand (i.e. state/node is root)
-            m = random.choice(node.untried_moves)
-            state.make_move(m)
-            node = node.add_child(m, state)  # add child and descend tree
+def ismcts(rootstate, itermax, verbose=False, pool_size=64):
+    """ Single observer information set MCTS from the point of view of the player with priority.
+        Every iteration searches a different determinization of the hidden zones, sampled by a Determinizer,
+        and the tree is expanded at every depth. Return the best move from the rootstate.
+    """
+    observer = rootstate.player_with_priority.index
+    rng = rootstate.rng.spawn(1)[0]
+    determinizer = Determinizer(rootstate, observer, pool_size, rng)
+    rootnode = ISNode(player_just_moved=rootstate.player_just_moved.index)
 
-        # Rollout - this can often be made orders of magnitude quicker using a state.GetRandomMove() function
-        while not state.get_moves() == []:  # while state is non-terminal
-            state.make_move(random.choice(state.get_moves()))
+    for i in range(itermax):
+        node = rootnode
+        state = determinizer.determinize(copy.deepcopy(rootstate))
+
+        # Select and expand
+        while True:
+            moves = state.get_moves()
+            if not moves:
+                break
+            keyed_moves = {}
+            for move in moves:
+                keyed_moves.setdefault(state.get_move_key(move), move)
+            untried_keys = [key for key in keyed_moves if key not in node.child_nodes]
+            if untried_keys:
+                key = rng.choice(untried_keys)
+                state.make_move(keyed_moves[key])
+                node = node.add_child(key, state.player_just_moved.index)
+                break
+            node = node.select_child(keyed_moves)
+            state.make_move(keyed_moves[node.move_key])
+
+        # Rollout
+        while not state.get_moves() == []:
+            state.make_move(state.rng.choice(state.get_moves()))
 
         # Backpropagate
-        while node is not None:  # backpropagate from the expanded node and work back to the root node
-            # state terminal. Update node with result from POV of node.playerJustMoved
-            node.update(state.get_results(node.player_just_moved.index))
+        while node is not None:
+            node.update(state.get_results(node.player_just_moved))
             node = node.parent
-    return sorted(rootnode.child_nodes, key=lambda c: c.visits)[-1].move  # return the move that was most visited
+
+    if verbose:
+        print(sorted(rootnode.child_nodes.values(), key=lambda c: c.visits))
+    return most_visited_move(rootstate, rootnode)
+
+
+def most_visited_move(rootstate, rootnode):
+    """ The legal move of rootstate whose child of rootnode, an ISNode or Node, has the most visits. """
+    root_moves = {}
+    for move in rootstate.get_moves():
+        root_moves.setdefault(rootstate.get_move_key(move), move)
+    best = max((child for key, child in rootnode.child_nodes.items() if key in root_moves), key=lambda c: c.visits)
+    return root_moves[best.move_key]
+
+
+class BatchedSearch:
+    """ The tree and determinizer of one information set MCTS in batched_ismcts. """
+
+    def __init__(self, rootstate, itermax, virtual_loss=1, pool_size=64):
+        self.rootstate = rootstate
+        self.remaining = itermax
+        self.virtual_loss = virtual_loss
+        self.rng = rootstate.rng.spawn(1)[0]
+        self.determinizer = Determinizer(rootstate, rootstate.player_with_priority.index, pool_size, self.rng)
+        self.rootnode = ISNode(player_just_moved=rootstate.player_just_moved.index)
+
+    def select(self, exploration=0.7):
+        """ Walks a new determinization down the tree and expands one node, like an ismcts iteration, and adds
+            virtual loss along the way. Returns the leaf node and its state.
+        """
+        node = self.rootnode
+        node.virtual_loss += self.virtual_loss
+        state = self.determinizer.determinize(copy.deepcopy(self.rootstate))
+        while True:
+            moves = state.get_moves()
+            if not moves:
+                break
+            keyed_moves = {}
+            for move in moves:
+                keyed_moves.setdefault(state.get_move_key(move), move)
+            untried_keys = [key for key in keyed_moves if key not in node.child_nodes]
+            if untried_keys:
+                key = self.rng.choice(untried_keys)
+                state.make_move(keyed_moves[key])
+                node = node.add_child(key, state.player_just_moved.index)
+                node.virtual_loss += self.virtual_loss
+                break
+            node = node.select_child(keyed_moves, exploration)
+            node.virtual_loss += self.virtual_loss
+            state.make_move(keyed_moves[node.move_key])
+        self.remaining -= 1
+        return node, state
+
+    def backpropagate(self, node, player_index, result):
+        """ Replaces the virtual loss from node up to the root by result, which is for player_index. """
+        while node is not None:
+            node.virtual_loss -= self.virtual_loss
+            node.update(result if node.player_just_moved == player_index else 1 - result)
+            node = node.parent
+
+
+def batched_ismcts(rootstates, itermax, evaluator, batch_size=8, virtual_loss=1, exploration=0.7):
+    """ Information set MCTS for several games at once, with leaves scored by an evaluators.Evaluator instead
+        of random rollouts. Every round selects up to batch_size leaves in each game's tree, using virtual loss to
+        keep them apart, and scores the leaves of all games with one evaluate() call. Finished games are scored
+        by their result. Returns the most visited move for every root state.
+    """
+    searches = [BatchedSearch(rootstate, itermax, virtual_loss) for rootstate in rootstates]
+    while any(search.remaining > 0 for search in searches):
+        leaves = []
+        for search in searches:
+            for _ in range(min(batch_size, search.remaining)):
+                node, state = search.select(exploration)
+                leaves.append((search, node, state))
+        pending = [i for i, (_, _, state) in enumerate(leaves) if not state.is_over()]
+        values = {}
+        if pending:
+            states = [leaves[i][2] for i in pending]
+            scores = evaluator.evaluate(states, [state.player_just_moved.index for state in states])
+            values = dict(zip(pending, scores))
+        for i, (search, node, state) in enumerate(leaves):
+            player_index = state.player_just_moved.index
+            result = values[i] if i in values else state.get_results(player_index)
+            search.backpropagate(node, player_index, float(result))
+    return [most_visited_move(search.rootstate, search.rootnode) for search in searches]
@@ -1,59 +1,178 @@
 import copy
 
+import numpy as np
+
 from cards import *
 
+# weights of the creature count, life, power and toughness differences in the heuristic
+HEURISTIC_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.0])
+
+KILLER_BONUS = 1000
+
 
 def heuristic_value(player, game):
-    if player.get_opponent(game).has_lost:
+    opponent = player.get_opponent(game)
+    if opponent.has_lost:
         return 9999
     if player.has_lost:
         return -9999
-    enemy_bear_amount = 0
-    own_bear_amount = 0
-    own_power = 0
-    enemy_power = 0
-    own_toughness = 0
-
-    enemy_toughness = 0
-    for permanent in game.battlefield:
-        if isinstance(permanent, Creature):
-            if permanent.owner.index is player.index:
-                own_power += permanent.power
-                own_toughness += permanent.toughness
-                own_bear_amount += 1
-            else:
-                enemy_power += permanent.power
-                enemy_toughness += permanent.toughness
-                enemy_bear_amount += 1
-    value = (own_bear_amount - enemy_bear_amount) + (player.life - player.get_opponent(game).life) + (
-            own_power - enemy_power) + (own_toughness - enemy_toughness)
-    return value
+    # the battlefield keeps running creature totals, so this is constant time
+    own_bear_amount, own_power, own_toughness = game.battlefield.get_material(player.index)
+    all_bear_amount, all_power, all_toughness = game.battlefield.total
+    enemy_bear_amount = all_bear_amount - own_bear_amount
+    enemy_power = all_power - own_power
+    enemy_toughness = all_toughness - own_toughness
+    differences = np.array([own_bear_amount - enemy_bear_amount, player.life - opponent.life,
+                            own_power - enemy_power, own_toughness - enemy_toughness])
+    # the same features and weights as heuristic_values, so single and batched leaves agree
+    return float(differences @ HEURISTIC_WEIGHTS)
+
+
+def heuristic_values(player_index, games):
+    """ heuristic_value for many games at once, from the point of view of the player with player_index.
+        Returns a numpy array with one value per game.
+    """
+    material = np.empty((len(games), 2, 3))
+    lives = np.empty((len(games), 2))
+    lost = np.empty((len(games), 2), dtype=bool)
+    for b, game in enumerate(games):
+        player = game.players[player_index]
+        opponent = player.get_opponent(game)
+        material[b, 0] = game.battlefield.get_material(player_index)
+        material[b, 1] = game.battlefield.total
+        lives[b] = player.life, opponent.life
+        lost[b] = player.has_lost, opponent.has_lost
+    own = material[:, 0]
+    enemy = material[:, 1] - own
+    differences = np.column_stack([own[:, 0] - enemy[:, 0], lives[:, 0] - lives[:, 1],
+                                   own[:, 1] - enemy[:, 1], own[:, 2] - enemy[:, 2]])
+    values = differences @ HEURISTIC_WEIGHTS
+    values = np.where(lost[:, 0], -9999, values)
+    return np.where(lost[:, 1], 9999, values)
+
+
+def static_move_score(game, player, move, key):
+    """ A cheap guess of how promising a move is, used to search likely cutoff moves first. """
+    kind = key[0]
+    if kind == 'cast':
+        card = next((c for c in player.hand + player.command_zone if c.name == key[1]), None)
+        if isinstance(card, Spell) and card.resolver.is_removal:
+            return 50
+        if isinstance(card, Land):
+            return 40
+        if isinstance(card, Creature):
+            return 10 + card.power + card.toughness
+        return 10
+    if kind == 'target':
+        # hit the opponents' permanents and players rather than our own
+        if len(key) == 4:
+            return 20 if key[3] != player.index else -20
+        return 0
+    if kind == 'attack':
+        attackers = game.get_attacker_combination(game.active_player.get_eligible_attackers(game), move)
+        return attack_score(game, attackers)
+    if kind == 'declare_attacker':
+        if not move:
+            return 0
+        attacker = game.active_player.get_eligible_attackers(game)[len(game.combat.declaration)]
+        return attack_score(game, [attacker])
+    if kind == 'ability':
+        return 5
+    return 0
+
+
+def attack_score(game, attackers):
+    blockers = game.nonactive_player.get_eligible_blockers(game)
+    score = 0
+    for attacker in attackers:
+        score += attacker.power
+        # attackers that no untapped blocker can kill are close to free damage
+        if all(blocker.power < attacker.toughness for blocker in blockers):
+            score += 2 + attacker.power
+    return score
+
+
+class MoveOrdering:
+    """ Move ordering state shared across one alpha-beta search: two killer moves per depth, and a history
+        table that rewards moves which caused cutoffs. Both are keyed by Game.get_move_key, so a move that
+        refuted one position is tried early in sibling positions where the same move is legal.
+    """
+
+    def __init__(self):
+        self.killers = {}
+        self.history = {}
+
+    def order(self, game, player, moves, depth):
+        """ Returns (move, key) pairs, best first. """
+        if len(moves) < 2:
+            return [(move, game.get_move_key(move, player)) for move in moves]
+        killers = self.killers.get(depth, ())
+        scored = []
+        for move in moves:
+            key = game.get_move_key(move, player)
+            score = static_move_score(game, player, move, key) + self.history.get(key, 0)
+            if key in killers:
+                score += KILLER_BONUS
+            scored.append((-score, len(scored), move, key))
+        scored.sort()
+        return [(move, key) for _, _, move, key in scored]
+
+    def record_cutoff(self, key, depth):
+        killers = self.killers.setdefault(depth, [])
+        if key not in killers:
+            killers.insert(0, key)
+            del killers[2:]
+        self.history[key] = self.history.get(key, 0) + depth * depth
 
 
 # from wikipedia
 # not a good method for mtg, assumes full knowledge of both hands and deck orders
-def alphabeta(player, game, depth, alpha, beta, maximizing_player):
+def alphabeta(player, game, depth, alpha, beta, maximizing_player, batch_leaves=False, ordering=None):
+    """ With batch_leaves, nodes one ply above the horizon copy all of their children and score them with a
+        single heuristic_values call instead of evaluating and pruning them one at a time.
+        With a MoveOrdering, moves are searched best first and cutoffs update its killer and history tables.
+    """
     if depth == 0 or game.is_over():
         return heuristic_value(game.players[player.index], game)
+    moving_player = game.player_with_priority
+    legal_moves = game.get_legal_moves(moving_player)
+    if depth == 1 and batch_leaves:
+        leaves = []
+        for new_move in legal_moves:
+            game_copy = copy.deepcopy(game)
+            game_copy.make_move(new_move)
+            leaves.append(game_copy)
+        if not leaves:
+            return -9999 if maximizing_player else 9999
+        values = heuristic_values(player.index, leaves)
+        return float(values.max() if maximizing_player else values.min())
+    if ordering is None:
+        ordered_moves = [(move, None) for move in legal_moves]
+    else:
+        ordered_moves = ordering.order(game, moving_player, legal_moves, depth)
     if maximizing_player:
         v = -9999
-        for new_move in game.get_legal_moves(game.players[player.index]):
+        for new_move, key in ordered_moves:
             game_copy = copy.deepcopy(game)
             game_copy.make_move(new_move)
             v = max(v, alphabeta(player, game_copy, depth - 1, alpha, beta,
-                                 game_copy.player_with_priority.index is not player.index))
+                                 game_copy.player_with_priority.index == player.index, batch_leaves, ordering))
             alpha = max(alpha, v)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.record_cutoff(key, depth)
                 break
         return v
     else:
         v = 9999
-        for new_move in game.get_legal_moves(game.players[1 - player.index]):
+        for new_move, key in ordered_moves:
             game_copy = copy.deepcopy(game)
             game_copy.make_move(new_move)
             v = min(v, alphabeta(player, game_copy, depth - 1, alpha, beta,
-                                 game_copy.player_with_priority.index is player.index))
+                                 game_copy.player_with_priority.index == player.index, batch_leaves, ordering))
             beta = min(beta, v)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.record_cutoff(key, depth)
                 break
         return v
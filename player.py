@@ -1,10 +1,8 @@
-import copy
-import random
-import numpy as np
 import logging
-import minimax
+import agents
 
-from cards import Card, Land, Creature, Sorcery
+from cards import Card, Land, Creature, Spell
+from library import Library
 
 
 class Player:
@@ -23,8 +21,23 @@ class Player:
         self.has_attacked = False
         self.has_blocked = False
         self.passed_priority = True
-        self.casting_spell = ""
+        # the spell whose targets or choices the player is deciding on, see cards.Resolver
+        self.casting_spell = None
         self.manapool = {'White': 0, 'Blue': 0, 'Black': 0, 'Red': 0, 'Green': 0, 'Colorless': 0}
+        # the GameRandom of the game the player is in, set by Game
+        self.rng = None
+
+    @property
+    def deck(self):
+        return self._deck
+
+    @deck.setter
+    def deck(self, cards):
+        # the library is always a Library, so that searches can use its indexes, and keeps its order mode
+        if not isinstance(cards, Library):
+            previous = getattr(self, '_deck', None)
+            cards = Library(cards, previous is not None and previous.hidden_order)
+        self._deck = cards
 
     def get_mp_as_list(self):
         mp_list = []
@@ -42,23 +55,11 @@ class Player:
             self.has_lost = True
 
     def determine_move(self, method, game):
+        """ The move of the agent named method (see agents.AGENT_TYPES), for the player with priority. """
         legal_moves = game.get_legal_moves(self)
         if len(legal_moves) == 1:
             return legal_moves[0]
-        if method == "random":
-            return random.choice(legal_moves)
-        if method == "alphabeta":
-            move_values = [-9999] * len(legal_moves)
-            for i in range(len(move_values)):
-                new_game = copy.deepcopy(game)
-                new_game.make_move(legal_moves[i])
-                move_values[i] = minimax.alphabeta(self, new_game, 1, -9999, 9999,
-                                                   new_game.player_with_priority.index is not self.index)
-
-            winner = np.argwhere(move_values == np.amax(move_values))
-            winner.flatten().tolist()
-            arg = random.choice(winner)[0]
-            return legal_moves[arg]
+        return agents.make_agent(method).decide(game)
 
     def can_afford_card(self, card):
         cost = card.mc.copy()
@@ -75,11 +76,7 @@ class Player:
         return True
 
     def has_legal_targets(self, card, game):
-        if card.name == "Vengeance" and len(game.get_tapped_creature_indices()) == 0:
-            return False
-        if card.name == "Stone Rain" and len(game.get_land_indices()) == 0:
-            return False
-        return True
+        return card.resolver.has_legal_targets(game, self)
 
     def get_opponent(self, game):
         return game.players[(self.index + 1) % len(game.players)]
@@ -95,7 +92,7 @@ class Player:
             elif isinstance(card, Creature):
                 if self.can_afford_card(card):
                     playable_moves.append(('hand', i))
-            elif isinstance(card, Sorcery):
+            elif isinstance(card, Spell):
                 if self.can_afford_card(card) and self.has_legal_targets(card, game):
                     playable_moves.append(('hand', i))
             else:
@@ -110,18 +107,13 @@ class Player:
         return playable_moves
 
     def find_land_in_library(self, land_type):
-        for i in range(len(self.deck)):
-            if isinstance(self.deck[i], Land):
-                if land_type in self.deck[i].subtypes:
-                    return i
-        return -1
+        land = self.deck.find(land_type, Land)
+        if land is None:
+            return -1
+        return self.deck.position(land)
 
     def get_library_land_indices(self):
-        land_indices = []
-        for i in range(len(self.deck)):
-            if isinstance(self.deck[i], Land):
-                land_indices.append(i)
-        return land_indices
+        return sorted(self.deck.position(land) for land in self.deck.find_all("Land"))
 
     def reset_mp(self):
         self.manapool = {'White': 0, 'Blue': 0, 'Black': 0, 'Red': 0, 'Green': 0, 'Colorless': 0}
@@ -135,7 +127,7 @@ class Player:
         return mana['Generic']
 
     def shuffle_deck(self):
-        random.shuffle(self.deck)
+        self.deck.shuffle(self.rng)
 
     def draw_card(self):
         if len(self.deck) < 1:
@@ -0,0 +1,62 @@
+import operator
+
+import numpy as np
+
+
+class GameRandom:
+    """ The source of randomness of one game, backed by a numpy Generator.
+
+        Uniform floats and shuffle permutations are pre-sampled in blocks, so a single choice or shuffle is an
+        array lookup rather than a call into the random module. spawn() derives independent, reproducible
+        substreams for workers and search threads.
+
+        Deep copying a GameRandom (for example as part of copy.deepcopy(game)) forks it: the copy gets a fresh
+        substream and the original stream is left untouched. Searches and rollouts on copied games therefore
+        never change the random events of the real game, which stay reproducible from its seed.
+    """
+
+    def __init__(self, seed=None, generator=None, block_size=256, permutation_block_size=16):
+        self.generator = np.random.default_rng(seed) if generator is None else generator
+        self.block_size = block_size
+        self.permutation_block_size = permutation_block_size
+        self._floats = None
+        self._float_cursor = block_size
+        self._permutations = {}
+
+    def spawn(self, n):
+        """ n independent child streams. """
+        return [GameRandom(generator=generator, block_size=self.block_size,
+                           permutation_block_size=self.permutation_block_size)
+                for generator in self.generator.spawn(n)]
+
+    def random(self):
+        if self._float_cursor >= self.block_size:
+            self._floats = self.generator.random(self.block_size).tolist()
+            self._float_cursor = 0
+        value = self._floats[self._float_cursor]
+        self._float_cursor += 1
+        return value
+
+    def randint(self, a, b):
+        """ Random integer in [a, b], including both end points like random.randint. """
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def permutation(self, n):
+        block, cursor = self._permutations.get(n, (None, self.permutation_block_size))
+        if cursor >= self.permutation_block_size:
+            block = self.generator.permuted(np.tile(np.arange(n), (self.permutation_block_size, 1)), axis=1)
+            cursor = 0
+        self._permutations[n] = (block, cursor + 1)
+        return block[cursor]
+
+    def shuffle(self, items):
+        """ Shuffles a list in place. """
+        if len(items) < 2:
+            return
+        items[:] = operator.itemgetter(*self.permutation(len(items)))(items)
+
+    def __deepcopy__(self, memo):
+        return self.spawn(1)[0]
@@ -0,0 +1,65 @@
+import minimax
+from cards import Land
+from phases import Phases
+
+
+class RandomRollout:
+    """ Uniformly random moves, the rollout policy of plain UCT. """
+
+    def choose(self, game, moves):
+        return game.rng.choice(moves)
+
+
+class HeuristicRollout:
+    """ A rollout policy that plays a few obviously good moves and is otherwise epsilon-greedy.
+
+        With lands_first, a land is played whenever one can be. With lethal_attacks, everything attacks when
+        the attack is lethal even if each untapped blocker stops one of the biggest attackers. Any other
+        decision is random with probability epsilon, and otherwise takes the move with the best
+        minimax.static_move_score, ties broken at random. Decisions with more than max_scored_moves moves are
+        always random, so a rollout never scores thousands of block declarations.
+    """
+
+    def __init__(self, epsilon=0.2, lands_first=True, lethal_attacks=True, max_scored_moves=32):
+        self.epsilon = epsilon
+        self.lands_first = lands_first
+        self.lethal_attacks = lethal_attacks
+        self.max_scored_moves = max_scored_moves
+
+    def choose(self, game, moves):
+        if len(moves) == 1:
+            return moves[0]
+        player = game.player_with_priority
+        if player.generic_debt == 0 and player.casting_spell is None:
+            if self.lands_first and game.current_phase_index == Phases.MAIN_PHASE_PRE_COMBAT:
+                move = self.land_move(game, player)
+                if move is not None:
+                    return move
+            if self.lethal_attacks and game.current_phase_index == Phases.DECLARE_ATTACKERS_STEP:
+                move = self.lethal_attack_move(game, moves)
+                if move is not None:
+                    return move
+        if len(moves) > self.max_scored_moves or game.rng.random() < self.epsilon:
+            return game.rng.choice(moves)
+        scores = [minimax.static_move_score(game, player, move, game.get_move_key(move)) for move in moves]
+        best = max(scores)
+        return game.rng.choice([move for move, score in zip(moves, scores) if score == best])
+
+    @staticmethod
+    def land_move(game, player):
+        for move, (zone, index) in enumerate(player.get_playable_cards(game)):
+            if zone == 'hand' and isinstance(player.hand[index], Land):
+                return move
+        return None
+
+    @staticmethod
+    def lethal_attack_move(game, moves):
+        attackers = game.active_player.get_eligible_attackers(game)
+        blockers = game.nonactive_player.get_eligible_blockers(game)
+        powers = sorted((attacker.power for attacker in attackers), reverse=True)
+        if not attackers or sum(powers[len(blockers):]) < game.nonactive_player.life:
+            return None
+        if game.factored_combat:
+            return 1 if 1 in moves else None
+        # the last attack move declares every eligible attacker, see Game.get_attacker_combination
+        return moves[-1]
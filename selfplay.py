@@ -0,0 +1,248 @@
+import argparse
+import collections
+import json
+import logging
+import multiprocessing
+import os
+
+import numpy as np
+
+import card_db
+import game
+import mcts
+import player
+import tournament
+from features import FeatureEncoder
+
+FORMAT_VERSION = 1
+
+SelfPlayConfig = collections.namedtuple("SelfPlayConfig", [
+    "directory", "decks", "itermax", "seed", "shard_size", "max_moves", "max_game_moves", "temperature_moves",
+    "max_players", "max_permanents"])
+
+
+def make_config(directory, decks=("8ed_core_gold", "8ed_core_silver"), itermax=20, seed=0, shard_size=4096,
+                max_moves=64, max_game_moves=5000, temperature_moves=30, max_players=2, max_permanents=64):
+    """ A SelfPlayConfig with defaults.
+
+        max_moves is the width of the legal-move mask and the visit distribution; decisions with more legal
+        moves are played but not recorded. The first temperature_moves decisions of a game sample their move
+        from the visit distribution, later ones play the most visited move.
+    """
+    if itermax < 1:
+        raise ValueError("itermax must be at least 1 for the searches to have visits, not %r" % (itermax,))
+    return SelfPlayConfig(directory, tuple(decks), itermax, seed, shard_size, max_moves, max_game_moves,
+                          temperature_moves, max_players, max_permanents)
+
+
+def make_encoder(config):
+    return FeatureEncoder(config.max_players, config.max_permanents)
+
+
+def record_dtype(encoder, max_moves):
+    """ The numpy dtype of one recorded decision. move_number is the number of moves (including forced ones)
+        made in the game before this decision, so the decision can be replayed from the game's move list.
+    """
+    return np.dtype([
+        ("game", np.int64),
+        ("decision", np.int32),
+        ("move_number", np.int32),
+        ("player", np.int8),
+        ("features", encoder.dtype, (encoder.vector_size,)),
+        ("legal_mask", np.bool_, (max_moves,)),
+        ("move", np.int16),
+        ("visits", np.float32, (max_moves,)),
+        ("result", np.float32),
+    ])
+
+
+def game_decks(config, game_id):
+    """ Games alternate deck sides. """
+    return config.decks if game_id % 2 == 0 else config.decks[::-1]
+
+
+def game_seed(config, game_id):
+    return [config.seed, game_id]
+
+
+def new_game(decks, seed):
+    registry = card_db.get_registry()
+    players = [player.Player(registry.create_deck(deck_name)) for deck_name in decks]
+    current_game = game.Game(players, seed=seed)
+    current_game.start_game()
+    return current_game
+
+
+def root_visits(current_game, legal_moves, itermax):
+    """ Visit counts of a UCT search from current_game, indexed like legal_moves. """
+    visits = np.zeros(len(legal_moves), dtype=np.float32)
+    # children are keyed by what their move does; moves that do the same thing share the visits of the first
+    indices = {}
+    for i, move in enumerate(legal_moves):
+        indices.setdefault(current_game.get_move_key(move), i)
+    for move_key, child in mcts.uct_search(current_game, itermax).child_nodes.items():
+        if move_key in indices:
+            visits[indices[move_key]] += child.visits
+    return visits
+
+
+def play_game(game_id, config, encoder=None):
+    """ Plays one self-play game with UCT on both seats.
+
+        Returns the records of its decisions and a JSON-serializable description with the seed, decks and the
+        index of every move made, from which the game can be replayed. The result of each record is the final
+        score of the player who made the decision; games longer than max_game_moves are drawn.
+    """
+    encoder = make_encoder(config) if encoder is None else encoder
+    dtype = record_dtype(encoder, config.max_moves)
+    decks = game_decks(config, game_id)
+    seed = game_seed(config, game_id)
+    current_game = new_game(decks, seed)
+    # the move sampler has its own stream, the game's rng must only be used by the game so it can be replayed
+    sampler = np.random.default_rng(seed + [1])
+    buffers = encoder.allocate(1)
+    moves = []
+    records = []
+    decisions = 0
+    while not current_game.is_over() and len(moves) < config.max_game_moves:
+        legal_moves = current_game.get_moves()
+        if len(legal_moves) == 1:
+            index = 0
+        else:
+            visits = root_visits(current_game, legal_moves, config.itermax)
+            distribution = visits / visits.sum()
+            if decisions < config.temperature_moves:
+                index = int(sampler.choice(len(legal_moves), p=distribution))
+            else:
+                index = int(np.argmax(visits))
+            if len(legal_moves) <= config.max_moves:
+                record = np.zeros(1, dtype=dtype)
+                record["game"] = game_id
+                record["decision"] = len(records)
+                record["move_number"] = len(moves)
+                record["player"] = current_game.player_with_priority.index
+                encoder.to_vectors(encoder.encode(current_game, out=buffers), out=record["features"])
+                record["legal_mask"][0, :len(legal_moves)] = True
+                record["move"] = index
+                record["visits"][0, :len(legal_moves)] = distribution
+                records.append(record)
+            decisions += 1
+        moves.append(index)
+        current_game.make_move(legal_moves[index])
+
+    if current_game.is_over():
+        results = np.array([current_game.get_results(i) for i in range(len(current_game.players))], dtype=np.float32)
+    else:
+        results = np.full(len(current_game.players), 0.5, dtype=np.float32)
+    records = np.concatenate(records) if records else np.zeros(0, dtype=dtype)
+    records["result"] = results[records["player"]]
+    description = {"game": game_id, "seed": seed, "decks": list(decks), "itermax": config.itermax,
+                   "moves": moves, "result": results.tolist(), "finished": current_game.is_over()}
+    return records, description
+
+
+class ShardWriter:
+    """ Streams records into numbered shards of at most shard_size records.
+
+        Records are copied into one preallocated buffer, which is written out as <prefix>-<number>.npy whenever
+        it fills up, so memory stays bounded however many games are played. Next to every shard a JSON sidecar
+        describes the games with records in it; a game split over two shards is described in both. Files are
+        written under a temporary name and renamed, so readers never see a partial shard.
+    """
+
+    def __init__(self, directory, prefix, dtype, shard_size, header=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.header = header or {}
+        self.buffer = np.zeros(shard_size, dtype=dtype)
+        self.count = 0
+        self.games = {}
+        self.paths = []
+        os.makedirs(directory, exist_ok=True)
+
+    def add_game(self, records, description):
+        offset = 0
+        while offset < len(records):
+            size = min(self.shard_size - self.count, len(records) - offset)
+            self.buffer[self.count:self.count + size] = records[offset:offset + size]
+            self.games[description["game"]] = description
+            self.count += size
+            offset += size
+            if self.count == self.shard_size:
+                self.flush()
+
+    def flush(self):
+        if self.count == 0:
+            return
+        base = os.path.join(self.directory, "%s-%05d" % (self.prefix, len(self.paths)))
+        with open(base + ".npy.tmp", "wb") as shard_file:
+            np.save(shard_file, self.buffer[:self.count])
+        sidecar = dict(self.header, version=FORMAT_VERSION, records=self.count, games=list(self.games.values()))
+        with open(base + ".json.tmp", "w", encoding="utf-8") as sidecar_file:
+            json.dump(sidecar, sidecar_file, separators=(",", ":"))
+        os.replace(base + ".json.tmp", base + ".json")
+        os.replace(base + ".npy.tmp", base + ".npy")
+        path = base + ".npy"
+        self.paths.append(path)
+        self.count = 0
+        self.games = {}
+
+    def close(self):
+        self.flush()
+
+
+def shard_header(config):
+    return {"max_moves": config.max_moves, "max_players": config.max_players,
+            "max_permanents": config.max_permanents}
+
+
+def run_worker(worker, game_ids, config):
+    """ Plays the given games and writes their records to this worker's shards. """
+    encoder = make_encoder(config)
+    writer = ShardWriter(config.directory, "w%03d" % worker, record_dtype(encoder, config.max_moves),
+                         config.shard_size, shard_header(config))
+    decisions = 0
+    for game_id in game_ids:
+        records, description = play_game(game_id, config, encoder)
+        writer.add_game(records, description)
+        decisions += len(records)
+        logging.info("Worker {0}: game {1} recorded {2} decisions".format(worker, game_id, len(records)))
+    writer.close()
+    return {"worker": worker, "games": len(game_ids), "decisions": decisions, "shards": writer.paths}
+
+
+def generate(config, games, processes=None):
+    """ Plays games self-play games on a process pool, game i on worker i % processes. Returns the summary of
+        every worker, including the paths of the shards it wrote.
+    """
+    processes = processes or multiprocessing.cpu_count()
+    tasks = [(worker, list(range(worker, games, processes)), config) for worker in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        return pool.starmap(run_worker, [task for task in tasks if task[1]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writes self-play games of Open MTG as sharded numpy records")
+    parser.add_argument("directory")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--decks", default="8ed_core_gold:8ed_core_silver")
+    parser.add_argument("--itermax", type=int, default=20)
+    parser.add_argument("--shard-size", type=int, default=4096, help="records per shard")
+    parser.add_argument("--max-moves", type=int, default=64, help="width of the legal-move mask")
+    parser.add_argument("--temperature-moves", type=int, default=30)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)-5.5s]  %(message)s")
+    config = make_config(args.directory, tournament.parse_pairing(args.decks), args.itermax, args.seed, args.shard_size,
+                         args.max_moves, temperature_moves=args.temperature_moves)
+    summaries = generate(config, args.games, args.processes)
+    print("%d games, %d decisions in %d shards" % (sum(s["games"] for s in summaries),
+                                                  sum(s["decisions"] for s in summaries),
+                                                  sum(len(s["shards"]) for s in summaries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+
+import numpy as np
+
+import card_db
+import game
+import player
+
+# messages are a 4 byte big-endian length followed by that many bytes of UTF-8 JSON
+HEADER_SIZE = 4
+MAX_MESSAGE_SIZE = 1 << 20
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_field(request, field, valid, expected):
+    value = request.get(field)
+    if not valid(value):
+        raise ValueError("%s must be %s, not %r" % (field, expected, value))
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    raise TypeError("%r is not JSON serializable" % (value,))
+
+
+def encode_message(message):
+    body = json.dumps(message, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return len(body).to_bytes(HEADER_SIZE, "big") + body
+
+
+async def read_message(reader):
+    """ The next message from reader, or None once the other side has closed the connection. """
+    try:
+        header = await reader.readexactly(HEADER_SIZE)
+    except asyncio.IncompleteReadError:
+        return None
+    size = int.from_bytes(header, "big")
+    if size > MAX_MESSAGE_SIZE:
+        raise ProtocolError("message of %d bytes is larger than %d" % (size, MAX_MESSAGE_SIZE))
+    message = json.loads(await reader.readexactly(size))
+    if not isinstance(message, dict):
+        raise ProtocolError("messages must be JSON objects")
+    return message
+
+
+async def write_message(writer, message):
+    writer.write(encode_message(message))
+    await writer.drain()
+
+
+class GameServer:
+    """ Hosts games for agents in other processes.
+
+        A client sends requests like {"id": 1, "op": "move", "game": 3, "move": 0} and gets one reply per
+        request, carrying the same id. Operations:
+
+        new    decks, seed, factored      starts a game, replies with its state; seed and factored (for one
+                                          creature per combat declaration move) are optional
+        state  game, describe (optional)  the state of a game
+        move   game, move                 makes the move with that index in the legal moves, replies with the
+                                          new state, so every decision takes one round trip
+        close  game                       drops a game
+
+        A state holds the game id, the player with priority, the phase, life totals, whether the game is over
+        and its results if it is, and the legal moves; with describe the moves are also given as
+        Game.get_move_key descriptions. Errors are replied as {"id": ..., "error": "..."}.
+
+        Games are plain objects in a dict and all clients are served by one event loop, so idle games cost only
+        their memory however many there are. Moves are cheap next to the network round trip and are made
+        directly on the loop.
+    """
+
+    def __init__(self, max_games=10000):
+        self.max_games = max_games
+        self.games = {}
+        self.game_ids = itertools.count()
+        self.registry = card_db.get_registry()
+
+    def new_game(self, decks, seed=None, factored_combat=False):
+        if len(self.games) >= self.max_games:
+            raise ValueError("server is full with %d games" % self.max_games)
+        players = [player.Player(self.registry.create_deck(deck_name)) for deck_name in decks]
+        new_game = game.Game(players, seed=seed, factored_combat=factored_combat)
+        new_game.start_game()
+        game_id = next(self.game_ids)
+        self.games[game_id] = new_game
+        return game_id
+
+    def get_game(self, game_id):
+        try:
+            return self.games[game_id]
+        except KeyError:
+            raise ValueError("unknown game %r" % (game_id,))
+
+    def describe(self, game_id, describe_moves=False):
+        current_game = self.get_game(game_id)
+        moves = current_game.get_moves()
+        state = {"game": game_id, "player": current_game.player_with_priority.index,
+                 "phase": current_game.current_phase_index.name, "life": [p.life for p in current_game.players],
+                 "over": current_game.is_over(), "moves": moves}
+        if state["over"]:
+            state["results"] = [current_game.get_results(p.index) for p in current_game.players]
+        if describe_moves:
+            state["keys"] = [current_game.get_move_key(move) for move in moves]
+        return state
+
+    def make_move(self, game_id, move_index):
+        current_game = self.get_game(game_id)
+        moves = current_game.get_moves()
+        if not _is_int(move_index) or not 0 <= move_index < len(moves):
+            raise ValueError("move %r is not one of the %d legal moves" % (move_index, len(moves)))
+        current_game.make_move(moves[move_index])
+
+    def handle(self, request):
+        """ The reply to one request. Raises ValueError for a request that cannot be served. """
+        op = request.get("op")
+        if op == "new":
+            decks = _check_field(request, "decks", lambda value: isinstance(value, list) and
+                                 all(isinstance(deck, str) for deck in value), "a list of deck names")
+            seed = _check_field(request, "seed", lambda value: value is None or _is_int(value), "an integer")
+            game_id = self.new_game(decks, seed, bool(request.get("factored", False)))
+        elif op in ("state", "move", "close"):
+            game_id = _check_field(request, "game", _is_int, "an integer")
+            if op == "move":
+                self.make_move(game_id, _check_field(request, "move", _is_int, "an integer"))
+            elif op == "close":
+                self.get_game(game_id)
+                del self.games[game_id]
+                return {"game": game_id, "closed": True}
+        else:
+            raise ValueError("unknown op %r" % (op,))
+        return self.describe(game_id, request.get("describe", False))
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                request = await read_message(reader)
+                if request is None:
+                    break
+                try:
+                    reply = self.handle(request)
+                except (KeyError, ValueError) as error:
+                    reply = {"error": str(error)}
+                except Exception as error:
+                    # a bug hit by one request should not cost the client its other games
+                    logging.exception("Failed to handle {0}".format(request))
+                    reply = {"error": "internal error: {0!r}".format(error)}
+                reply["id"] = request.get("id")
+                await write_message(writer, reply)
+        except (ProtocolError, ValueError, ConnectionError) as error:
+            logging.warning("Dropping client: {0}".format(error))
+        finally:
+            writer.close()
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """ Listens on a unix socket at path, or on TCP host and port. Returns the asyncio server. """
+        if path is not None:
+            return await asyncio.start_unix_server(self.serve_client, path)
+        return await asyncio.start_server(self.serve_client, host, port)
+
+
+class GameClient:
+    """ A connection to a GameServer. Any number of coroutines may await request() at the same time; replies
+        are matched to their requests by id.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.request_ids = itertools.count()
+        self.pending = {}
+        self.receiver = asyncio.get_running_loop().create_task(self.receive())
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None):
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def receive(self):
+        try:
+            while True:
+                reply = await read_message(self.reader)
+                if reply is None:
+                    break
+                self.pending.pop(reply["id"]).set_result(reply)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("server closed the connection"))
+            self.pending.clear()
+
+    async def request(self, op, **fields):
+        if self.receiver.done():
+            raise ConnectionError("server closed the connection")
+        request_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await write_message(self.writer, dict(fields, op=op, id=request_id))
+        reply = await future
+        if "error" in reply:
+            raise ValueError(reply["error"])
+        return reply
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.receiver
+
+
+async def serve(path=None, host="127.0.0.1", port=0, max_games=10000):
+    server = await GameServer(max_games).start(path, host, port)
+    logging.info("Serving games on {0}".format(path or server.sockets[0].getsockname()))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves Open MTG games to agents over a local socket")
+    parser.add_argument("--socket", default=None, help="path of a unix socket, instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--max-games", type=int, default=10000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)-5.5s]  %(message)s")
+    asyncio.run(serve(args.socket, args.host, args.port, args.max_games))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import itertools
+
+import events
+from cards import Creature, Land, Resolver, register_resolver
+
+
+def describe_target(target):
+    if hasattr(target, "owner"):
+        return target.name, target.owner.index
+    return 'player', target.index
+
+
+class DestroyTappedCreature(Resolver):
+    """ Vengeance: destroy target tapped creature. Moves are battlefield indices. """
+    is_removal = True
+
+    def has_legal_targets(self, game, player):
+        return len(game.get_tapped_creature_indices()) > 0
+
+    def get_moves(self, game, player):
+        return game.get_tapped_creature_indices()
+
+    def resolve(self, game, player, move, verbose=False):
+        dead_creature = game.battlefield[move]
+        game.battlefield.remove(dead_creature)
+        dead_creature.owner.graveyard.append(dead_creature)
+        events.emit(game, events.ZoneChangeEvent(dead_creature.owner.index, dead_creature.name,
+                                                 "battlefield", "graveyard"), verbose)
+
+    def describe_move(self, game, player, move):
+        return describe_target(game.battlefield[move])
+
+
+class DestroyLand(DestroyTappedCreature):
+    """ Stone Rain: destroy target land. Moves are battlefield indices. """
+
+    def has_legal_targets(self, game, player):
+        return len(game.get_land_indices()) > 0
+
+    def get_moves(self, game, player):
+        return game.get_land_indices()
+
+
+class DamagePlayer(Resolver):
+    """ Lava Axe: deals damage to target player. Moves are player indices. """
+    is_removal = True
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def get_moves(self, game, player):
+        return list(range(len(game.players)))
+
+    def resolve(self, game, player, move, verbose=False):
+        game.deal_damage(game.players[move], self.amount)
+        events.emit(game, events.DamageEvent(player.casting_spell.name, events.player_name(game.players[move]),
+                                             self.amount), verbose)
+
+    def describe_move(self, game, player, move):
+        return 'player', move
+
+
+class DamageAnyTarget(Resolver):
+    """ Volcanic Hammer: deals damage to any target. Moves index Game.damage_targets. """
+    is_removal = True
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def get_moves(self, game, player):
+        game.update_damage_targets()
+        return list(range(len(game.damage_targets)))
+
+    def resolve(self, game, player, move, verbose=False):
+        game.update_damage_targets()
+        target = game.damage_targets[move]
+        game.deal_damage(target, self.amount)
+        target_name = target.name if isinstance(target, Creature) else events.player_name(target)
+        events.emit(game, events.DamageEvent(player.casting_spell.name, target_name, self.amount), verbose)
+
+    def describe_move(self, game, player, move):
+        game.update_damage_targets()
+        return describe_target(game.damage_targets[move])
+
+
+class GainLife(Resolver):
+    """ Sacred Nectar: gain life. """
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def get_moves(self, game, player):
+        return ["Resolve Spell"]
+
+    def resolve(self, game, player, move, verbose=False):
+        player.life += self.amount
+
+
+class SearchBasicLand(Resolver):
+    """ Rampant Growth: search for a basic land and put it onto the battlefield, then shuffle.
+        Moves are the basic land types found in the library, or "Refuse".
+    """
+    basic_land_types = ["Plains", "Island", "Swamp", "Mountain", "Forest"]
+
+    def get_moves(self, game, player):
+        choices = ["Refuse"]
+        for land_type in self.basic_land_types:
+            if player.find_land_in_library(land_type) >= 0:
+                choices.append(land_type)
+        return choices
+
+    def resolve(self, game, player, move, verbose=False):
+        if not move == "Refuse":
+            land = player.deck.take(player.deck.find(move, Land))
+            game.battlefield.append(land)
+            land.is_tapped = False
+            land.owner = player
+            events.emit(game, events.ZoneChangeEvent(player.index, land.name, "library", "battlefield"), verbose)
+        player.shuffle_deck()
+
+
+class LookAtTopCards(Resolver):
+    """ Index: look at the top cards of the library and put them back in any order.
+        Moves are permutations of the looked at cards.
+    """
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def get_moves(self, game, player):
+        return list(itertools.permutations(list(range(min(self.amount, len(player.deck))))))
+
+    def resolve(self, game, player, move, verbose=False):
+        for i in range(len(move)):
+            indexed_card = player.deck.pop()
+            indexed_card.deck_location_known = True
+            game.temporary_zone.append(indexed_card)
+        # TODO: Consider if the logic behind declaring blockers, declaring attackers and assigning combat damage
+        #       can be simplified in a similar manner by allowing moves to be a list of lists
+        for index in move:
+            player.deck.append(game.temporary_zone[index])
+        game.temporary_zone = []
+
+
+register_resolver("Vengeance", DestroyTappedCreature())
+register_resolver("Stone Rain", DestroyLand())
+register_resolver("Lava Axe", DamagePlayer(5))
+register_resolver("Volcanic Hammer", DamageAnyTarget(3))
+register_resolver("Sacred Nectar", GainLife(4))
+register_resolver("Rampant Growth", SearchBasicLand())
+register_resolver("Index", LookAtTopCards(5))
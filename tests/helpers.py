@@ -0,0 +1,37 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deck
+import evaluators
+from cards import Creature
+from game import Game
+from player import Player
+
+
+def new_game(seed, factored_combat=False):
+    """ A started game of the gold deck against the silver deck. """
+    game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=seed,
+                factored_combat=factored_combat)
+    game.start_game()
+    return game
+
+
+def creature(name, owner, power, toughness):
+    """ A vanilla creature owned by owner that has been under its control since the turn began. """
+    permanent = Creature(name, "", {'Generic': 1}, power, toughness)
+    permanent.owner = owner
+    permanent.summoning_sick = False
+    return permanent
+
+
+class CountingEvaluator(evaluators.HeuristicEvaluator):
+    """ A HeuristicEvaluator that records the size of every batch it scores. """
+
+    def __init__(self):
+        super(CountingEvaluator, self).__init__()
+        self.batch_sizes = []
+
+    def evaluate(self, games, player_indices):
+        self.batch_sizes.append(len(games))
+        return super(CountingEvaluator, self).evaluate(games, player_indices)
@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agents
+from helpers import CountingEvaluator, new_game
+
+
+class CountingAgent(agents.RandomAgent):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def decide_batch(self, games):
+        self.batch_sizes.append(len(games))
+        return super(CountingAgent, self).decide_batch(games)
+
+
+class TestAgents(unittest.TestCase):
+    def test_make_agent(self):
+        self.assertIsInstance(agents.make_agent("uct", 5), agents.UCTAgent)
+        self.assertEqual(agents.make_agent("uct", 5).itermax, 5)
+        with self.assertRaises(ValueError):
+            agents.make_agent("oracle")
+        # an agent without decide() fails when it is created rather than when it is first asked for a move
+        with self.assertRaises(TypeError):
+            type("Undecided", (agents.Agent,), {})()
+
+    def test_run_games_batches_shared_agents(self):
+        games = [new_game(seed) for seed in range(4)]
+        agent = CountingAgent()
+        move_counts = agents.run_games(games, [agent, agent])
+        self.assertTrue(all(game.is_over() for game in games))
+        self.assertEqual(len(move_counts), 4)
+        self.assertEqual(max(agent.batch_sizes), 4)
+
+    def test_run_games_stops_at_max_moves(self):
+        game = new_game(0)
+        self.assertEqual(agents.run_games([game], [agents.RandomAgent()] * 2, max_moves=10), [10])
+
+    def test_greedy_batch_returns_legal_moves(self):
+        games = [new_game(seed) for seed in range(3)]
+        for game in games:
+            while len(game.get_moves()) < 2:
+                game.make_move(game.get_moves()[0])
+        moves = agents.GreedyAgent().decide_batch(games)
+        for game, move in zip(games, moves):
+            self.assertIn(move, game.get_moves())
+
+    def test_batched_mcts_agent_plays_games(self):
+        games = [new_game(seed) for seed in range(4)]
+        evaluator = CountingEvaluator()
+        agent = agents.BatchedMCTSAgent(itermax=8, batch_size=4, evaluator=evaluator)
+        with mock.patch.object(agent, "decide_batch", wraps=agent.decide_batch) as decide_batch:
+            move_counts = agents.run_games(games, [agent, agents.RandomAgent()], max_moves=60)
+        self.assertTrue(all(count > 0 for count in move_counts))
+        for game, count in zip(games, move_counts):
+            self.assertTrue(game.is_over() or count == 60)
+        # decisions of several games are searched together and their leaves share evaluate() calls
+        self.assertGreater(max(len(call.args[0]) for call in decide_batch.call_args_list), 1)
+        self.assertGreater(max(evaluator.batch_sizes), 4)
+
+    def test_player_determine_move_delegates(self):
+        game = new_game(1)
+        while len(game.get_moves()) < 2:
+            game.make_move(game.get_moves()[0])
+        move = game.player_with_priority.determine_move("alphabeta", game)
+        self.assertIn(move, game.get_moves())
+
+
+if __name__ == '__main__':
+    unittest.main()
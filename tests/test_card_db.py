@@ -0,0 +1,69 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_db
+import deck
+from cards import Land, Creature, Sorcery
+from cards_impl import SolRing
+from player import Player
+
+
+class TestCardRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = card_db.get_registry()
+
+    def test_decks_build_fresh_cards(self):
+        gold = deck.get_8ed_core_gold_deck()
+        self.assertEqual(len(gold), 33)
+        self.assertEqual(len(deck.get_8ed_core_silver_deck()), 33)
+        self.assertEqual(len(deck.get_bear_wars_deck()), 84)
+        self.assertEqual(sum(isinstance(card, Land) for card in gold), 15)
+        self.assertIsNot(gold[0], deck.get_8ed_core_gold_deck()[0])
+
+    def test_card_definitions(self):
+        raider = self.registry.create("goblin_raider")
+        self.assertIsInstance(raider, Creature)
+        self.assertEqual((raider.power, raider.toughness, raider.cannot_block), (2, 2, True))
+        self.assertEqual(raider.mc['Red'], 1)
+        self.assertIsInstance(self.registry.create_by_name("Lava Axe"), Sorcery)
+        self.assertIsInstance(self.registry.create("sol_ring"), SolRing)
+
+    def test_land_mana_abilities(self):
+        taiga = self.registry.create("taiga")
+        taiga.owner = Player([])
+        taiga.use_tapped_ability(1)
+        self.assertEqual(taiga.owner.manapool['Red'], 1)
+        self.assertEqual(set(taiga.color_identity), {'Red', 'Green'})
+
+
+class TestCardDatabaseLoading(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cards.json")
+        with open(self.path, "w") as f:
+            json.dump({"cards": [{"id": "forest", "name": "Forest", "type": "Land", "types": ["Basic Land"],
+                                  "subtypes": ["Forest"], "mana": ["Green"]}],
+                       "decks": {"forests": [["forest", 3]]}}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cache_round_trip(self):
+        registry = card_db.CardRegistry.load(self.path)
+        self.assertTrue(os.path.exists(card_db._cache_path(self.path)))
+        cached = card_db.CardRegistry.load(self.path)
+        self.assertEqual(cached.definitions, registry.definitions)
+        self.assertEqual([card.name for card in cached.create_deck("forests")], ["Forest"] * 3)
+
+    def test_unknown_card_in_deck(self):
+        with self.assertRaises(ValueError):
+            card_db.compile_definitions({"cards": [], "decks": {"broken": [["missing", 1]]}})
+
+
+if __name__ == '__main__':
+    unittest.main()
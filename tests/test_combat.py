@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from combat import Combat
+from game import Game
+from phases import Phases
+from player import Player
+from cards import Card
+from helpers import creature, new_game
+
+
+class TestCombat(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([Card() for _ in range(20)]) for _ in range(2)]
+        self.game = Game(self.players, seed=0)
+        self.game.active_player, self.game.nonactive_player = self.players
+        self.attackers = [creature("Giant", self.players[0], 5, 5), creature("Bear", self.players[0], 2, 2)]
+        self.blockers = [creature("Wall", self.players[1], 0, 4), creature("Elf", self.players[1], 1, 1)]
+        self.game.battlefield.extend(self.attackers + self.blockers)
+
+    def test_blocks_and_damage_order(self):
+        combat = Combat(self.attackers)
+        combat.declare_blocks(self.blockers, [0, 0])
+        self.assertEqual(combat.blocked_by, [self.blockers, []])
+        self.assertEqual(combat.get_unordered_attacker(), 0)
+
+        # the second permutation puts the Elf first
+        combat.set_damage_assignment_order(0, 1)
+        self.assertEqual(combat.damage_order[0], [self.blockers[1], self.blockers[0]])
+        self.assertEqual(combat.get_unordered_attacker(), -1)
+        self.assertEqual(combat.get_current_assignment(), (0, 0))
+        self.assertEqual(combat.get_possible_damage_assignments(), [1, 2, 3, 4, 5])
+        combat.assign_damage(1)
+        self.assertEqual(combat.get_possible_damage_assignments(), [4])
+        combat.assign_damage(4)
+        self.assertIsNone(combat.get_current_assignment())
+        self.assertEqual(combat.get_possible_damage_assignments(), ["Pass"])
+
+    def test_damage_follows_the_damage_assignment_order(self):
+        combat = Combat(self.attackers)
+        combat.declare_blocks(self.blockers, [0, 0])
+        combat.set_damage_assignment_order(0, 1)
+        combat.assign_damage(1)
+        combat.assign_damage(4)
+        self.game.combat = combat
+
+        self.assertTrue(self.game.apply_combat_damage())
+        self.assertEqual(self.blockers[1].damage_taken, 1)
+        self.assertEqual(self.blockers[0].damage_taken, 4)
+        self.assertEqual(self.attackers[0].damage_taken, 1)
+        # the unblocked Bear hits the defending player
+        self.assertEqual(self.players[1].life, 38)
+
+        self.game.check_state_based_actions()
+        self.assertEqual(self.players[1].graveyard, [self.blockers[1], self.blockers[0]])
+
+    def test_clean_up_drops_the_combat(self):
+        self.game.combat = Combat(self.attackers)
+        self.game.clean_up_after_combat()
+        self.assertEqual(self.game.combat.attackers, [])
+        self.assertFalse(self.game.apply_combat_damage())
+
+
+class TestFactoredCombat(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([Card() for _ in range(20)]) for _ in range(2)]
+        self.game = Game(self.players, seed=0, factored_combat=True)
+        self.game.active_player, self.game.nonactive_player = self.players
+        self.game.player_with_priority = self.players[0]
+        self.attackers = [creature("Giant", self.players[0], 5, 5), creature("Bear", self.players[0], 2, 2),
+                          creature("Elf", self.players[0], 1, 1)]
+        self.blockers = [creature("Wall", self.players[1], 0, 4), creature("Goblin", self.players[1], 1, 1)]
+        self.game.battlefield.extend(self.attackers + self.blockers)
+        self.game.current_phase_index = Phases.DECLARE_ATTACKERS_STEP
+
+    def test_one_creature_per_move(self):
+        game = self.game
+        keys = []
+        for move in (1, 0, 1):
+            self.assertEqual(game.get_moves(), [0, 1])
+            keys.append(game.get_move_key(move))
+            game.make_move(move)
+        self.assertEqual(keys, [('declare_attacker', 'Giant', True), ('declare_attacker', 'Bear', False),
+                                ('declare_attacker', 'Elf', True)])
+        self.assertEqual(game.get_moves(), ["Confirm"])
+        game.make_move("Confirm")
+        self.assertEqual(game.combat.attackers, [self.attackers[0], self.attackers[2]])
+        self.assertTrue(self.attackers[0].is_tapped)
+        self.assertEqual(game.get_moves(), ["Pass"])
+
+        game.current_phase_index = Phases.DECLARE_BLOCKERS_STEP
+        game.player_with_priority = self.players[1]
+        # block the Elf with the Wall, leave the Goblin back
+        self.assertEqual(game.get_moves(), [0, 1, 2])
+        self.assertEqual(game.get_move_key(1), ('declare_blocker', 'Wall', 'Elf'))
+        game.make_move(1)
+        self.assertEqual(game.get_move_key(2), ('declare_blocker', 'Goblin', None))
+        game.make_move(2)
+        self.assertEqual(game.get_moves(), ["Confirm"])
+        game.make_move("Confirm")
+        self.assertEqual(game.combat.blocked_by, [[], [self.blockers[0]]])
+        self.assertEqual(game.get_moves(), ["Pass"])
+
+    def test_factored_games_play_to_the_end(self):
+        for seed in range(3):
+            game = new_game(seed, factored_combat=True)
+            while not game.is_over():
+                moves = game.get_moves()
+                if game.current_phase_index in (Phases.DECLARE_ATTACKERS_STEP, Phases.DECLARE_BLOCKERS_STEP):
+                    self.assertLessEqual(len(moves), len(game.combat.attackers) + 2)
+                game.make_move(game.rng.choice(moves))
+
+
+if __name__ == '__main__':
+    unittest.main()
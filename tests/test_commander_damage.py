@@ -1,4 +1,5 @@
 import unittest
+import copy
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -6,6 +7,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from game import Game
 from player import Player
 from cards import Creature, Card
+from commander_damage import CommanderDamage
 
 class TestCommanderDamage(unittest.TestCase):
     def setUp(self):
@@ -116,5 +118,31 @@ class TestCommanderDamage(unittest.TestCase):
         self.game.check_state_based_actions()
         self.assertFalse(victim.has_lost)
 
+
+class TestCommanderDamageMatrix(unittest.TestCase):
+    def test_rows_grow_and_lethal_is_tracked_on_update(self):
+        damage = CommanderDamage(4, capacity=1)
+        commanders = [Card() for _ in range(3)]
+        damage.add(commanders[0], 1, 20)
+        damage.add(commanders[1], 1, 20)
+        damage.add(commanders[2], 3, 5)
+        self.assertEqual(damage.as_array().shape, (3, 4))
+        self.assertEqual(damage.lethal, set())
+
+        damage.add(commanders[1], 1, 1)
+        self.assertEqual(damage.lethal, {1})
+        self.assertEqual(damage[commanders[1]][1], 21)
+        self.assertEqual(damage[commanders[2]][3], 5)
+
+    def test_game_copies_keep_their_own_damage(self):
+        game = Game([Player([Card() for _ in range(20)]) for _ in range(4)])
+        commander = Creature("Commander", ["Creature"], {'Generic': 0}, 5, 5)
+        game.commander_damage.add(commander, 2, 5)
+        game_copy = copy.deepcopy(game)
+        game_copy.commander_damage.add(list(game_copy.commander_damage)[0], 2, 5)
+        self.assertEqual(game.commander_damage[commander][2], 5)
+        self.assertEqual(game_copy.commander_damage.as_array()[0, 2], 10)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import evaluators
+import minimax
+from features import FeatureEncoder
+from helpers import new_game
+
+
+class TestEvaluators(unittest.TestCase):
+    def setUp(self):
+        self.games = [new_game(seed) for seed in range(3)]
+        self.games[1].players[0].life = 30
+
+    def test_heuristic_evaluator(self):
+        values = evaluators.HeuristicEvaluator(scale=10).evaluate(self.games, [0, 0, 1])
+        self.assertAlmostEqual(values[0], 0.5)
+        self.assertAlmostEqual(values[1], 1 / (1 + np.exp(1)))
+        self.games[2].players[0].has_lost = True
+        self.assertAlmostEqual(evaluators.HeuristicEvaluator().evaluate(self.games[2:], [1])[0], 1)
+        self.assertEqual(minimax.heuristic_value(self.games[2].players[1], self.games[2]), 9999)
+
+    def test_feature_evaluator(self):
+        encoder = FeatureEncoder(max_players=2)
+        self.assertTrue(np.allclose(
+            evaluators.FeatureEvaluator(evaluators.LinearModel(np.zeros(encoder.vector_size)), encoder).evaluate(
+                self.games, [0, 1, 0]), 0.5))
+
+        # a model on the own life feature prefers the player who is ahead
+        weights = np.zeros(encoder.vector_size)
+        weights[0] = 0.1
+        weights[len(encoder.allocate(1)["players"][0, 0])] = -0.1
+        evaluator = evaluators.FeatureEvaluator(evaluators.LinearModel(weights), encoder)
+        values = evaluator.evaluate(self.games, [0, 0, 1])
+        self.assertAlmostEqual(values[0], 0.5)
+        self.assertLess(values[1], 0.5)
+        self.assertEqual(len(evaluator.evaluate(self.games[:1], [1])), 1)
+
+    def test_rollout_evaluator(self):
+        values = evaluators.RolloutEvaluator().evaluate(self.games, [0, 1, 0])
+        self.assertTrue(all(game.is_over() for game in self.games))
+        self.assertTrue(set(values) <= {0.0, 0.5, 1.0})
+
+    def test_evaluators_must_implement_evaluate(self):
+        with self.assertRaises(TypeError):
+            type("Unfinished", (evaluators.Evaluator,), {})()
+
+
+if __name__ == '__main__':
+    unittest.main()
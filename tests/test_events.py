@@ -0,0 +1,96 @@
+import unittest
+import copy
+import io
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import events
+from game import Game
+from player import Player
+from cards import Creature, Land
+from cards_impl import RhysticStudy, SmotheringTithe
+
+
+class TestEventStream(unittest.TestCase):
+    def setUp(self):
+        self.player = Player([])
+        self.player.index = 0
+        self.game = Game([self.player, Player([])])
+
+    def test_events_are_buffered_on_the_game_stream(self):
+        stream = events.EventStream(sink=io.StringIO())
+        self.game.event_stream = stream
+
+        Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2).play(self.player, self.game)
+        Land("Forest", "Basic Land", "Forest", []).play(self.player, self.game)
+
+        self.assertEqual(list(stream.buffer), [events.CastEvent(0, "Grizzly Bears"),
+                                               events.ZoneChangeEvent(0, "Forest", "hand", "battlefield")])
+
+    def test_writer_thread_writes_json_lines(self):
+        sink = io.StringIO()
+        with events.EventStream(sink=sink, flush_interval=0.01) as stream:
+            stream.emit(events.DamageEvent("Lava Axe", "player 1", 5))
+        records = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual(records, [{"event": "damage", "source": "Lava Axe", "target": "player 1", "amount": 5}])
+        self.assertEqual(stream.written, 1)
+        self.assertEqual(stream.dropped, 0)
+
+    def test_ring_buffer_drops_oldest_events(self):
+        stream = events.EventStream(capacity=2, sink=io.StringIO())
+        for i in range(3):
+            stream.emit(events.TapEvent(0, "Forest %d" % i))
+        self.assertEqual([event.card for event in stream.buffer], ["Forest 1", "Forest 2"])
+        self.assertEqual(stream.dropped, 1)
+
+    def test_game_copies_do_not_log(self):
+        self.game.event_stream = events.EventStream(sink=io.StringIO())
+        game_copy = copy.deepcopy(self.game)
+        self.assertIsNone(game_copy.event_stream)
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.player = Player([Land("Forest", "Basic Land", "Forest", []) for _ in range(5)])
+        self.player.index = 0
+        self.opponent = Player([Land("Plains", "Basic Land", "Plains", []) for _ in range(5)])
+        self.opponent.index = 1
+        self.game = Game([self.player, self.opponent])
+
+    def test_permanents_subscribe_while_on_the_battlefield(self):
+        study = RhysticStudy()
+        study.play(self.player, self.game)
+        self.assertEqual(self.game.event_bus.listeners, {events.CastEvent: [study]})
+
+        self.game.battlefield.remove(study)
+        self.assertEqual(self.game.event_bus.listeners, {})
+
+    def test_rhystic_study_draws_on_opponent_casts(self):
+        RhysticStudy().play(self.player, self.game)
+        Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2).play(self.player, self.game)
+        self.assertEqual(len(self.player.hand), 0)
+
+        Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2).play(self.opponent, self.game)
+        self.assertEqual(len(self.player.hand), 1)
+
+    def test_smothering_tithe_makes_treasure_on_opponent_draws(self):
+        SmotheringTithe().play(self.player, self.game)
+        self.game.draw_card(self.player)
+        self.game.draw_card(self.opponent)
+        treasures = [permanent for permanent in self.game.battlefield if permanent.name == "Treasure"]
+        self.assertEqual(len(treasures), 1)
+        self.assertIs(treasures[0].owner, self.player)
+
+    def test_copies_keep_their_own_subscriptions(self):
+        RhysticStudy().play(self.player, self.game)
+        game_copy = copy.deepcopy(self.game)
+        study_copy = game_copy.battlefield[0]
+        self.assertIs(game_copy.battlefield.event_bus, game_copy.event_bus)
+        self.assertEqual(game_copy.event_bus.listeners, {events.CastEvent: [study_copy]})
+        self.assertIsNot(study_copy, self.game.battlefield[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from features import FeatureEncoder, PLAYER_FEATURES, PERMANENT_FEATURES
+from game import Game
+from phases import Phases
+from player import Player
+from cards import Card, Creature
+
+
+class TestFeatureEncoder(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([Card() for _ in range(10)]), Player([Card() for _ in range(12)])]
+        self.game = Game(self.players)
+        self.game.active_player = self.players[0]
+        self.game.player_with_priority = self.players[0]
+        self.game.current_phase_index = Phases.MAIN_PHASE_PRE_COMBAT
+        self.players[1].life = 33
+        self.players[0].manapool['Green'] = 2
+
+        bear = Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2)
+        bear.owner = self.players[1]
+        bear.is_tapped = True
+        self.game.battlefield.append(bear)
+        self.encoder = FeatureEncoder(max_players=2, max_permanents=4)
+
+    def test_encode_shapes_and_values(self):
+        out = self.encoder.encode(self.game)
+        self.assertEqual(out["players"].shape, (1, 2, len(PLAYER_FEATURES)))
+        self.assertEqual(out["permanents"].shape, (1, 4, len(PERMANENT_FEATURES)))
+
+        players = out["players"][0]
+        self.assertEqual(players[0, PLAYER_FEATURES.index("library_size")], 10)
+        self.assertEqual(players[0, PLAYER_FEATURES.index("mana_green")], 2)
+        self.assertEqual(players[0, PLAYER_FEATURES.index("has_priority")], 1)
+        self.assertEqual(players[1, PLAYER_FEATURES.index("life")], 33)
+
+        bear = out["permanents"][0, 0]
+        self.assertEqual(bear[PERMANENT_FEATURES.index("controller")], 1)
+        self.assertEqual(bear[PERMANENT_FEATURES.index("power")], 2)
+        self.assertEqual(bear[PERMANENT_FEATURES.index("is_tapped")], 1)
+        self.assertEqual(out["permanents"][0, 1:].sum(), 0)
+        self.assertEqual(out["phase"][0].argmax(), list(Phases).index(Phases.MAIN_PHASE_PRE_COMBAT))
+
+    def test_perspective_rotates_players(self):
+        out = self.encoder.encode(self.game, perspective=1)
+        self.assertEqual(out["players"][0, 0, PLAYER_FEATURES.index("life")], 33)
+        self.assertEqual(out["permanents"][0, 0, PERMANENT_FEATURES.index("controller")], 0)
+
+    def test_batch_reuses_buffers(self):
+        buffers = self.encoder.allocate(3)
+        out = self.encoder.encode_batch([self.game, self.game], [0, 1], out=buffers)
+        self.assertTrue(np.shares_memory(out["players"], buffers["players"]))
+        vectors = self.encoder.to_vectors(out)
+        self.assertEqual(vectors.shape, (2, self.encoder.vector_size))
+        self.assertFalse(np.array_equal(vectors[0], vectors[1]))
+        self.assertEqual(buffers["phase"][2].sum(), 0)
+
+    def test_smaller_batch_in_reused_buffers(self):
+        buffers = self.encoder.allocate(3)
+        self.encoder.encode_batch([self.game] * 3, [0, 1, 0], out=buffers)
+        out = self.encoder.encode_batch([self.game], [1], out=buffers)
+        vectors = self.encoder.to_vectors(out)
+        self.assertEqual(vectors.shape, (1, self.encoder.vector_size))
+        np.testing.assert_array_equal(vectors, self.encoder.to_vectors(self.encoder.encode(self.game, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
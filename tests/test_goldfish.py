@@ -0,0 +1,63 @@
+import math
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import card_db
+import deck
+from goldfish import Goldfish
+
+
+class TestGoldfish(unittest.TestCase):
+    def setUp(self):
+        self.registry = card_db.get_registry()
+
+    def test_land_drops_match_the_hypergeometric_distribution(self):
+        goldfish = Goldfish(deck.get_8ed_core_gold_deck())
+        result = goldfish.simulate(games=50000, turns=6, seed=0)
+        # 15 lands in 33 cards: at least one land in the opening hand
+        expected = 1 - math.comb(18, 7) / math.comb(33, 7)
+        self.assertAlmostEqual(result.land_probability(1, 1), expected, delta=0.01)
+        self.assertTrue((np.diff(result.lands, axis=1) >= 0).all())
+        self.assertTrue((result.lands <= np.arange(1, 7)).all())
+        self.assertEqual(result.colors.sum(axis=2).tolist(), result.lands.tolist())
+        again = goldfish.simulate(games=50000, turns=6, seed=0)
+        np.testing.assert_array_equal(result.mana_spent, again.mana_spent)
+
+    def test_lands_and_a_creature(self):
+        cards = [self.registry.create_by_name("Forest") for _ in range(19)]
+        cards.append(self.registry.create_by_name("Grizzly Bears"))
+        result = Goldfish(cards).simulate(games=2000, turns=5, on_the_play=False, seed=1)
+        np.testing.assert_array_equal(result.lands, np.tile(np.arange(1, 6), (2000, 1)))
+        self.assertTrue((result.colors[:, :, 4] == result.lands).all())
+
+        # on the draw the Bears is in hand on turn t after 7 + t draws, and castable from turn 2 on
+        position = np.argmax(result.kinds == result.goldfish.names.index("Grizzly Bears"), axis=1)
+        drawn_turn = np.maximum(position - 6, 1)
+        expected = np.where(drawn_turn <= 5, np.maximum(drawn_turn, 2), 0)
+        np.testing.assert_array_equal(result.cast_turns("Grizzly Bears"), expected)
+        # whenever the Bears can be cast it is, and it costs 2
+        self.assertTrue((result.mana_spent.sum(axis=1) == np.where(expected > 0, 2, 0)).all())
+        mean_turn, castable = result.expected_cast_turn("Grizzly Bears")
+        self.assertAlmostEqual(castable, np.mean(expected > 0))
+
+    def test_colored_costs_use_up_their_sources(self):
+        cards = [self.registry.create_by_name(name) for name in ("Mountain", "Forest", "Norwood Ranger",
+                                                                 "Norwood Ranger")]
+        result = Goldfish(cards, hand_size=4).simulate(games=2000, turns=2, seed=0)
+        # with only one Forest, a single Ranger ({G}) can be cast each turn
+        self.assertTrue((result.mana_spent <= 1).all())
+        self.assertEqual(result.mana_spent[:, 1].sum(), 2000)
+
+    def test_summary(self):
+        summary = Goldfish.from_deck("8ed_core_silver").simulate(games=1000, turns=4, seed=2).format_summary()
+        self.assertIn("Vizzerdrix", summary)
+        # a line per turn and per nonland card of the deck
+        self.assertEqual(len(summary.splitlines()), 1 + 4 + 2 + 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
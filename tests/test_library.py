@@ -0,0 +1,129 @@
+import unittest
+import copy
+import random
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library import Library
+from player import Player
+from cards import Creature, Land
+from rng import GameRandom
+
+
+def forest():
+    return Land("Forest", ("Basic Land",), ("Forest",), [])
+
+
+def mountain():
+    return Land("Mountain", ("Basic Land",), ("Mountain",), [])
+
+
+def bear():
+    return Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2)
+
+
+class TestLibrary(unittest.TestCase):
+    def assert_indexed(self, library):
+        self.assertEqual(library.positions, {card: i for i, card in enumerate(library)})
+        for key, cards in library.by_key.items():
+            self.assertTrue(cards)
+            self.assertEqual(set(cards), {card for card in library if card in cards})
+
+    def test_find_by_category_and_subtype(self):
+        library = Library([bear(), forest(), mountain(), bear()])
+        self.assertEqual(library.find("Mountain").name, "Mountain")
+        self.assertEqual(len(library.find_all("Land")), 2)
+        self.assertEqual(len(library.find_all("Creature")), 2)
+        self.assertIsNone(library.find("Island"))
+        self.assertIsNone(library.find("Forest", Creature))
+
+    def test_take_keeps_indexes(self):
+        cards = [bear(), forest(), mountain(), bear(), forest()]
+        library = Library(cards)
+        taken = library.take(cards[1])
+        self.assertIs(taken, cards[1])
+        self.assertEqual(len(library), 4)
+        self.assertIs(library[1], cards[4])
+        self.assert_indexed(library)
+
+        library.take(library[-1])
+        self.assert_indexed(library)
+
+    def test_draws_shuffles_and_copies_keep_indexes(self):
+        library = Library([bear(), forest(), mountain(), bear(), forest()])
+        library.pop()
+        library.append(mountain())
+        GameRandom(0).shuffle(library)
+        self.assert_indexed(library)
+        by_key = {key: list(cards) for key, cards in library.by_key.items()}
+        library.shuffle(GameRandom(1))
+        self.assert_indexed(library)
+        self.assertEqual({key: list(cards) for key, cards in library.by_key.items()}, by_key)
+        library.pop(1)
+        self.assert_indexed(library)
+
+        library_copy = copy.deepcopy(library)
+        self.assertIsInstance(library_copy, Library)
+        self.assert_indexed(library_copy)
+        self.assertIsNot(library_copy[0], library[0])
+
+    def test_player_deck_is_a_library(self):
+        player = Player([bear(), forest(), mountain()])
+        self.assertIsInstance(player.deck, Library)
+        self.assertEqual(player.find_land_in_library("Mountain"), 2)
+        self.assertEqual(player.find_land_in_library("Island"), -1)
+        self.assertEqual(player.get_library_land_indices(), [1, 2])
+        player.deck = [forest()]
+        self.assertIsInstance(player.deck, Library)
+
+
+class TestHiddenOrderLibrary(unittest.TestCase):
+    def setUp(self):
+        self.cards = [bear(), forest(), mountain(), bear(), forest(), mountain()]
+        self.library = Library(self.cards, hidden_order=True)
+
+    def test_shuffle_does_not_move_cards(self):
+        self.library.shuffle(GameRandom(0))
+        self.assertEqual(list(self.library), self.cards)
+        self.assertEqual(self.library.unordered, 6)
+
+    def test_draws_sample_the_hidden_cards(self):
+        self.library.shuffle(GameRandom(1))
+        drawn = [self.library.pop() for _ in range(6)]
+        self.assertEqual(sorted(map(id, drawn)), sorted(map(id, self.cards)))
+        self.assertEqual(self.library.unordered, 0)
+
+    def test_cards_put_on_top_keep_their_positions(self):
+        self.library.shuffle(GameRandom(2))
+        known = self.library.pop()
+        known.deck_location_known = True
+        self.library.append(known)
+        self.assertEqual(self.library.unordered, 5)
+        self.assertIs(self.library.pop(), known)
+
+        self.library.append(known)
+        self.library.shuffle(GameRandom(2))
+        self.assertFalse(known.deck_location_known)
+        self.assertEqual(self.library.unordered, 6)
+
+    def test_take_keeps_the_top_and_indexes(self):
+        self.library.shuffle(GameRandom(3))
+        top = self.library.pop()
+        self.library.append(top)
+        land = self.library.find("Forest", Land)
+        if land is top:
+            land = self.library.find_all("Forest")[-1]
+        self.library.take(land)
+        self.assertIs(self.library[-1], top)
+        self.assertEqual(self.library.unordered, 4)
+        self.assertEqual(self.library.positions, {card: i for i, card in enumerate(self.library)})
+
+    def test_item_assignment_swaps_keep_indexes(self):
+        random.Random(0).shuffle(self.library)
+        self.assertEqual(self.library.positions, {card: i for i, card in enumerate(self.library)})
+        self.assertEqual(len(self.library.find_all("Land")), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matchup
+import tournament
+
+
+def score_of(wins, draws, losses):
+    score = matchup.Score()
+    for value, count in ((1, wins), (0.5, draws), (0, losses)):
+        for _ in range(count):
+            score.add(value)
+    return score
+
+
+class TestMatchup(unittest.TestCase):
+    def test_sprt_decisions(self):
+        test = matchup.SPRT(elo0=0, elo1=50)
+        self.assertIsNone(test.decide(score_of(6, 0, 3)))
+        self.assertEqual(test.decide(score_of(80, 0, 20)), matchup.H1)
+        self.assertEqual(test.decide(score_of(20, 0, 80)), matchup.H0)
+        self.assertIsNone(test.decide(score_of(2, 0, 0)))
+
+    def test_confidence_target(self):
+        test = matchup.ConfidenceTarget(width=0.2)
+        self.assertEqual(test.decide(score_of(40, 0, 10)), matchup.H1)
+        self.assertEqual(test.decide(score_of(50, 0, 50)), matchup.INCONCLUSIVE)
+        self.assertIsNone(test.decide(score_of(6, 0, 6)))
+
+    def test_score_statistics(self):
+        score = score_of(3, 2, 1)
+        self.assertEqual(score.games, 6)
+        self.assertAlmostEqual(score.mean(), 4 / 6)
+        self.assertGreater(score.elo(), 0)
+
+    def test_run_match_stops_at_max_games(self):
+        agent_a = tournament.parse_agent("random")
+        agent_b = agent_a._replace(name="random-b")
+        decision, score = matchup.run_match(agent_a, agent_b, ("8ed_core_gold", "8ed_core_silver"),
+                                            matchup.SPRT(min_games=100), max_games=4, processes=2)
+        self.assertIsNone(decision)
+        self.assertEqual(score.games, 4)
+
+        # results are credited by seat, so agents with the same name are scored as if their names differed
+        _, same_names = matchup.run_match(agent_a, agent_a, ("8ed_core_gold", "8ed_core_silver"),
+                                          matchup.SPRT(min_games=100), max_games=4, processes=2)
+        self.assertEqual((same_names.wins, same_names.draws, same_names.losses),
+                         (score.wins, score.draws, score.losses))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+import copy
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcts
+import deck
+from game import Game
+from helpers import CountingEvaluator, new_game
+from player import Player
+from rng import GameRandom
+
+
+class TestDeterminizer(unittest.TestCase):
+    def setUp(self):
+        self.game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=0)
+        self.game.start_game()
+        self.observer = self.game.player_with_priority
+        self.observer.deck[-1].deck_location_known = True
+        self.observer.deck[-2].deck_location_known = True
+
+    def test_determinize_keeps_public_information(self):
+        determinizer = mcts.Determinizer(self.game, self.observer.index, pool_size=4)
+        opponent = self.observer.get_opponent(self.game)
+        hidden_names = sorted(card.name for card in opponent.hand + opponent.deck)
+        for _ in range(10):
+            state = determinizer.determinize(copy.deepcopy(self.game))
+            own = state.players[self.observer.index]
+            other = state.players[opponent.index]
+            self.assertEqual([card.name for card in own.hand], [card.name for card in self.observer.hand])
+            self.assertEqual([card.name for card in own.deck[-2:]], [card.name for card in self.observer.deck[-2:]])
+            self.assertEqual(len(own.deck), len(self.observer.deck))
+            self.assertEqual(len(other.hand), len(opponent.hand))
+            self.assertEqual(sorted(card.name for card in other.hand + other.deck), hidden_names)
+
+    def test_determinize_hidden_order_libraries(self):
+        game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=0,
+                    hidden_library_order=True)
+        game.start_game()
+        observer = game.player_with_priority
+        opponent = observer.get_opponent(game)
+        hidden_names = sorted(card.name for card in opponent.hand + opponent.deck)
+        determinizer = mcts.Determinizer(game, observer.index)
+        for _ in range(10):
+            state = determinizer.determinize(copy.deepcopy(game))
+            own = state.players[observer.index]
+            other = state.players[opponent.index]
+            self.assertEqual(own.deck.unordered, len(own.deck))
+            self.assertEqual(len(other.hand), len(opponent.hand))
+            self.assertEqual(sorted(card.name for card in other.hand + other.deck), hidden_names)
+            self.assertEqual(other.deck.positions, {card: i for i, card in enumerate(other.deck)})
+
+    def test_ismcts_returns_legal_move(self):
+        while len(self.game.get_moves()) < 2:
+            self.game.make_move(self.game.get_moves()[0])
+        move = mcts.ismcts(self.game, 5)
+        self.assertIn(move, self.game.get_moves())
+
+
+def tree_depth(node):
+    return 1 + max((tree_depth(child) for child in node.child_nodes.values()), default=-1)
+
+
+def tree_size(node):
+    return 1 + sum(tree_size(child) for child in node.child_nodes.values())
+
+
+class TestUCT(unittest.TestCase):
+    def setUp(self):
+        self.game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=3)
+        self.game.start_game()
+        while len(self.game.get_moves()) < 2:
+            self.game.make_move(self.game.get_moves()[0])
+
+    def test_expansion_below_the_root(self):
+        rootnode = mcts.uct_search(self.game, 30)
+        self.assertGreater(tree_depth(rootnode), 1)
+        self.assertEqual(tree_size(rootnode), 31)
+        self.assertEqual(sum(child.visits for child in rootnode.child_nodes.values()), 30)
+
+        rootnode = mcts.uct_search(self.game, 30, expand_depth=1)
+        self.assertEqual(tree_depth(rootnode), 1)
+        # moves that do the same thing, like playing either of two Mountains, share a child
+        self.assertEqual(len(rootnode.child_nodes), len({self.game.get_move_key(m) for m in self.game.get_moves()}))
+
+    def test_children_are_keyed_by_what_their_move_does(self):
+        # the hand of the player to move is hidden from its opponent, so determinizations from the opponent's
+        # point of view deal different cards and the same move index plays different lands
+        observer = self.game.player_with_priority.get_opponent(self.game)
+        determinizer = mcts.Determinizer(self.game, observer.index, rng=GameRandom(0))
+        states = [determinizer.determinize(copy.deepcopy(self.game)) for _ in range(4)]
+        first, other = states[0], states[3]
+        self.assertEqual(first.get_move_key(0), ('cast', 'Mountain'))
+        self.assertEqual([other.get_move_key(move) for move in other.get_moves()],
+                         [('cast', 'Forest'), ('cast', 'Forest'), ('cast', 'Mountain'), ('cast', 'Mountain'),
+                          ('pass',)])
+        node = mcts.Node(state=first)
+        after = copy.deepcopy(first)
+        after.make_move(0)
+        child = node.add_child(0, first.get_move_key(0), after)
+
+        # in the other determinization the child is reached by the first move that plays a Mountain, and the
+        # Forest at index 0 is still untried
+        self.assertEqual(node.legal_children(other.get_moves(), other.get_move_key), {child: 2})
+        self.assertEqual(node.sample_untried_move([0], other.get_move_key, other.rng), 0)
+
+    def test_progressive_widening(self):
+        widening = mcts.ProgressiveWidening(constant=1.0, exponent=0.5)
+        self.assertEqual([widening.limit(visits) for visits in (0, 3, 8, 15)], [1, 2, 3, 4])
+        rootnode = mcts.uct_search(self.game, 15, widening=widening)
+        self.assertLessEqual(len(rootnode.child_nodes), 4)
+        self.assertIn(mcts.uct(self.game, 5, widening=widening), self.game.get_moves())
+
+    def test_sample_untried_move_from_huge_move_lists(self):
+        node = mcts.Node(state=self.game)
+        moves = list(range(100000))
+        key = lambda move: move
+        for _ in range(50):
+            move = node.sample_untried_move(moves, key, self.game.rng)
+            node.add_child(move, key(move), self.game)
+        self.assertEqual(len(node.child_nodes), 50)
+        self.assertIsNone(node.sample_untried_move(moves, key, self.game.rng, mcts.ProgressiveWidening()))
+        moves = [child.move for child in node.child_nodes.values()] + ["Pass"]
+        self.assertEqual(node.sample_untried_move(moves, key, self.game.rng), "Pass")
+
+
+class TestBatchedISMCTS(unittest.TestCase):
+    def setUp(self):
+        self.games = []
+        for seed in range(3):
+            game = new_game(seed)
+            while len(game.get_moves()) < 2:
+                game.make_move(game.get_moves()[0])
+            self.games.append(game)
+
+    def test_leaves_of_all_games_share_evaluations(self):
+        evaluator = CountingEvaluator()
+        moves = mcts.batched_ismcts(self.games, 20, evaluator, batch_size=8)
+        for game, move in zip(self.games, moves):
+            self.assertIn(move, game.get_moves())
+        # 20 iterations in rounds of 8, 8 and 4 leaves per game
+        self.assertEqual(evaluator.batch_sizes, [24, 24, 12])
+
+    def test_virtual_loss_spreads_a_batch(self):
+        game = self.games[0]
+        search = mcts.BatchedSearch(game, 2 * len(game.get_moves()))
+        leaves = [search.select() for _ in range(2 * len(game.get_moves()))]
+        # every root move is expanded once before any is selected twice
+        self.assertEqual(len(search.rootnode.child_nodes), len(game.get_moves()))
+        self.assertEqual(search.rootnode.virtual_loss, len(leaves))
+        for node, state in leaves:
+            search.backpropagate(node, state.player_just_moved.index, 0.5)
+        self.assertEqual(search.rootnode.virtual_loss, 0)
+        self.assertEqual(sum(child.visits for child in search.rootnode.child_nodes.values()), len(leaves))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import copy
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import minimax
+import deck
+from game import Game
+from player import Player
+from cards import Creature, Land
+from phases import Phases
+
+
+class TestHeuristic(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([]), Player([])]
+        self.game = Game(self.players)
+
+    def add_creature(self, owner, power, toughness):
+        creature = Creature("Creature", "", {'Generic': 1}, power, toughness)
+        creature.owner = owner
+        self.game.battlefield.append(creature)
+        return creature
+
+    def test_battlefield_totals_follow_permanents(self):
+        bear = self.add_creature(self.players[0], 2, 2)
+        self.add_creature(self.players[1], 3, 1)
+        land = Land("Forest", "Basic Land", "Forest", [])
+        land.owner = self.players[0]
+        self.game.battlefield.append(land)
+        self.assertEqual(self.game.battlefield.get_material(0), [1, 2, 2])
+        self.assertEqual(self.game.battlefield.total, [2, 5, 3])
+
+        game_copy = copy.deepcopy(self.game)
+        self.assertEqual(game_copy.battlefield.total, [2, 5, 3])
+
+        self.game.battlefield.remove(bear)
+        self.assertEqual(self.game.battlefield.get_material(0), [0, 0, 0])
+        self.assertEqual(self.game.battlefield.total, [1, 3, 1])
+
+    def test_batched_values_match_single_values(self):
+        self.add_creature(self.players[0], 2, 2)
+        self.add_creature(self.players[1], 5, 5)
+        self.players[1].life = 30
+        other = copy.deepcopy(self.game)
+        other.players[0].has_lost = True
+
+        values = minimax.heuristic_values(0, [self.game, other])
+        self.assertEqual(values[0], minimax.heuristic_value(self.players[0], self.game))
+        self.assertEqual(values[0], (1 - 1) + (40 - 30) + (2 - 5) + (2 - 5))
+        self.assertEqual(values[1], -9999)
+
+    def test_single_and_batched_values_share_weights(self):
+        self.add_creature(self.players[0], 2, 2)
+        self.add_creature(self.players[1], 5, 4)
+        self.players[1].life = 30
+        with mock.patch.object(minimax, "HEURISTIC_WEIGHTS", np.array([3.0, 0.5, 2.0, 0.25])):
+            for player in self.players:
+                value = minimax.heuristic_value(player, self.game)
+                self.assertAlmostEqual(value, minimax.heuristic_values(player.index, [self.game])[0])
+            self.assertAlmostEqual(minimax.heuristic_value(self.players[0], self.game),
+                                   3.0 * 0 + 0.5 * 10 + 2.0 * -3 + 0.25 * -2)
+
+    def test_batched_alphabeta_matches_alphabeta(self):
+        game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=3)
+        game.start_game()
+        for _ in range(60):
+            game.make_move(game.rng.choice(game.get_moves()))
+        player = game.player_with_priority
+        for depth in (1, 2):
+            self.assertEqual(minimax.alphabeta(player, game, depth, -9999, 9999, True),
+                             minimax.alphabeta(player, game, depth, -9999, 9999, True, batch_leaves=True))
+
+    def test_move_ordering_matches_plain_alphabeta(self):
+        game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=5)
+        game.start_game()
+        for _ in range(80):
+            game.make_move(game.rng.choice(game.get_moves()))
+        player = game.player_with_priority
+        ordering = minimax.MoveOrdering()
+        self.assertEqual(minimax.alphabeta(player, game, 2, -9999, 9999, True),
+                         minimax.alphabeta(player, game, 2, -9999, 9999, True, ordering=ordering))
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def test_killer_moves_are_searched_first(self):
+        game = Game([Player([]), Player([])])
+        player = game.player_with_priority
+        ordering = minimax.MoveOrdering()
+        self.assertEqual([move for move, _ in ordering.order(game, player, ["Pass", 0], 1)], ["Pass", 0])
+        ordering.record_cutoff(game.get_move_key(0, player), 1)
+        self.assertEqual([move for move, _ in ordering.order(game, player, ["Pass", 0], 1)], [0, "Pass"])
+        self.assertEqual(ordering.history[game.get_move_key(0, player)], 1)
+
+    def test_attack_keys_describe_attackers(self):
+        players = [Player([]), Player([])]
+        game = Game(players)
+        game.active_player, game.nonactive_player = players
+        game.player_with_priority = players[0]
+        game.current_phase_index = Phases.DECLARE_ATTACKERS_STEP
+        for name in ("A", "B", "C"):
+            creature = Creature(name, "", {'Generic': 1}, 2, 2)
+            creature.owner = players[0]
+            creature.summoning_sick = False
+            game.battlefield.append(creature)
+        keys = [game.get_move_key(move) for move in game.get_moves()]
+        self.assertEqual(keys[0], ('attack', ()))
+        self.assertEqual(keys[4], ('attack', ('A', 'B')))
+        self.assertEqual(keys[-1], ('attack', ('A', 'B', 'C')))
+
+
+if __name__ == '__main__':
+    unittest.main()
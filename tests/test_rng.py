@@ -0,0 +1,57 @@
+import unittest
+import copy
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import deck
+from game import Game
+from player import Player
+from rng import GameRandom
+
+
+def play_random_game(seed, moves=200):
+    game = Game([Player(deck.get_8ed_core_gold_deck()), Player(deck.get_8ed_core_silver_deck())], seed=seed)
+    game.start_game()
+    history = []
+    for _ in range(moves):
+        if game.is_over():
+            break
+        move = game.rng.choice(game.get_moves())
+        history.append(move)
+        game.make_move(move)
+    return game, history
+
+
+class TestGameRandom(unittest.TestCase):
+    def test_seeded_games_are_reproducible(self):
+        game_a, history_a = play_random_game(7)
+        game_b, history_b = play_random_game(7)
+        self.assertEqual(history_a, history_b)
+        self.assertEqual([card.name for card in game_a.players[0].deck],
+                         [card.name for card in game_b.players[0].deck])
+
+    def test_copies_do_not_disturb_the_original_stream(self):
+        rng_a, rng_b = GameRandom(1), GameRandom(1)
+        forked = copy.deepcopy(rng_a)
+        forked.random()
+        self.assertEqual([rng_a.random() for _ in range(5)], [rng_b.random() for _ in range(5)])
+        self.assertNotEqual(forked.random(), GameRandom(1).random())
+
+    def test_shuffle_and_ranges(self):
+        game_rng = GameRandom(3)
+        items = list(range(20))
+        game_rng.shuffle(items)
+        self.assertEqual(sorted(items), list(range(20)))
+        values = {game_rng.randint(1, 3) for _ in range(200)}
+        self.assertEqual(values, {1, 2, 3})
+
+    def test_spawned_streams_are_independent(self):
+        first, second = GameRandom(11).spawn(2)
+        again = GameRandom(11).spawn(2)[1]
+        self.assertEqual(second.permutation(10).tolist(), again.permutation(10).tolist())
+        self.assertNotEqual([first.random() for _ in range(3)], [second.random() for _ in range(3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mcts
+import rollouts
+from cards import Card, Land
+from game import Game
+from helpers import CountingEvaluator, creature, new_game
+from phases import Phases
+from player import Player
+
+
+class TestHeuristicRollout(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([Card() for _ in range(20)]) for _ in range(2)]
+
+    def combat_game(self, factored_combat=False):
+        game = Game(self.players, seed=0, factored_combat=factored_combat)
+        game.active_player, game.nonactive_player = self.players
+        game.player_with_priority = self.players[0]
+        game.current_phase_index = Phases.DECLARE_ATTACKERS_STEP
+        game.battlefield.extend([creature("Giant", self.players[0], 5, 5), creature("Bear", self.players[0], 2, 2),
+                                 creature("Wall", self.players[1], 0, 4)])
+        return game
+
+    def test_attacks_with_everything_when_lethal(self):
+        policy = rollouts.HeuristicRollout(epsilon=1.0)
+        game = self.combat_game()
+        # the Wall can stop the Giant, the Bear alone is not lethal
+        self.players[1].life = 3
+        self.assertIsNone(policy.lethal_attack_move(game, game.get_moves()))
+        self.players[1].life = 2
+        self.assertEqual(policy.choose(game, game.get_moves()), 3)
+        self.assertEqual(game.get_attacker_combination(self.players[0].get_eligible_attackers(game), 3),
+                         game.battlefield[:2])
+
+        game = self.combat_game(factored_combat=True)
+        self.assertEqual(policy.choose(game, game.get_moves()), 1)
+
+    def test_plays_a_land_first(self):
+        game = new_game(0)
+        while game.current_phase_index != Phases.MAIN_PHASE_PRE_COMBAT:
+            game.make_move(game.get_moves()[0])
+        player = game.player_with_priority
+        move = rollouts.HeuristicRollout(epsilon=1.0).choose(game, game.get_moves())
+        zone, index = player.get_playable_cards(game)[move]
+        self.assertIsInstance(player.hand[index], Land)
+
+    def test_heuristic_rollouts_finish_games(self):
+        policy = rollouts.HeuristicRollout()
+        for seed in range(2):
+            game = new_game(seed, factored_combat=seed == 1)
+            while not game.is_over():
+                moves = game.get_moves()
+                move = policy.choose(game, moves)
+                self.assertIn(move, moves)
+                game.make_move(move)
+            self.assertGreater(game.turn_number, 1)
+
+
+class TestTruncatedUCT(unittest.TestCase):
+    def test_horizon_scores_with_the_evaluator(self):
+        game = new_game(2)
+        while len(game.get_moves()) < 2:
+            game.make_move(game.get_moves()[0])
+        evaluator = CountingEvaluator()
+        rootnode = mcts.uct_search(game, 12, rollout=rollouts.HeuristicRollout(), horizon=1, evaluator=evaluator)
+        # one turn is never enough to finish a game of 40 life, so every rollout is truncated
+        self.assertEqual(len(evaluator.batch_sizes), 12)
+        self.assertEqual(sum(child.visits for child in rootnode.child_nodes.values()), 12)
+        self.assertIn(mcts.uct(game, 5, horizon=2), game.get_moves())
+
+
+if __name__ == '__main__':
+    unittest.main()
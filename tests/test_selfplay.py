@@ -0,0 +1,65 @@
+import glob
+import json
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import selfplay
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_play_game_records(self):
+        config = selfplay.make_config(None, itermax=2, max_game_moves=150, temperature_moves=5)
+        records, description = selfplay.play_game(3, config)
+        self.assertGreater(len(records), 0)
+        self.assertEqual(len(description["moves"]), 150)
+        self.assertEqual(description["decks"], ["8ed_core_silver", "8ed_core_gold"])
+        # every recorded move is legal and its visit distribution covers only legal moves
+        self.assertTrue(records["legal_mask"][np.arange(len(records)), records["move"]].all())
+        np.testing.assert_allclose(records["visits"].sum(axis=1), 1, rtol=1e-5)
+        self.assertFalse((records["visits"] * ~records["legal_mask"]).any())
+        np.testing.assert_array_equal(records["move"], [description["moves"][n] for n in records["move_number"]])
+        # an unfinished game is a draw for both players
+        self.assertTrue((records["result"] == 0.5).all())
+
+        again, _ = selfplay.play_game(3, config)
+        np.testing.assert_array_equal(records, again)
+
+    def test_make_config_needs_searches(self):
+        with self.assertRaisesRegex(ValueError, "itermax"):
+            selfplay.make_config(None, itermax=0)
+
+    def test_shard_writer_bounds_shards(self):
+        config = selfplay.make_config(None, max_moves=4)
+        dtype = selfplay.record_dtype(selfplay.make_encoder(config), config.max_moves)
+        with tempfile.TemporaryDirectory() as directory:
+            writer = selfplay.ShardWriter(directory, "w000", dtype, shard_size=4)
+            for game_id, size in enumerate([3, 6, 1]):
+                records = np.zeros(size, dtype=dtype)
+                records["game"] = game_id
+                writer.add_game(records, {"game": game_id, "moves": []})
+            writer.close()
+            shards = [np.load(path) for path in writer.paths]
+            self.assertEqual([len(shard) for shard in shards], [4, 4, 2])
+            np.testing.assert_array_equal(np.concatenate(shards)["game"], [0, 0, 0, 1, 1, 1, 1, 1, 1, 2])
+            with open(writer.paths[1][:-len(".npy")] + ".json", encoding="utf-8") as sidecar_file:
+                sidecar = json.load(sidecar_file)
+            self.assertEqual([game["game"] for game in sidecar["games"]], [1])
+            self.assertEqual(glob.glob(os.path.join(directory, "*.tmp")), [])
+
+    def test_generate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = selfplay.make_config(directory, itermax=2, shard_size=64, max_game_moves=100)
+            summaries = selfplay.generate(config, games=3, processes=2)
+            self.assertEqual(sum(summary["games"] for summary in summaries), 3)
+            records = np.concatenate([np.load(path) for summary in summaries for path in summary["shards"]])
+            self.assertEqual(len(records), sum(summary["decisions"] for summary in summaries))
+            self.assertEqual(sorted(set(records["game"])), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+import os
+import random
+import sys
+import tempfile
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+
+DECKS = ["8ed_core_gold", "8ed_core_silver"]
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.sock")
+        self.game_server = server.GameServer(max_games=50)
+        self.listener = await self.game_server.start(self.path)
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.directory.cleanup()
+
+    async def play(self, client, seed, moves):
+        state = await client.request("new", decks=DECKS, seed=seed)
+        rng = random.Random(seed)
+        for _ in range(moves):
+            if state["over"]:
+                break
+            state = await client.request("move", game=state["game"], move=rng.randrange(len(state["moves"])))
+        return state
+
+    async def test_many_games_over_few_connections(self):
+        clients = [await server.GameClient.connect(self.path) for _ in range(4)]
+        states = await asyncio.gather(*[self.play(clients[i % 4], i, 100) for i in range(40)])
+        self.assertEqual(len(self.game_server.games), 40)
+        self.assertEqual(sorted(state["game"] for state in states), list(range(40)))
+
+        # the same seed and moves give the same game whichever connection played it
+        again = await self.play(clients[0], 5, 100)
+        self.assertEqual(again["life"], states[5]["life"])
+        self.assertEqual(again["moves"], states[5]["moves"])
+
+        described = await clients[1].request("state", game=states[0]["game"], describe=True)
+        self.assertEqual(len(described["keys"]), len(described["moves"]))
+        for client in clients:
+            await client.close()
+
+    async def test_errors(self):
+        client = await server.GameClient.connect(self.path)
+        state = await client.request("new", decks=DECKS, seed=0)
+        with self.assertRaisesRegex(ValueError, "legal moves"):
+            await client.request("move", game=state["game"], move=len(state["moves"]))
+        with self.assertRaisesRegex(ValueError, "unknown game"):
+            await client.request("state", game=12345)
+        with self.assertRaisesRegex(ValueError, "unknown op"):
+            await client.request("resign", game=state["game"])
+        self.assertTrue((await client.request("close", game=state["game"]))["closed"])
+        self.assertEqual(self.game_server.games, {})
+        await client.close()
+
+    async def test_badly_typed_requests_leave_the_connection_usable(self):
+        client = await server.GameClient.connect(self.path)
+        state = await client.request("new", decks=DECKS, seed=0)
+        bad_requests = [("state", {"game": [1]}), ("new", {"decks": DECKS, "seed": "x"}), ("new", {"decks": 5}),
+                        ("new", {"decks": [1, 2]}), ("move", {"game": state["game"], "move": True}),
+                        ("move", {"game": state["game"], "move": 0.0})]
+        for op, fields in bad_requests:
+            with self.assertRaisesRegex(ValueError, "must be|legal moves"):
+                await client.request(op, **fields)
+
+        # unexpected failures are replied as errors too, instead of dropping the client
+        with mock.patch.object(self.game_server, "make_move", side_effect=RuntimeError("bug")):
+            with self.assertRaisesRegex(ValueError, "internal error"):
+                await client.request("move", game=state["game"], move=0)
+        again = await client.request("state", game=state["game"])
+        self.assertEqual(again["moves"], state["moves"])
+        self.assertEqual(again["life"], state["life"])
+        await client.close()
+
+    async def test_malformed_message_drops_the_client(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(len(b"[1]").to_bytes(server.HEADER_SIZE, "big") + b"[1]")
+        await writer.drain()
+        self.assertIsNone(await server.read_message(reader))
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
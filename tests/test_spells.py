@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spells
+from cards import Creature, Sorcery, DEFAULT_RESOLVER
+from game import Game
+from phases import Phases
+from player import Player
+
+
+class TestSpellResolvers(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([]), Player([])]
+        self.game = Game(self.players, seed=0)
+        self.caster = self.players[0]
+        self.game.active_player, self.game.nonactive_player = self.players
+        self.game.player_with_priority = self.caster
+        self.game.current_phase_index = Phases.MAIN_PHASE_PRE_COMBAT
+
+    def cast(self, spell):
+        self.caster.hand.append(spell)
+        self.caster.manapool['Red'] = 5
+        self.caster.manapool['White'] = 5
+        self.game.make_move(0)
+        while self.caster.generic_debt > 0:
+            self.game.make_move(self.game.get_moves()[0])
+
+    def test_resolvers_are_looked_up_by_name(self):
+        self.assertIsInstance(Sorcery("Volcanic Hammer", "", {'Red': 1}).resolver, spells.DamageAnyTarget)
+        self.assertIs(Sorcery("Unknown Spell", "", {'Red': 1}).resolver, DEFAULT_RESOLVER)
+
+    def test_volcanic_hammer_targets_creature(self):
+        creature = Creature("Hill Giant", "Giant", {'Red': 1}, 3, 3)
+        creature.owner = self.players[1]
+        self.game.battlefield.append(creature)
+        self.cast(Sorcery("Volcanic Hammer", "", {'Red': 1, 'Generic': 1}))
+
+        self.assertIsNotNone(self.caster.casting_spell)
+        self.assertEqual(self.game.get_moves(), [0, 1, 2])
+        self.assertEqual(self.game.get_move_key(0), ('target', 'Volcanic Hammer', 'Hill Giant', 1))
+        self.game.make_move(0)
+        self.assertTrue(creature.is_dead)
+        self.assertIsNone(self.caster.casting_spell)
+        self.assertEqual([card.name for card in self.caster.graveyard], ["Volcanic Hammer"])
+
+    def test_lava_axe_can_finish_a_player(self):
+        self.players[1].life = 5
+        self.cast(Sorcery("Lava Axe", "", {'Red': 1, 'Generic': 4}))
+        self.game.make_move(1)
+        self.assertTrue(self.players[1].has_lost)
+
+    def test_vengeance_needs_a_tapped_creature(self):
+        vengeance = Sorcery("Vengeance", "", {'White': 1, 'Generic': 1})
+        self.assertFalse(self.caster.has_legal_targets(vengeance, self.game))
+        creature = Creature("Glory Seeker", "Human Soldier", {'White': 1}, 2, 2)
+        creature.owner = self.players[1]
+        creature.is_tapped = True
+        self.game.battlefield.append(creature)
+        self.assertTrue(self.caster.has_legal_targets(vengeance, self.game))
+
+
+if __name__ == '__main__':
+    unittest.main()
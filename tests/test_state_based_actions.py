@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game
+from player import Player
+from cards import Card, Creature
+
+
+def bear(owner):
+    creature = Creature("Grizzly Bears", "Bear", {'Green': 1, 'Generic': 1}, 2, 2)
+    creature.owner = owner
+    return creature
+
+
+class TestStateBasedActions(unittest.TestCase):
+    def setUp(self):
+        self.players = [Player([Card() for _ in range(20)]) for _ in range(2)]
+        self.game = Game(self.players, seed=0)
+        self.bears = [bear(self.players[0]) for _ in range(3)]
+        self.game.battlefield.extend(self.bears)
+
+    def test_only_dirty_creatures_are_checked(self):
+        self.game.deal_damage(self.bears[1], 2)
+        self.assertEqual(list(self.game.sba_dirty), [self.bears[1]])
+        self.game.check_state_based_actions()
+        self.assertEqual(list(self.game.battlefield), [self.bears[0], self.bears[2]])
+        self.assertEqual(self.players[0].graveyard, [self.bears[1]])
+        self.assertEqual(self.game.sba_dirty, {})
+
+    def test_untracked_deaths_need_a_full_check(self):
+        for creature in self.bears:
+            creature.take_damage(2)
+        self.game.check_state_based_actions()
+        self.assertEqual(len(self.game.battlefield), 3)
+        self.game.check_state_based_actions(full=True)
+        self.assertEqual(len(self.game.battlefield), 0)
+        self.assertEqual(len(self.players[0].graveyard), 3)
+
+    def test_creatures_that_already_left_are_skipped(self):
+        self.game.deal_damage(self.bears[0], 2)
+        self.game.battlefield.remove(self.bears[0])
+        self.game.check_state_based_actions()
+        self.assertEqual(self.players[0].graveyard, [])
+
+    def test_players_at_zero_life_lose(self):
+        self.players[1].life = 3
+        self.game.deal_damage(self.players[1], 3)
+        self.game.check_state_based_actions()
+        self.assertTrue(self.players[1].has_lost)
+        self.assertFalse(self.players[0].has_lost)
+
+
+if __name__ == '__main__':
+    unittest.main()
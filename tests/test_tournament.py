@@ -0,0 +1,60 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tournament
+
+
+def result(first, second, score):
+    return {"agents": [first, second], "score": score}
+
+
+class TestTournament(unittest.TestCase):
+    def test_parse_agent(self):
+        self.assertEqual(tournament.parse_agent("uct:50"), tournament.AgentConfig("uct:50", "uct", 50))
+        self.assertEqual(tournament.parse_agent("random").itermax, None)
+        with self.assertRaises(ValueError):
+            tournament.parse_agent("magic")
+
+    def test_schedule_balances_seats_and_decks(self):
+        agents = [tournament.parse_agent(spec) for spec in ("random", "alphabeta", "uct:5")]
+        tasks = tournament.schedule(agents, [("8ed_core_gold", "8ed_core_silver")], games_per_pairing=1)
+        # 3 pairs of agents, 2 seatings, 2 deck sides
+        self.assertEqual(len(tasks), 12)
+        self.assertEqual(len({task.seed for task in tasks}), 12)
+        # even a single game per pairing gives every agent each seat and each deck equally often
+        for agent in agents:
+            for seat in range(2):
+                seated = [task for task in tasks if task.agents[seat] is agent]
+                self.assertEqual(len(seated), 4)
+                self.assertEqual(sum(task.decks[seat] == "8ed_core_gold" for task in seated), 2)
+
+    def test_run_tournament_streams_results(self):
+        agents = [tournament.parse_agent("random"), tournament.parse_agent("random")]
+        agents[1] = agents[1]._replace(name="random-b")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            results = tournament.run_tournament(agents, [("8ed_core_gold", "8ed_core_silver")], 1, processes=2,
+                                                results_path=path)
+            self.assertEqual(len(results), 4)
+            self.assertEqual(sorted(r["index"] for r in tournament.load_results(path)), [0, 1, 2, 3])
+        self.assertIn("random-b", tournament.format_standings(results))
+
+    def test_run_tournament_rejects_duplicate_names(self):
+        agents = [tournament.parse_agent("uct:5"), tournament.parse_agent("uct:5")]
+        with self.assertRaisesRegex(ValueError, "unique names"):
+            tournament.run_tournament(agents, [("8ed_core_gold", "8ed_core_silver")], 1, processes=1)
+
+    def test_elo_ratings(self):
+        results = [result("a", "b", 1)] * 30 + [result("a", "b", 0)] * 10 + [result("b", "c", 0.5)] * 10
+        ratings = tournament.elo_ratings(results)
+        self.assertGreater(ratings["a"], ratings["b"])
+        self.assertAlmostEqual(ratings["b"], ratings["c"], places=3)
+        self.assertAlmostEqual(sum(ratings.values()) / 3, 1500, places=3)
+        self.assertEqual(tournament.score_table(results)["b", "a"], [10, 0, 30])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import selfplay
+from trajectories import TrajectoryReader
+
+
+class TestTrajectoryReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.config = selfplay.make_config(cls.directory.name, itermax=2, shard_size=16, max_game_moves=120)
+        selfplay.run_worker(0, [0, 1], cls.config)
+        cls.reader = TrajectoryReader(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_records_span_shards(self):
+        reader = self.reader
+        self.assertGreater(len(reader.shards), 1)
+        self.assertEqual(len(reader), sum(len(shard) for shard in reader.shards))
+        self.assertEqual(set(reader.games), {0, 1})
+        self.assertEqual(reader.header["max_moves"], self.config.max_moves)
+
+    def test_slicing(self):
+        reader = self.reader
+        view = reader[2:10]
+        self.assertIsInstance(view, np.memmap)
+        self.assertTrue(np.shares_memory(view, reader.shards[0]))
+        across = reader[10:20]
+        np.testing.assert_array_equal(across, np.concatenate(reader.shards)[10:20])
+        np.testing.assert_array_equal(reader[20:10:-3], np.concatenate(reader.shards)[20:10:-3])
+        self.assertEqual(reader[-1], reader.shards[-1][-1])
+        with self.assertRaises(IndexError):
+            reader[len(reader)]
+
+    def test_batches(self):
+        reader = self.reader
+        batches = list(reader.batches(7, seed=0))
+        self.assertTrue(all(len(batch) == 7 for batch in batches[:-1]))
+        records = np.concatenate(batches)
+        self.assertEqual(len(records), len(reader))
+        order = np.lexsort((records["decision"], records["game"]))
+        np.testing.assert_array_equal(records[order], np.concatenate(reader.shards))
+        self.assertEqual(len(np.concatenate(list(reader.batches(7, drop_last=True)))), len(reader) - len(reader) % 7)
+
+    def test_reconstruct(self):
+        reader = self.reader
+        encoder = selfplay.make_encoder(self.config)
+        for index in (0, len(reader) // 2, len(reader) - 1):
+            record = reader[index]
+            current_game = reader.reconstruct(index)
+            self.assertEqual(current_game.player_with_priority.index, record["player"])
+            self.assertEqual(int(np.count_nonzero(record["legal_mask"])), len(current_game.get_moves()))
+            np.testing.assert_array_equal(encoder.to_vectors(encoder.encode(current_game))[0], record["features"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import argparse
+import collections
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+
+import agents
+import card_db
+import game
+import player
+
+AgentConfig = collections.namedtuple("AgentConfig", ["name", "method", "itermax"])
+Task = collections.namedtuple("Task", ["index", "agents", "decks", "seed", "max_moves"])
+
+
+def parse_agent(spec):
+    """ An AgentConfig from a string like "random", "alphabeta", "uct:50", "ismcts:200" or "batched:64". """
+    method, _, itermax = spec.partition(":")
+    if method not in agents.AGENT_TYPES:
+        raise ValueError("Unknown agent method '%s', expected one of %s" % (method, ", ".join(agents.AGENT_TYPES)))
+    if method in ("uct", "ismcts", "batched"):
+        return AgentConfig(spec, method, int(itermax or 10))
+    return AgentConfig(spec, method, None)
+
+
+def parse_pairing(spec):
+    """ A pair of deck names from a string like "8ed_core_gold:8ed_core_silver". """
+    first, _, second = spec.partition(":")
+    return first, second or first
+
+
+def create_agent(config):
+    if config.itermax is None:
+        return agents.make_agent(config.method)
+    return agents.make_agent(config.method, config.itermax)
+
+
+def play_game(configs, decks, seed=None, max_moves=20000):
+    """ Plays one game between two AgentConfigs sitting in the given order with the given decks.
+        Returns the score of the first agent (1, 0.5 or 0) and the number of moves. Games longer than
+        max_moves are drawn.
+    """
+    registry = card_db.get_registry()
+    players = [player.Player(registry.create_deck(deck_name)) for deck_name in decks]
+    current_game = game.Game(players, seed=seed)
+    current_game.start_game()
+    moves = agents.run_games([current_game], [create_agent(config) for config in configs], max_moves)[0]
+    if not current_game.is_over():
+        return 0.5, moves
+    return current_game.get_results(0), moves
+
+
+def run_task(task):
+    score, moves = play_game(task.agents, task.decks, task.seed, task.max_moves)
+    return {"index": task.index, "agents": [agent.name for agent in task.agents], "decks": list(task.decks),
+            "seed": list(task.seed), "score": score, "moves": moves}
+
+
+def schedule(configs, pairings, games_per_pairing=1, seed=0, max_moves=20000):
+    """ Round robin over every pair of agents and deck pairing, with each agent taking both seats and both
+        decks equally often: games_per_pairing games are played for every seating and deck side. Every game
+        gets its own seed derived from seed and its index.
+    """
+    tasks = []
+    for first, second in itertools.combinations(configs, 2):
+        for decks in pairings:
+            sides = (decks, decks[::-1]) if decks[0] != decks[1] else (decks,)
+            for _ in range(games_per_pairing):
+                for seats, seated_decks in itertools.product(((first, second), (second, first)), sides):
+                    index = len(tasks)
+                    tasks.append(Task(index, seats, seated_decks, (seed, index), max_moves))
+    return tasks
+
+
+def run_tournament(configs, pairings, games_per_pairing=1, processes=None, results_path=None, seed=0,
+                   max_moves=20000):
+    """ Plays all scheduled games on a process pool. Results are appended to results_path as JSON lines in
+        the order the games finish, so an interrupted tournament keeps everything played so far. Results and
+        ratings are keyed by agent name, so the names must be unique.
+    """
+    names = [config.name for config in configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError("agents must have unique names, got %s more than once" % ", ".join(duplicates))
+    tasks = schedule(configs, pairings, games_per_pairing, seed, max_moves)
+    results = []
+    results_file = open(results_path, "a", encoding="utf-8") if results_path is not None else None
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(run_task, tasks):
+                results.append(result)
+                if results_file is not None:
+                    results_file.write(json.dumps(result, separators=(",", ":")) + "\n")
+                    results_file.flush()
+                logging.info("Game {0}/{1}: {2} vs {3} scored {4}".format(len(results), len(tasks),
+                                                                          *result["agents"], result["score"]))
+    finally:
+        if results_file is not None:
+            results_file.close()
+    return results
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def score_table(results):
+    """ {(agent, opponent): [wins, draws, losses]} from the point of view of agent. """
+    table = collections.defaultdict(lambda: [0, 0, 0])
+    for result in results:
+        first, second = result["agents"]
+        outcome = {1: 0, 0.5: 1, 0: 2}[result["score"]]
+        table[first, second][outcome] += 1
+        table[second, first][2 - outcome] += 1
+    return dict(table)
+
+
+def elo_ratings(results, iterations=200, prior_games=1.0, mean_rating=1500.0):
+    """ Elo ratings from a Bradley-Terry fit of all results, so they do not depend on the order games finished
+        in. Draws count as half a win for both sides. Every pair of agents that met gets prior_games virtual
+        drawn games, which keeps the ratings of unbeaten agents finite.
+    """
+    wins = collections.defaultdict(float)
+    games = collections.defaultdict(float)
+    names = set()
+    for result in results:
+        first, second = result["agents"]
+        names.update((first, second))
+        wins[first, second] += result["score"]
+        wins[second, first] += 1 - result["score"]
+        games[first, second] += 1
+        games[second, first] += 1
+    for pair in list(games):
+        wins[pair] += prior_games / 2
+        games[pair] += prior_games
+    names = sorted(names)
+    strength = {name: 1.0 for name in names}
+    for _ in range(iterations):
+        updated = {}
+        for name in names:
+            total_wins = sum(wins[name, other] for other in names if (name, other) in games)
+            denominator = sum(games[name, other] / (strength[name] + strength[other])
+                              for other in names if (name, other) in games)
+            updated[name] = total_wins / denominator if denominator else strength[name]
+        scale = math.exp(sum(math.log(value) for value in updated.values()) / len(updated)) if updated else 1
+        strength = {name: value / scale for name, value in updated.items()}
+    return {name: mean_rating + 400 * math.log10(strength[name]) for name in names}
+
+
+def format_standings(results):
+    ratings = elo_ratings(results)
+    table = score_table(results)
+    lines = ["%-20s %7s %6s %6s %6s %7s" % ("agent", "elo", "wins", "draws", "losses", "score")]
+    for name in sorted(ratings, key=ratings.get, reverse=True):
+        wins, draws, losses = [sum(table[pair][i] for pair in table if pair[0] == name) for i in range(3)]
+        played = wins + draws + losses
+        lines.append("%-20s %7.1f %6d %6d %6d %6.1f%%" % (name, ratings[name], wins, draws, losses,
+                                                          100.0 * (wins + draws / 2) / played))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round robin tournament between Open MTG agents")
+    parser.add_argument("--agents", nargs="+", default=["random", "alphabeta", "uct:5"],
+                        help="agent specs like random, alphabeta, uct:50 or ismcts:200")
+    parser.add_argument("--decks", nargs="+", default=["8ed_core_gold:8ed_core_silver"],
+                        help="deck pairings like 8ed_core_gold:8ed_core_silver")
+    parser.add_argument("--games", type=int, default=1,
+                        help="games per agent pair, deck pairing, deck side and seating")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--results", default="tournament_results.jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)-5.5s]  %(message)s")
+    configs = [parse_agent(spec) for spec in args.agents]
+    pairings = [parse_pairing(spec) for spec in args.decks]
+    results = run_tournament(configs, pairings, args.games, args.processes, args.results, args.seed)
+    print(format_standings(results))
+
+
+if __name__ == "__main__":
+    main()
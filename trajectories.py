@@ -0,0 +1,93 @@
+import glob
+import json
+import os
+
+import numpy as np
+
+import selfplay
+
+
+class TrajectoryReader:
+    """ Random access to the decision records written by selfplay.
+
+        Every shard is memory-mapped, so opening a directory reads only the JSON sidecars and records are paged in
+        from disk as they are touched. Records are numbered across all shards in file name order. Slices that lie
+        within one shard are views of the mapping rather than copies; take() and batches() gather records from
+        anywhere into a new array.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.paths = sorted(glob.glob(os.path.join(directory, "*.npy")))
+        self.shards = [np.load(path, mmap_mode="r") for path in self.paths]
+        if len({shard.dtype for shard in self.shards}) > 1:
+            raise ValueError("Shards in %s have different record formats" % directory)
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+        self.games = {}
+        self.header = {}
+        for path in self.paths:
+            with open(path[:-len(".npy")] + ".json", encoding="utf-8") as sidecar_file:
+                sidecar = json.load(sidecar_file)
+            for description in sidecar.pop("games"):
+                self.games[description["game"]] = description
+            self.header = sidecar
+
+    @property
+    def dtype(self):
+        return self.shards[0].dtype if self.shards else None
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def locate(self, index):
+        """ (shard number, index within the shard) of a record. """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        shard = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return shard, index - int(self.offsets[shard])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step > 0 and start < stop:
+                shard, first = self.locate(start)
+                if stop <= self.offsets[shard + 1]:
+                    return self.shards[shard][first:first + stop - start:step]
+            return self.take(np.arange(start, stop, step))
+        shard, index = self.locate(key)
+        return self.shards[shard][index]
+
+    def take(self, indices):
+        """ A new array with the records at the given indices, in that order. """
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty(len(indices), dtype=self.dtype)
+        shard_numbers = np.searchsorted(self.offsets, indices, side="right") - 1
+        for shard in np.unique(shard_numbers):
+            selected = shard_numbers == shard
+            local = indices[selected] - self.offsets[shard]
+            # reading in file order keeps the access to the mapping sequential
+            order = np.argsort(local, kind="stable")
+            out[np.flatnonzero(selected)[order]] = self.shards[shard][local[order]]
+        return out
+
+    def batches(self, batch_size, shuffle=True, seed=None, drop_last=False):
+        """ Yields the records in arrays of batch_size, in a random order when shuffle is set. """
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        stop = len(order) - len(order) % batch_size if drop_last else len(order)
+        for start in range(0, stop, batch_size):
+            yield self.take(order[start:start + batch_size])
+
+    def reconstruct(self, index):
+        """ The Game in which the record at index was decided, rebuilt by replaying its game from the seed. """
+        record = self[index]
+        return self.replay(int(record["game"]), int(record["move_number"]))
+
+    def replay(self, game_id, move_number):
+        """ The Game with the given id after its first move_number moves. """
+        description = self.games[game_id]
+        current_game = selfplay.new_game(description["decks"], description["seed"])
+        for move in description["moves"][:move_number]:
+            current_game.make_move(current_game.get_moves()[move])
+        return current_game